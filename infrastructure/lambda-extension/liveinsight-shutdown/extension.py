@@ -0,0 +1,46 @@
+"""
+LiveInsight 종료 알림 확장
+
+Lambda 는 외부 확장이 하나라도 등록된 경우에만 실행 환경을 회수하기 전에 런타임에 SIGTERM 을 보낸다.
+lambda_function.shutdown 이 그 신호로 남은 세션 변경분 / 카운터 증가분을 반영하므로,
+이 확장은 SHUTDOWN 이벤트만 구독해 등록 상태를 유지하고 아무 일도 하지 않는다.
+"""
+
+import json
+import os
+import urllib.request
+
+EXTENSION_NAME = 'liveinsight-shutdown'
+
+
+def extension_api():
+    return f"http://{os.environ['AWS_LAMBDA_RUNTIME_API']}/2020-01-01/extension"
+
+
+def register():
+    request = urllib.request.Request(
+        f'{extension_api()}/register',
+        data=json.dumps({'events': ['SHUTDOWN']}).encode(),
+        headers={'Lambda-Extension-Name': EXTENSION_NAME},
+        method='POST'
+    )
+    with urllib.request.urlopen(request) as response:
+        return response.headers['Lambda-Extension-Identifier']
+
+
+def main():
+    extension_id = register()
+    while True:
+        # 다음 이벤트까지 블록 (SHUTDOWN 만 구독했으므로 종료 단계에서만 돌아온다)
+        request = urllib.request.Request(
+            f'{extension_api()}/event/next',
+            headers={'Lambda-Extension-Identifier': extension_id}
+        )
+        with urllib.request.urlopen(request) as response:
+            event = json.load(response)
+        if event.get('eventType') == 'SHUTDOWN':
+            return
+
+
+if __name__ == '__main__':
+    main()
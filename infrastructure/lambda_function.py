@@ -1,13 +1,30 @@
+import time
+
+# 콜드 스타트 초기화 시간 측정 (모듈 로드 시작 시점)
+INIT_STARTED = time.time()
+
 import json
 import boto3
 import os
-import uuid
+import gzip
+import base64
+import hashlib
 import logging
-import time
-from datetime import datetime, timedelta
+import random
+import re
+import signal
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from botocore.exceptions import ClientError
 
+try:
+    import orjson  # 선택 의존성 (Lambda 레이어에 포함된 경우에만 사용)
+except ImportError:
+    orjson = None
+
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -18,10 +35,516 @@ cloudwatch = boto3.client('cloudwatch')
 events_table = dynamodb.Table(os.environ['EVENTS_TABLE'])
 sessions_table = dynamodb.Table(os.environ['SESSIONS_TABLE'])
 active_sessions_table = dynamodb.Table(os.environ['ACTIVE_SESSIONS_TABLE'])
+counters_table = dynamodb.Table(os.environ['COUNTERS_TABLE']) if os.environ.get('COUNTERS_TABLE') else None
+
+# 이 크기 이상의 응답만 gzip 압축
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# 요청 본문을 재생용 트레이스로 로그에 남길 비율 (0 이면 기록 안 함)
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', '0'))
+
+# 트래커 배치 봉투 (static/js/liveinsight-tracker.js)
+BATCH_VERSION = 1
+BATCH_COMMON_FIELDS = ('user_id', 'session_id', 'user_agent')
+MAX_BATCH_EVENTS = int(os.environ.get('MAX_BATCH_EVENTS', '100'))
+MAX_BATCH_BYTES = int(os.environ.get('MAX_BATCH_BYTES', str(256 * 1024)))
+MAX_EVENT_DELAY_MS = 10 * 60 * 1000
+
+# 클라이언트 이벤트 ID 중복 제거 (컨테이너별 최근 ID LRU, 최종 방어는 조건부 쓰기)
+DEDUP_CACHE_SIZE = int(os.environ.get('DEDUP_CACHE_SIZE', '50000'))
+DEDUP_WINDOW_MS = int(os.environ.get('DEDUP_WINDOW_MS', str(15 * 60 * 1000)))
+# 이 범위 안의 클라이언트 시각은 그대로 사용 (재전송돼도 같은 키가 되도록)
+MAX_CLIENT_SKEW_MS = MAX_EVENT_DELAY_MS
+CLIENT_EVENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+
+# 수집 큐 (설정 시 수집기는 검증 후 큐에 넣고 202, 저장은 consume_handler 가 배치로)
+# SQS 큐 URL 또는 로컬용 file:///경로 (NDJSON 추가)
+INGEST_QUEUE_URL = os.environ.get('INGEST_QUEUE_URL', '')
+# 큐 경로는 발급한 ID 를 돌려줄 수 없으므로 (없으면 메시지마다 새 사용자/세션이 됨) 202 전에 확인
+QUEUED_REQUIRED_FIELDS = ('user_id', 'session_id', 'event_type')
+QUEUED_STRING_FIELDS = ('page_url', 'referrer', 'user_agent', 'event_id')
+BATCH_WRITE_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 5
+
+# 스로틀 재시도: full jitter 백오프, 호출당 총 대기 예산
+RETRY_BASE_MS = float(os.environ.get('RETRY_BASE_MS', '25'))
+RETRY_CAP_MS = float(os.environ.get('RETRY_CAP_MS', '200'))
+RETRY_BUDGET_MS = float(os.environ.get('RETRY_BUDGET_MS', '300'))
+THROTTLE_ERROR_CODES = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+
+# 스로틀 토큰 버킷: 스로틀마다 THROTTLE_COST 차감, 초당 REFILL 만큼 회복
+THROTTLE_BUCKET_CAPACITY = float(os.environ.get('THROTTLE_BUCKET_CAPACITY', '20'))
+THROTTLE_BUCKET_REFILL = float(os.environ.get('THROTTLE_BUCKET_REFILL', '2'))
+THROTTLE_COST = float(os.environ.get('THROTTLE_COST', '5'))
+
+# 버킷 잔량 비율이 이 값 미만이면 우선순위 낮은 이벤트부터 덜어냄
+SHED_HEARTBEAT_BELOW = float(os.environ.get('SHED_HEARTBEAT_BELOW', '0.5'))
+SHED_LOW_PRIORITY_BELOW = float(os.environ.get('SHED_LOW_PRIORITY_BELOW', '0.2'))
+
+# 이벤트 우선순위 (작을수록 중요, page_view 와 전환 이벤트는 덜어내지 않음)
+EVENT_PRIORITY = {
+    'conversion': 0,
+    'purchase': 0,
+    'checkout': 0,
+    'add_to_cart': 0,
+    'page_view': 1,
+    'heartbeat': 3,
+}
+DEFAULT_EVENT_PRIORITY = 2
+
+# 하트비트는 이벤트로 저장하지 않고 활성 세션만 갱신 (세션당 이 간격 안의 갱신은 생략)
+HEARTBEAT_MIN_INTERVAL_MS = int(os.environ.get('HEARTBEAT_MIN_INTERVAL_MS', '60000'))
+HEARTBEAT_CACHE_SIZE = int(os.environ.get('HEARTBEAT_CACHE_SIZE', '10000'))
+ACTIVE_SESSION_TTL = timedelta(minutes=30)
+
+# 기존 세션의 변경분은 모아서 세션당 이 간격에 한 번 UpdateItem (종료/컨테이너 종료 시 즉시)
+SESSION_FLUSH_INTERVAL_MS = int(os.environ.get('SESSION_FLUSH_INTERVAL_MS', '60000'))
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', '10000'))
+
+# 핫 카운터 (5분 버킷 이벤트 수, 페이지별 조회 수): 컨테이너에서 모아 이 간격마다 카운터당 UpdateItem 한 번
+# 쓰기는 샤드 하나에 몰리지 않도록 '<이름>#<샤드>' 중 하나를 골라 ADD (비어 있으면 카운터 기록 안 함)
+COUNTERS_TABLE = os.environ.get('COUNTERS_TABLE', '')
+COUNTER_FLUSH_INTERVAL_MS = int(os.environ.get('COUNTER_FLUSH_INTERVAL_MS', '10000'))
+COUNTER_MAX_SHARDS = int(os.environ.get('COUNTER_MAX_SHARDS', '64'))
+# 다른 컨테이너가 늘린 샤드 수를 다시 확인하는 간격
+COUNTER_SHARDS_TTL_MS = int(os.environ.get('COUNTER_SHARDS_TTL_MS', str(5 * 60 * 1000)))
+COUNTER_BUCKET_MS = 5 * 60 * 1000
+
+class ThrottledError(Exception):
+    """재시도 예산/토큰 소진으로 포기한 스로틀"""
+
+class PayloadTooLarge(Exception):
+    """배치가 MAX_BATCH_EVENTS / MAX_BATCH_BYTES 를 넘음 (일부만 처리하지 않고 통째로 413)"""
+
+class ThrottleBucket:
+    """관측된 스로틀을 반영하는 클라이언트 측 토큰 버킷 (컨테이너 수명 동안 유지)"""
+    
+    def __init__(self, capacity, refill_per_second, throttle_cost):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.throttle_cost = throttle_cost
+        self.tokens = capacity
+        self.updated = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+    
+    def on_throttle(self):
+        """스로틀 1회 반영 → 재시도 가능 여부 (토큰이 모자라면 재시도하지 않음)"""
+        self._refill()
+        allowed = self.tokens >= self.throttle_cost
+        self.tokens = max(0.0, self.tokens - self.throttle_cost)
+        return allowed
+    
+    def level(self):
+        """잔량 비율 (1 이면 스로틀 없음)"""
+        self._refill()
+        return self.tokens / self.capacity if self.capacity else 1.0
+
+throttle_bucket = ThrottleBucket(THROTTLE_BUCKET_CAPACITY, THROTTLE_BUCKET_REFILL, THROTTLE_COST)
+
+# session_id → 이 컨테이너가 마지막으로 활성 세션을 갱신한 시각(ms), LRU
+active_session_refreshed = OrderedDict()
+
+class RecentIds:
+    """최근 처리한 이벤트 ID (크기와 시간 창으로 제한한 LRU)"""
+    
+    def __init__(self, max_size, window_ms):
+        self.max_size = max_size
+        self.window_ms = window_ms
+        self.seen = OrderedDict()
+        self.stats = {'checked': 0, 'hits': 0}
+    
+    def __contains__(self, event_id):
+        self.stats['checked'] += 1
+        seen_at = self.seen.get(event_id)
+        if seen_at is None or time.time() * 1000 - seen_at > self.window_ms:
+            return False
+        self.stats['hits'] += 1
+        return True
+    
+    def add(self, event_id):
+        self.seen[event_id] = time.time() * 1000
+        self.seen.move_to_end(event_id)
+        while len(self.seen) > self.max_size:
+            self.seen.popitem(last=False)
+
+recent_event_ids = RecentIds(DEDUP_CACHE_SIZE, DEDUP_WINDOW_MS)
+
+class SessionAggregator:
+    """이 컨테이너가 아는 세션과 아직 반영하지 않은 변경분
+
+    변경분은 ADD total_events 와 조건부 SET last_activity 로 반영하므로
+    여러 컨테이너가 같은 세션을 나눠 처리해도 이벤트 수가 덮어써지거나
+    마지막 활동 시각이 뒤로 가지 않는다.
+    """
+    
+    def __init__(self, flush_interval_ms, max_sessions):
+        self.flush_interval_ms = flush_interval_ms
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self.stats = {'events': 0, 'flushes': 0}
+    
+    def __contains__(self, session_id):
+        return session_id in self.sessions
+    
+    def exit_page(self, session_id):
+        return self.sessions[session_id]['exit_page']
+    
+    def track(self, session_id, exit_page):
+        """저장소에 있는 세션을 변경분 없이 등록"""
+        self.sessions[session_id] = {'events': 0, 'last_activity': None, 'exit_page': exit_page, 'since': None}
+        self._evict()
+    
+    def record(self, event_data, count=1):
+        entry = self.sessions[event_data['session_id']]
+        self.sessions.move_to_end(event_data['session_id'])
+        entry['events'] += count
+        entry['last_activity'] = max(entry['last_activity'] or 0, event_data['timestamp'])
+        entry['exit_page'] = event_data['page_url']
+        if entry['since'] is None:
+            entry['since'] = time.time() * 1000
+        self.stats['events'] += count
+    
+    def _evict(self):
+        # 방금 등록한 세션은 제외하고 오래된 것부터
+        for session_id in list(self.sessions)[:-1]:
+            if len(self.sessions) <= self.max_sessions:
+                return
+            self.flush(session_id)
+            # 반영하지 못한 변경분은 남겨 다음에 재시도 (그동안 상한을 잠시 넘을 수 있음)
+            if self.sessions[session_id]['since'] is None:
+                self.sessions.pop(session_id)
+    
+    def due(self):
+        """간격이 지난 변경분 (하트비트로 늘어난 세션 길이만 있으면 다음 이벤트/종료 때 함께 반영)"""
+        now_ms = time.time() * 1000
+        return [
+            session_id for session_id, entry in self.sessions.items()
+            if entry['events'] and now_ms - entry['since'] >= self.flush_interval_ms
+        ]
+    
+    def pending(self):
+        return [session_id for session_id, entry in self.sessions.items() if entry['since'] is not None]
+    
+    def flush(self, session_id):
+        """변경분 UpdateItem → 아낀 쓰기 수 (실패하면 변경분을 남겨 다음에 재시도)"""
+        entry = self.sessions.get(session_id)
+        if entry is None or entry['since'] is None:
+            return 0
+        key = {'session_id': session_id}
+        values = {':last': entry['last_activity'], ':page': entry['exit_page'], ':active': True}
+        update = 'SET last_activity = :last, exit_page = :page, session_duration = :last - start_time, is_active = :active'
+        if entry['events']:
+            update += ' ADD total_events :n'
+            values[':n'] = entry['events']
+        try:
+            with timer.phase('flush_session'):
+                try:
+                    safe_dynamodb_operation(lambda: sessions_table.update_item(
+                        Key=key,
+                        UpdateExpression=update,
+                        ConditionExpression='attribute_exists(session_id) AND last_activity <= :last',
+                        ExpressionAttributeValues=values
+                    ))
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+                    # 다른 컨테이너가 더 최근 활동을 이미 반영 → 이벤트 수만 더함
+                    if entry['events']:
+                        safe_dynamodb_operation(lambda: sessions_table.update_item(
+                            Key=key,
+                            UpdateExpression='ADD total_events :n',
+                            ConditionExpression='attribute_exists(session_id)',
+                            ExpressionAttributeValues={':n': entry['events']}
+                        ))
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Session flush error: {e}")
+                return 0
+        except ThrottledError as e:
+            print(f"Session flush error: {e}")
+            return 0
+        
+        saved = max(entry['events'] - 1, 0)
+        entry.update(events=0, last_activity=None, since=None)
+        self.stats['flushes'] += 1
+        timer.count('session_flushes')
+        timer.count('session_writes_saved', saved)
+        return saved
+
+session_aggregator = SessionAggregator(SESSION_FLUSH_INTERVAL_MS, SESSION_CACHE_SIZE)
+
+def flush_sessions(session_ids):
+    saved = sum(session_aggregator.flush(session_id) for session_id in session_ids)
+    if saved:
+        put_custom_metric('SessionWritesSaved', saved)
+
+class ShardedCounters:
+    """쓰기 샤딩 카운터 (counter_id = '<이름>#<샤드>', 샤드 수는 '<이름>#shards' 아이템의 shards, 없으면 1)
+
+    증가분은 컨테이너에서 모아 flush 때 카운터마다 임의의 샤드 하나에 ADD 한다.
+    샤드 쓰기가 스로틀되면 샤드 수를 두 배로 늘려 먼저 저장하고 (읽는 쪽이 새 샤드까지 합산하도록)
+    증가분은 남겨 다음 flush 에서 새 샤드 범위로 다시 쓴다. 샤드 수는 줄이지 않는다.
+    큐 재전달처럼 같은 이벤트를 다시 처리하면 다시 세므로 카운터는 근사치다.
+    """
+    
+    def __init__(self, table, flush_interval_ms, max_shards, shards_ttl_ms):
+        self.table = table
+        self.flush_interval_ms = flush_interval_ms
+        self.max_shards = max_shards
+        self.shards_ttl_ms = shards_ttl_ms
+        self.pending = {}
+        self.since = None
+        # 이름 → (샤드 수, 확인 시각 ms)
+        self.shards = {}
+        self.random = random.Random(os.urandom(8))
+        self.stats = {'writes': 0, 'throttles': 0, 'grown': 0}
+    
+    def add(self, name, amount=1):
+        self.pending[name] = self.pending.get(name, 0) + amount
+        if self.since is None:
+            self.since = time.time() * 1000
+    
+    def due(self):
+        return self.since is not None and time.time() * 1000 - self.since >= self.flush_interval_ms
+    
+    def shard_counts(self, names):
+        """이름 → 샤드 수 (오래된 값은 BatchGetItem 으로 한 번에 다시 확인)"""
+        now_ms = time.time() * 1000
+        stale = [
+            name for name in names
+            if name not in self.shards or now_ms - self.shards[name][1] > self.shards_ttl_ms
+        ]
+        for start in range(0, len(stale), 100):
+            chunk = stale[start:start + 100]
+            request = {self.table.name: {
+                'Keys': [{'counter_id': f"{name}#shards"} for name in chunk],
+                'ProjectionExpression': 'counter_id, shards'
+            }}
+            found = {}
+            while request:
+                response = safe_dynamodb_operation(lambda: dynamodb.batch_get_item(RequestItems=request))
+                for item in response.get('Responses', {}).get(self.table.name, []):
+                    found[item['counter_id'].rsplit('#', 1)[0]] = int(item['shards'])
+                request = response.get('UnprocessedKeys') or None
+            for name in chunk:
+                known = self.shards.get(name, (1, 0))[0]
+                self.shards[name] = (max(found.get(name, 1), known), now_ms)
+        return {name: self.shards[name][0] for name in names}
+    
+    def flush(self):
+        """모은 증가분 반영 → 쓴 카운터 수 (실패분은 남겨 다음 flush 에서)"""
+        pending, self.pending, self.since = self.pending, {}, None
+        if not pending:
+            return 0
+        try:
+            shards = self.shard_counts(list(pending))
+        except (ClientError, ThrottledError) as e:
+            print(f"Counter shard lookup error: {e}")
+            self._restore(pending)
+            return 0
+        
+        written = 0
+        for name, amount in pending.items():
+            shard = self.random.randrange(shards[name])
+            try:
+                with timer.phase('flush_counters'):
+                    self.table.update_item(
+                        Key={'counter_id': f"{name}#{shard}"},
+                        UpdateExpression='ADD #count :n',
+                        ExpressionAttributeNames={'#count': 'count'},
+                        ExpressionAttributeValues={':n': amount}
+                    )
+            except ClientError as e:
+                self._restore({name: amount})
+                if e.response['Error']['Code'] not in THROTTLE_ERROR_CODES:
+                    print(f"Counter write error: {e}")
+                    continue
+                # 재시도로 같은 샤드를 두드리지 않고 샤드를 늘린 뒤 다음 flush 에서
+                timer.count('counter_throttles')
+                self.stats['throttles'] += 1
+                self.grow(name, shards[name])
+                continue
+            written += 1
+        self.stats['writes'] += written
+        timer.count('counter_writes', written)
+        return written
+    
+    def _restore(self, pending):
+        for name, amount in pending.items():
+            self.add(name, amount)
+    
+    def grow(self, name, current):
+        """샤드 수를 두 배로 (다른 컨테이너가 이미 늘렸으면 다음 확인 때 반영)"""
+        target = min(current * 2, self.max_shards)
+        if target <= current:
+            return
+        try:
+            self.table.update_item(
+                Key={'counter_id': f"{name}#shards"},
+                UpdateExpression='SET shards = :n',
+                ConditionExpression='attribute_not_exists(shards) OR shards < :n',
+                ExpressionAttributeValues={':n': target}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Counter shard grow error: {e}")
+            self.shards.pop(name, None)
+            return
+        self.shards[name] = (target, time.time() * 1000)
+        self.stats['grown'] += 1
+
+counters = ShardedCounters(
+    counters_table, COUNTER_FLUSH_INTERVAL_MS, COUNTER_MAX_SHARDS, COUNTER_SHARDS_TTL_MS
+) if counters_table is not None else None
+
+def counter_names(event_data):
+    """이벤트가 올리는 카운터 (5분 버킷 이벤트 수, 페이지 조회 수)"""
+    bucket_ms = event_data['timestamp'] // COUNTER_BUCKET_MS * COUNTER_BUCKET_MS
+    bucket = datetime.fromtimestamp(bucket_ms / 1000, tz=timezone.utc)
+    names = [f"events#{bucket.strftime('%Y%m%d%H%M')}"]
+    if event_data['event_type'] == 'page_view' and event_data['page_url']:
+        names.append(f"pageviews#{event_data['page_url'][:512]}")
+    return names
+
+def count_event(event_data):
+    if counters is not None:
+        for name in counter_names(event_data):
+            counters.add(name)
+
+def flush_counters(force=False):
+    if counters is not None and (force or counters.due()):
+        counters.flush()
+
+def shutdown(signum=None, frame=None):
+    """컨테이너 종료 전 남은 세션 변경분 / 카운터 증가분 반영"""
+    flush_sessions(session_aggregator.pending())
+    flush_counters(force=True)
+    if callable(previous_sigterm_handler):
+        previous_sigterm_handler(signum, frame)
+    elif signum is not None and previous_sigterm_handler != signal.SIG_IGN:
+        # 이전 핸들러가 SIG_DFL (또는 None) 이면 기본 동작대로 종료
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        os.kill(os.getpid(), signal.SIGTERM)
+
+# Lambda 는 외부 확장이 등록된 경우에만 회수 직전 런타임에 SIGTERM 을 보낸다
+# (main.tf 의 종료 알림 확장 레이어, infrastructure/lambda-extension)
+previous_sigterm_handler = None
+if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+    previous_sigterm_handler = signal.signal(signal.SIGTERM, shutdown)
+
+class PhaseTimer:
+    """호출 단계별 소요 시간(ms)과 재시도/스로틀 횟수"""
+    
+    def __init__(self, retry_deadline=None):
+        self.phases = {}
+        self.counters = {'retries': 0, 'throttles': 0}
+        self.retry_deadline = retry_deadline or time.monotonic() + RETRY_BUDGET_MS / 1000
+    
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.phases[name] = round(self.phases.get(name, 0) + elapsed, 3)
+    
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def fields(self):
+        """log_event 에 넣을 구조화 필드"""
+        global cold_start
+        fields = {'phases': self.phases, **self.counters, 'cold_start': cold_start}
+        if cold_start:
+            fields['init_ms'] = INIT_DURATION_MS
+            cold_start = False
+        return fields
+
+# Crockford base32 (ULID 표기), 10비트씩 두 글자 단위로 변환
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_BASE32_PAIRS = [a + b for a in CROCKFORD_BASE32 for b in CROCKFORD_BASE32]
+
+class IdGenerator:
+    """ULID 형식 ID (48비트 ms 시각 + 80비트 난수, 26자)
+
+    같은 ms 안에서는 난수부를 1씩 올려 컨테이너 안에서 단조 증가한다.
+    난수는 컨테이너마다 os.urandom 으로 시드한 random 모듈에서 얻는다.
+    """
+    
+    def __init__(self):
+        self.random = random.Random(os.urandom(16))
+        self.last_ms = 0
+        self.last_random = 0
+    
+    def new(self):
+        now_ms = int(time.time() * 1000)
+        if now_ms > self.last_ms:
+            self.last_ms = now_ms
+            self.last_random = self.random.getrandbits(80)
+        else:
+            # 같은 ms (또는 시계 역행): 이전 ID 바로 다음 값
+            self.last_random += 1
+            if self.last_random >> 80:
+                self.last_ms += 1
+                self.last_random = 0
+        return self.encode(self.last_ms, self.last_random)
+    
+    def derive(self, timestamp_ms, seed):
+        """seed 로 정해지는 ID (큐 메시지가 다시 전달돼도 같은 ID)"""
+        digest = hashlib.blake2b(seed.encode('utf-8'), digest_size=10).digest()
+        return self.encode(timestamp_ms, int.from_bytes(digest, 'big'))
+    
+    @staticmethod
+    def encode(timestamp_ms, random_bits):
+        value = (timestamp_ms << 80) | random_bits
+        return ''.join([_BASE32_PAIRS[(value >> shift) & 0x3FF] for shift in range(120, -1, -10)])
+
+ids = IdGenerator()
+
+class SqsQueue:
+    def __init__(self, client, url):
+        self.client = client
+        self.url = url
+    
+    def send(self, body):
+        self.client.send_message(QueueUrl=self.url, MessageBody=body)
+
+class FileQueue:
+    """로컬용 큐: 메시지를 NDJSON 파일에 추가"""
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def send(self, body):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(body + '\n')
+
+def make_queue(url):
+    if not url:
+        return None
+    if url.startswith('file://'):
+        return FileQueue(url[len('file://'):])
+    return SqsQueue(boto3.client('sqs'), url)
+
+ingest_queue = make_queue(INGEST_QUEUE_URL)
+
+# 현재 호출의 단계 타이머 (컨테이너는 한 번에 요청 하나만 처리)
+timer = PhaseTimer()
+
+# 전역 초기화 소요 시간과 첫 호출 여부
+INIT_DURATION_MS = round((time.time() - INIT_STARTED) * 1000, 3)
+cold_start = True
 
 def lambda_handler(event, context):
+    global timer
     start_time = time.time()
     request_id = context.aws_request_id
+    timer = PhaseTimer()
     
     # CORS 헤더 필수
     headers = {
@@ -36,46 +559,50 @@ def lambda_handler(event, context):
         # OPTIONS 요청 처리
         if event['httpMethod'] == 'OPTIONS':
             log_event('INFO', 'CORS preflight request', request_id=request_id)
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({'message': 'CORS preflight'})
-            }
+            return build_response(200, {'message': 'CORS preflight'}, headers, event)
         
-        # POST 요청 처리
+        # POST 요청 처리 (단일 이벤트 JSON 또는 트래커 배치 봉투, gzip 가능)
         if event['httpMethod'] == 'POST':
-            body = json.loads(event['body'])
-            
-            # 이벤트 데이터 생성
-            event_data = create_event_data(body, event)
+            with timer.phase('parse'):
+                bodies, batched = decode_request(event)
             
-            # 세션 관리
-            session_data = manage_session(event_data)
+            if ingest_queue is not None:
+                return enqueue_events(bodies, event, start_time, request_id, headers)
             
-            # 데이터 저장
-            save_event_data(event_data, session_data)
-            
-            # 메트릭 전송
-            processing_time = time.time() - start_time
-            put_custom_metric('EventsProcessed', 1)
-            put_custom_metric('ProcessingTime', processing_time * 1000, 'Milliseconds')
+            if batched:
+                response = process_batch(bodies, event, request_id, headers)
+            else:
+                status, payload = process_event(bodies[0], event, start_time, request_id)
+                response = build_response(status, payload, headers, event)
             
-            log_event('INFO', 'Event processed successfully',
-                     event_id=event_data['event_id'],
-                     session_id=event_data['session_id'],
-                     processing_time=processing_time,
-                     request_id=request_id)
-            
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps({
-                    'message': 'Event processed successfully',
-                    'event_id': event_data['event_id'],
-                    'session_id': event_data['session_id']
-                })
-            }
+            # 간격이 지난 세션 변경분 / 카운터 증가분 반영
+            flush_sessions(session_aggregator.due())
+            flush_counters()
+            return response
             
+    except ThrottledError as e:
+        # 대기하며 Lambda 를 붙잡지 않고 클라이언트가 나중에 재전송하도록
+        processing_time = time.time() - start_time
+        put_custom_metric('ProcessingThrottled', 1)
+        put_custom_metric('DynamoDBThrottles', timer.counters['throttles'])
+        
+        log_event('WARNING', 'Event processing throttled',
+                 error=str(e),
+                 processing_time=processing_time,
+                 request_id=request_id,
+                 **timer.fields())
+        
+        return build_response(503, {
+            'error': 'Throttled',
+            'throttles': timer.counters['throttles']
+        }, dict(headers, **{'Retry-After': '1'}), event)
+    
+    except PayloadTooLarge as e:
+        # 잘라서 일부만 저장하면 클라이언트는 나머지가 버려진 것을 알 수 없음
+        put_custom_metric('PayloadTooLarge', 1)
+        log_event('WARNING', 'Payload too large', error=str(e), request_id=request_id)
+        return build_response(413, {'error': str(e), 'max_events': MAX_BATCH_EVENTS}, headers, event)
+    
     except Exception as e:
         processing_time = time.time() - start_time
         put_custom_metric('ProcessingErrors', 1)
@@ -83,41 +610,445 @@ def lambda_handler(event, context):
         log_event('ERROR', 'Event processing failed',
                  error=str(e),
                  processing_time=processing_time,
-                 request_id=request_id)
+                 request_id=request_id,
+                 **timer.fields())
         
-        return {
-            'statusCode': 500,
-            'headers': headers,
-            'body': json.dumps({'error': str(e)})
-        }
+        return build_response(500, {'error': str(e)}, headers, event)
     
-    return {
-        'statusCode': 405,
-        'headers': headers,
-        'body': json.dumps({'error': 'Method not allowed'})
+    return build_response(405, {'error': 'Method not allowed'}, headers, event)
+
+def process_event(body, event, start_time, request_id):
+    """이벤트 하나 처리 → (상태 코드, 응답 본문)"""
+    if TRACE_SAMPLE_RATE and random.random() < TRACE_SAMPLE_RATE:
+        record_trace(body, event)
+    
+    # 이벤트 데이터 생성
+    with timer.phase('create_event_data'):
+        event_data = create_event_data(body, event)
+    
+    # 클라이언트가 ID 를 준 이벤트의 재전송은 쓰기 없이 성공 처리
+    client_event = event_data.pop('client_event', False)
+    if client_event and event_data['event_id'] in recent_event_ids:
+        return duplicate_event(event_data, 'memory', start_time, request_id)
+    
+    # 스로틀 압력이 높으면 우선순위 낮은 이벤트부터 폐기
+    shed = shed_decision(event_data)
+    if shed:
+        return shed_event(event_data, shed, start_time, request_id)
+    
+    if event_data['event_type'] == 'heartbeat' and event_data.get('session_id'):
+        result = process_heartbeat(event_data, start_time, request_id)
+        if client_event:
+            recent_event_ids.add(event_data['event_id'])
+        return result
+    
+    # 세션 관리
+    session_data = manage_session(event_data)
+    
+    # 데이터 저장 (다른 컨테이너가 이미 저장한 재전송이면 조건부 쓰기가 거절)
+    saved = save_event_data(event_data, session_data, conditional=client_event)
+    if client_event:
+        recent_event_ids.add(event_data['event_id'])
+    if not saved:
+        return duplicate_event(event_data, 'conditional', start_time, request_id)
+    count_event(event_data)
+    if event_data['event_type'] == 'page_exit':
+        # 탭을 닫는 중일 수 있으므로 바로 반영
+        flush_sessions([event_data['session_id']])
+    
+    # 메트릭 전송
+    processing_time = time.time() - start_time
+    with timer.phase('metrics'):
+        put_custom_metric('EventsProcessed', 1)
+        put_custom_metric('ProcessingTime', processing_time * 1000, 'Milliseconds')
+        if timer.counters['throttles']:
+            put_custom_metric('DynamoDBThrottles', timer.counters['throttles'])
+    
+    log_event('INFO', 'Event processed successfully',
+             event_id=event_data['event_id'],
+             session_id=event_data['session_id'],
+             processing_time=processing_time,
+             request_id=request_id,
+             **timer.fields())
+    
+    return 200, {
+        'message': 'Event processed successfully',
+        'event_id': event_data['event_id'],
+        'session_id': event_data['session_id'],
+        'throttles': timer.counters['throttles']
+    }
+
+def process_batch(bodies, event, request_id, headers):
+    """배치 봉투의 이벤트를 순서대로 처리 (이벤트마다 단계 타이머, 재시도 예산은 호출 전체 공유)"""
+    global timer
+    retry_deadline = timer.retry_deadline
+    counts = {'accepted': 0, 'duplicates': 0, 'shed': 0, 'failed': 0}
+    issued = {}
+    session_id = None
+    
+    for index, body in enumerate(bodies):
+        if index:
+            timer = PhaseTimer(retry_deadline)
+        # 앞 이벤트에서 새로 발급된 세션 ID 를 뒤 이벤트에도 적용
+        original = body.get('session_id')
+        if original in issued:
+            body['session_id'] = issued[original]
+        
+        start_time = time.time()
+        try:
+            status, payload = process_event(body, event, start_time, request_id)
+        except ThrottledError as e:
+            # 남은 이벤트는 더 시도하지 않음 (스로틀 중 Lambda 를 붙잡지 않도록)
+            counts['failed'] = len(bodies) - index
+            put_custom_metric('ProcessingThrottled', 1)
+            log_event('WARNING', 'Event processing throttled',
+                     error=str(e),
+                     processing_time=time.time() - start_time,
+                     request_id=request_id,
+                     **timer.fields())
+            break
+        
+        if status == 202:
+            counts['shed'] += 1
+        elif payload.get('duplicate'):
+            counts['duplicates'] += 1
+        else:
+            counts['accepted'] += 1
+        session_id = payload.get('session_id') or session_id
+        if original and session_id and session_id != original:
+            issued[original] = session_id
+    
+    body = {'message': 'Batch processed', 'session_id': session_id, 'events': len(bodies), **counts}
+    if counts['failed'] and not counts['accepted']:
+        return build_response(503, body, dict(headers, **{'Retry-After': '1'}), event)
+    return build_response(200, body, headers, event)
+
+def duplicate_event(event_data, dedup, start_time, request_id):
+    """이미 처리한 이벤트 → (200, 응답 본문)"""
+    processing_time = time.time() - start_time
+    with timer.phase('metrics'):
+        put_custom_metric('DuplicatesSkipped' if dedup == 'memory' else 'DuplicatesRejected', 1)
+    
+    log_event('INFO', 'Duplicate event',
+             event_id=event_data['event_id'],
+             dedup=dedup,
+             dedup_hit_rate=recent_event_ids.stats['hits'] / max(recent_event_ids.stats['checked'], 1),
+             processing_time=processing_time,
+             request_id=request_id,
+             **timer.fields())
+    
+    return 200, {
+        'message': 'Duplicate event ignored',
+        'event_id': event_data['event_id'],
+        'session_id': event_data['session_id'],
+        'duplicate': True,
+        'throttles': timer.counters['throttles']
+    }
+
+def enqueue_events(bodies, event, start_time, request_id, headers):
+    """검증한 이벤트를 큐 메시지 하나로 넣고 바로 202 (DynamoDB 는 기다리지 않음)"""
+    if not bodies:
+        return build_response(400, {'error': 'Invalid event payload'}, headers, event)
+    for index, body in enumerate(bodies):
+        error = invalid_queued_body(body)
+        if error:
+            return build_response(400, {'error': error, 'index': index}, headers, event)
+    
+    message = {
+        'received_at': int(time.time() * 1000),
+        'ip': get_client_ip(event),
+        'events': bodies
+    }
+    with timer.phase('enqueue'):
+        ingest_queue.send(to_json(message))
+    
+    log_event('INFO', 'Events enqueued',
+             events=len(bodies),
+             processing_time=time.time() - start_time,
+             request_id=request_id,
+             **timer.fields())
+    
+    return build_response(202, {
+        'message': 'Events accepted',
+        'events': len(bodies),
+        'session_id': bodies[0].get('session_id')
+    }, headers, event)
+
+def invalid_queued_body(body):
+    """큐에 넣을 이벤트 본문 검증 → 오류 메시지 (문제없으면 None)"""
+    if not isinstance(body, dict):
+        return 'Invalid event payload'
+    for field in QUEUED_REQUIRED_FIELDS:
+        if not isinstance(body.get(field), str) or not body[field]:
+            return f"Missing or invalid field: {field}"
+    if not CLIENT_EVENT_ID_PATTERN.match(body['session_id']):
+        return 'Invalid field: session_id'
+    for field in QUEUED_STRING_FIELDS:
+        if body.get(field) is not None and not isinstance(body[field], str):
+            return f"Invalid field: {field}"
+    timestamp = body.get('timestamp')
+    if timestamp is not None and (isinstance(timestamp, bool) or not isinstance(timestamp, int)):
+        return 'Invalid field: timestamp'
+    return None
+
+def event_priority(event_type):
+    return EVENT_PRIORITY.get(event_type, DEFAULT_EVENT_PRIORITY)
+
+def shed_decision(event_data):
+    """버킷 잔량에 따른 처리 방식 (None: 정상 처리, 'dropped': 폐기)"""
+    priority = event_priority(event_data['event_type'])
+    if priority <= 1:
+        return None
+    level = throttle_bucket.level()
+    if priority >= 3 and level < SHED_HEARTBEAT_BELOW:
+        return 'dropped'
+    if level < SHED_LOW_PRIORITY_BELOW:
+        return 'dropped'
+    return None
+
+def shed_event(event_data, shed, start_time, request_id):
+    """덜어낸 이벤트 → (202, 응답 본문)"""
+    processing_time = time.time() - start_time
+    with timer.phase('metrics'):
+        put_custom_metric('EventsShed', 1)
+    
+    log_event('INFO', 'Event shed',
+             event_type=event_data['event_type'],
+             session_id=event_data['session_id'],
+             shed=shed,
+             processing_time=processing_time,
+             request_id=request_id,
+             **timer.fields())
+    
+    return 202, {
+        'message': 'Event shed under load',
+        'session_id': event_data['session_id'],
+        'shed': shed,
+        'throttles': timer.counters['throttles']
+    }
+
+def process_heartbeat(event_data, start_time, request_id):
+    """하트비트: Events/Sessions 쓰기 없이 활성 세션 last_activity 와 만료만 갱신
+
+    Sessions 에 없는 세션 (클라이언트가 만든 ID 등) 은 활성 세션 행을 만들지 않고 무시한다.
+    """
+    known = known_session(event_data['session_id'])
+    refreshed = False
+    if known:
+        # 이벤트 수는 늘리지 않고 세션 길이만 반영
+        session_aggregator.record(event_data, count=0)
+        refreshed = refresh_active_session(event_data)
+    
+    processing_time = time.time() - start_time
+    with timer.phase('metrics'):
+        if not known:
+            put_custom_metric('HeartbeatsUnknownSession', 1)
+        else:
+            put_custom_metric('HeartbeatWrites' if refreshed else 'HeartbeatsCoalesced', 1)
+    
+    log_event('INFO', 'Heartbeat processed',
+             session_id=event_data['session_id'],
+             known=known,
+             refreshed=refreshed,
+             processing_time=processing_time,
+             request_id=request_id,
+             **timer.fields())
+    
+    return 200, {
+        'message': 'Heartbeat recorded' if known else 'Unknown session',
+        'session_id': event_data['session_id'],
+        'refreshed': refreshed,
+        'throttles': timer.counters['throttles']
     }
 
-def create_event_data(body, event):
-    """이벤트 데이터 생성 및 검증"""
-    now = datetime.now()
-    timestamp = int(now.timestamp() * 1000)
-    event_id = f"evt_{now.strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+def refresh_active_session(event_data, force=False):
+    """세션당 HEARTBEAT_MIN_INTERVAL_MS 에 한 번만 UpdateItem → 실제 쓰기 여부 (known_session 인 세션만)"""
+    session_id = event_data['session_id']
+    timestamp = event_data['timestamp']
+    last = active_session_refreshed.get(session_id)
+    if not force and last is not None and timestamp - last < HEARTBEAT_MIN_INTERVAL_MS:
+        return False
+    
+    expires_at = int((datetime.now() + ACTIVE_SESSION_TTL).timestamp())
+    try:
+        with timer.phase('refresh_active_session'):
+            safe_dynamodb_operation(
+                lambda: active_sessions_table.update_item(
+                    Key={'session_id': session_id},
+                    UpdateExpression='SET last_activity = :ts, activity_minute = :minute, expires_at = :exp, '
+                                     'current_page = :page, user_id = if_not_exists(user_id, :uid)',
+                    ExpressionAttributeValues={
+                        ':ts': timestamp,
+                        ':minute': activity_minute(timestamp),
+                        ':exp': expires_at,
+                        ':page': event_data['page_url'],
+                        ':uid': event_data['user_id']
+                    }
+                )
+            )
+    except (ClientError, ThrottledError) as e:
+        print(f"Heartbeat refresh error: {e}")
+        return False
+    mark_active_session_refreshed(session_id, timestamp)
+    return True
+
+def mark_active_session_refreshed(session_id, timestamp):
+    active_session_refreshed[session_id] = timestamp
+    active_session_refreshed.move_to_end(session_id)
+    if len(active_session_refreshed) > HEARTBEAT_CACHE_SIZE:
+        active_session_refreshed.popitem(last=False)
+
+def read_body(event):
+    """요청 본문 바이트 추출 (바이너리 미디어 타입 설정 시 base64 로 전달됨)"""
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        return base64.b64decode(body)
+    return body.encode('utf-8')
+
+def decode_request(event):
+    """요청 본문 → (이벤트 본문 목록, 배치 여부)
+
+    gzip 본문은 매직 바이트로 판별한다 (sendBeacon 은 CORS preflight 를 피하려고
+    text/plain 으로 보내므로 Content-Encoding 을 쓰지 않음).
+    """
+    raw = read_body(event)
+    if raw[:2] == b'\x1f\x8b':
+        decompressor = zlib.decompressobj(wbits=31)
+        raw = decompressor.decompress(raw, MAX_BATCH_BYTES)
+        if decompressor.unconsumed_tail:
+            raise PayloadTooLarge(f"Decompressed body exceeds {MAX_BATCH_BYTES} bytes")
+    payload = json.loads(raw)
+    if isinstance(payload, dict) and payload.get('v') == BATCH_VERSION and isinstance(payload.get('events'), list):
+        return expand_batch(payload), True
+    return [payload], False
+
+def expand_batch(envelope):
+    """배치 봉투 → 이벤트 본문 목록
+
+    {"v": 1, "user_id", "session_id", "user_agent", "id_prefix", "sent_at": 전송 시각 (클라이언트 ms),
+     "events": [{"event_type", "seq", "dt": 전송 시각 대비 ms (0 이하), "page_url" (생략 시 직전 이벤트와 같음), ...}]}
+
+    id_prefix + seq 는 클라이언트 이벤트 ID, sent_at + dt 는 클라이언트 기준 발생 시각이 된다.
+    """
+    if len(envelope['events']) > MAX_BATCH_EVENTS:
+        raise PayloadTooLarge(f"Batch has {len(envelope['events'])} events (max {MAX_BATCH_EVENTS})")
+    common = {field: envelope[field] for field in BATCH_COMMON_FIELDS if envelope.get(field) is not None}
+    id_prefix = envelope.get('id_prefix')
+    sent_at = envelope.get('sent_at')
+    bodies = []
+    page_url = None
+    for item in envelope['events']:
+        if not isinstance(item, dict):
+            continue
+        body = dict(common)
+        body.update(item)
+        page_url = body.setdefault('page_url', page_url or '')
+        body['offset_ms'] = body.pop('dt', 0)
+        seq = body.pop('seq', None)
+        if id_prefix and seq is not None:
+            body['event_id'] = f"{id_prefix}.{seq}"
+            if isinstance(sent_at, int) and isinstance(body['offset_ms'], (int, float)):
+                body['timestamp'] = sent_at + int(body['offset_ms'])
+        bodies.append(body)
+    return bodies
+
+def record_trace(body, event):
+    """수신 본문을 트레이스 로그로 기록 (tests/performance/event_trace.py extract 로 추출)"""
+    log_event('INFO', 'Trace request',
+             trace={
+                 't': int(time.time() * 1000),
+                 'ip': get_client_ip(event),
+                 'body': body
+             })
+
+def to_json(data):
+    """JSON 직렬화 (orjson 사용 가능 시 빠른 경로, Decimal 은 숫자로)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=decimal_default).decode('utf-8')
+    return json.dumps(data, default=decimal_default, separators=(',', ':'))
+
+def decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def build_response(status_code, body, headers, event=None):
+    """API Gateway 응답 생성 (큰 응답은 Accept-Encoding 에 따라 gzip 압축)"""
+    payload = to_json(body)
+    response = {
+        'statusCode': status_code,
+        'headers': dict(headers),
+        'body': payload
+    }
+    
+    request_headers = {k.lower(): v for k, v in ((event or {}).get('headers') or {}).items()}
+    accepts_gzip = 'gzip' in request_headers.get('accept-encoding', '')
+    if accepts_gzip and len(payload) >= RESPONSE_COMPRESSION_MIN_BYTES:
+        response['headers']['Content-Encoding'] = 'gzip'
+        response['headers']['Vary'] = 'Accept-Encoding'
+        response['body'] = base64.b64encode(gzip.compress(payload.encode('utf-8'), mtime=0)).decode('ascii')
+        response['isBase64Encoded'] = True
+    return response
+
+def create_event_data(body, event, received_at=None, id_seed=None):
+    """이벤트 데이터 생성 및 검증
+
+    클라이언트 이벤트 ID 가 있으면 재전송돼도 같은 키 (event_id, timestamp) 가 되도록
+    ID 와 클라이언트 시각을 사용한다 (시계 오차가 MAX_CLIENT_SKEW_MS 를 넘으면 수신 시각 기준).
+    큐 소비자는 수집기의 수신 시각(received_at, ms)과 메시지별 id_seed 를 넘겨
+    같은 메시지를 다시 처리해도 같은 아이템이 되게 한다.
+    """
+    now = datetime.fromtimestamp(received_at / 1000) if received_at else datetime.now()
+    client_event_id = body.get('event_id')
+    if not isinstance(client_event_id, str) or not CLIENT_EVENT_ID_PATTERN.match(client_event_id):
+        client_event_id = None
+    client_timestamp = body.get('timestamp')
+    
+    if client_event_id and isinstance(client_timestamp, int) \
+            and abs(client_timestamp - now.timestamp() * 1000) <= MAX_CLIENT_SKEW_MS:
+        timestamp = client_timestamp
+    else:
+        offset_ms = body.get('offset_ms')
+        if isinstance(offset_ms, (int, float)) and offset_ms < 0:
+            # 배치 이벤트: 수신 시각 기준 상대 시각 (클라이언트 시계 오차 영향 없음)
+            now += timedelta(milliseconds=max(offset_ms, -MAX_EVENT_DELAY_MS))
+        timestamp = int(now.timestamp() * 1000)
+    
+    if client_event_id:
+        event_id = f"evt_c_{client_event_id}"
+    elif id_seed:
+        event_id = f"evt_{ids.derive(timestamp, id_seed)}"
+    else:
+        event_id = f"evt_{ids.new()}"
+    user_id = body.get('user_id') or (
+        f"user_{ids.derive(timestamp, id_seed + ':user')}" if id_seed else f"user_{ids.new()}"
+    )
     
     # 클라이언트 IP 추출
     client_ip = get_client_ip(event)
     
     return {
         'event_id': event_id,
+        'client_event': client_event_id is not None,
         'timestamp': timestamp,
-        'user_id': body.get('user_id', f"user_{str(uuid.uuid4())[:8]}"),
+        'user_id': user_id,
         'session_id': body.get('session_id'),
         'event_type': body.get('event_type', 'page_view'),
         'page_url': body.get('page_url', ''),
         'referrer': body.get('referrer', ''),
         'user_agent': body.get('user_agent', ''),
-        'ip_address': client_ip
+        'ip_address': client_ip,
+        'time_bucket': time_bucket(timestamp)
     }
 
+def time_bucket(timestamp_ms):
+    """시간 버킷 키 (UTC 'YYYYMMDDHH', TimeBucketIndex 파티션 키)"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y%m%d%H')
+
+def activity_minute(timestamp_ms):
+    """활성 세션의 마지막 활동 분 (epoch 분, ActivityMinuteIndex 파티션 키)"""
+    return timestamp_ms // 60000
+
 def get_client_ip(event):
     """API Gateway에서 클라이언트 IP 추출"""
     headers = event.get('headers', {})
@@ -131,92 +1062,321 @@ def get_client_ip(event):
     return event.get('requestContext', {}).get('identity', {}).get('sourceIp', '127.0.0.1')
 
 def manage_session(event_data):
-    """세션 생성 및 관리"""
+    """세션 확인 및 생성 → 새 세션이면 저장할 세션 아이템, 기존 세션이면 None
+
+    기존 세션은 이 컨테이너가 처음 볼 때만 get_item 으로 확인하고,
+    변경분은 save_event_data 에서 session_aggregator 에 모은다.
+    """
     user_id = event_data['user_id']
     session_id = event_data.get('session_id')
     timestamp = event_data['timestamp']
     
-    if not session_id:
-        # 새 세션 생성
-        session_id = f"sess_{timestamp}_{user_id[:8]}"
-        event_data['session_id'] = session_id
-        
-        session_data = {
-            'session_id': session_id,
-            'user_id': user_id,
-            'start_time': timestamp,
-            'last_activity': timestamp,
-            'is_active': True,
-            'entry_page': event_data['page_url'],
-            'exit_page': event_data['page_url'],
-            'referrer': event_data['referrer'],
-            'total_events': 1,
-            'session_duration': 0,
-            'ip_address': event_data['ip_address']
-        }
-    else:
-        # 기존 세션 업데이트
-        try:
-            response = sessions_table.get_item(Key={'session_id': session_id})
-            if 'Item' in response:
-                session_data = response['Item']
-                session_data['last_activity'] = timestamp
-                session_data['exit_page'] = event_data['page_url']
-                session_data['total_events'] = int(session_data.get('total_events', 0)) + 1
-                session_data['session_duration'] = timestamp - int(session_data['start_time'])
-                session_data['is_active'] = True
-            else:
-                # 세션이 없으면 새로 생성
-                event_data['session_id'] = None
-                return manage_session(event_data)
-        except ClientError as e:
-            print(f"Session lookup error: {e}")
-            event_data['session_id'] = None
-            return manage_session(event_data)
+    if session_id and not known_session(session_id):
+        # 세션이 없으면 새로 생성
+        session_id = None
+    
+    if session_id:
+        # 기존 세션: 페이지가 바뀔 때만 바로, 아니면 간격을 두고 활성 세션 갱신
+        page_changed = session_aggregator.exit_page(session_id) != event_data['page_url']
+        refresh_active_session(event_data, force=page_changed)
+        return None
+    
+    # 새 세션 생성
+    session_id = f"sess_{ids.new()}"
+    event_data['session_id'] = session_id
+    
+    session_data = {
+        'session_id': session_id,
+        'user_id': user_id,
+        'start_time': timestamp,
+        'last_activity': timestamp,
+        'is_active': True,
+        'entry_page': event_data['page_url'],
+        'exit_page': event_data['page_url'],
+        'referrer': event_data['referrer'],
+        'total_events': 1,
+        'session_duration': 0,
+        'ip_address': event_data['ip_address']
+    }
     
     # 활성 세션 업데이트
     update_active_session(session_data)
     
     return session_data
 
+def known_session(session_id):
+    """Sessions 에 있는 세션인지 (이 컨테이너가 처음 볼 때만 get_item 후 session_aggregator 에 등록)"""
+    if session_id in session_aggregator:
+        return True
+    try:
+        with timer.phase('get_session'):
+            response = safe_dynamodb_operation(
+                lambda: sessions_table.get_item(Key={'session_id': session_id})
+            )
+    except ClientError as e:
+        print(f"Session lookup error: {e}")
+        return False
+    if 'Item' not in response:
+        return False
+    session_aggregator.track(session_id, response['Item'].get('exit_page'))
+    return True
+
 def update_active_session(session_data):
     """활성 세션 테이블 업데이트 (TTL 30분)"""
-    expires_at = int((datetime.now() + timedelta(minutes=30)).timestamp())
+    expires_at = int((datetime.now() + ACTIVE_SESSION_TTL).timestamp())
     
     active_session_data = {
         'session_id': session_data['session_id'],
         'user_id': session_data['user_id'],
         'last_activity': session_data['last_activity'],
+        'activity_minute': activity_minute(session_data['last_activity']),
         'current_page': session_data['exit_page'],
         'expires_at': expires_at
     }
     
     try:
-        active_sessions_table.put_item(Item=active_session_data)
-    except ClientError as e:
+        with timer.phase('update_active_session'):
+            safe_dynamodb_operation(
+                lambda: active_sessions_table.put_item(Item=active_session_data)
+            )
+        mark_active_session_refreshed(session_data['session_id'], session_data['last_activity'])
+    except (ClientError, ThrottledError) as e:
         print(f"Active session update error: {e}")
 
-def save_event_data(event_data, session_data):
-    """이벤트 및 세션 데이터 저장 (재시도 로직 포함)"""
+def save_event_data(event_data, session_data, conditional=False):
+    """이벤트 및 세션 데이터 저장 (재시도 로직 포함) → 저장 여부
+
+    새 세션(session_data)은 바로 저장하고, 기존 세션은 변경분만 session_aggregator 에 모은다.
+    conditional 이면 같은 키의 이벤트가 이미 있을 때 이벤트/세션 모두 쓰지 않고 False.
+    """
+    put_params = {'ConditionExpression': 'attribute_not_exists(event_id)'} if conditional else {}
     try:
         # 이벤트 저장
-        safe_dynamodb_operation(
-            lambda: events_table.put_item(Item=convert_to_dynamodb_format(event_data))
-        )
+        with timer.phase('put_event'):
+            try:
+                safe_dynamodb_operation(
+                    lambda: events_table.put_item(Item=convert_to_dynamodb_format(event_data), **put_params)
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    return False
+                raise
         
         # 세션 저장
-        safe_dynamodb_operation(
-            lambda: sessions_table.put_item(Item=convert_to_dynamodb_format(session_data))
-        )
+        if session_data is not None:
+            with timer.phase('put_session'):
+                safe_dynamodb_operation(
+                    lambda: sessions_table.put_item(Item=convert_to_dynamodb_format(session_data))
+                )
+            session_aggregator.track(session_data['session_id'], session_data['exit_page'])
+        else:
+            session_aggregator.record(event_data)
         
         log_event('DEBUG', 'Data saved successfully',
                  event_id=event_data['event_id'],
-                 session_id=session_data['session_id'])
+                 session_id=event_data['session_id'])
+        return True
         
     except Exception as e:
         log_event('ERROR', 'Save operation failed', error=str(e))
         raise e
 
+def consume_handler(event, context):
+    """수집 큐 소비자 (SQS 이벤트 소스 매핑)
+
+    메시지 묶음을 세션별로 모아 이벤트/새 세션/활성 세션은 BatchWriteItem 으로,
+    기존 세션 변경분은 세션당 UpdateItem 한 번으로 저장한다.
+    이벤트 ID 는 메시지 ID 로 정해지므로 재전달돼도 같은 아이템을 덮어쓴다.
+    읽지 못했거나 이벤트/세션을 쓰지 못한 메시지는 batchItemFailures 로 돌려줘 그 메시지만 재전달되게 한다.
+    """
+    global timer
+    start_time = time.time()
+    timer = PhaseTimer()
+    failed_messages = set()
+    
+    with timer.phase('parse'):
+        events = []
+        received = []
+        message_of = {}  # id(event_data) → 메시지 ID
+        for record in event.get('Records', []):
+            try:
+                message = json.loads(record['body'])
+                source = {'headers': {}, 'requestContext': {'identity': {'sourceIp': message.get('ip', '')}}}
+                parsed = []
+                for index, body in enumerate(message.get('events', [])):
+                    event_data = create_event_data(
+                        body, source, received_at=message['received_at'], id_seed=f"{record['messageId']}:{index}"
+                    )
+                    client_event = event_data.pop('client_event')
+                    if client_event and event_data['event_id'] in recent_event_ids:
+                        continue
+                    parsed.append(event_data)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                log_event('ERROR', 'Invalid queue message', message_id=record['messageId'], error=str(e))
+                failed_messages.add(record['messageId'])
+                continue
+            received.append(message['received_at'])
+            for event_data in parsed:
+                message_of[id(event_data)] = record['messageId']
+            events.extend(parsed)
+        events.sort(key=lambda event_data: event_data['timestamp'])
+    
+    with timer.phase('sessionize'):
+        new_sessions, active_sessions, stored_events = sessionize(events)
+    session_messages = {}
+    for event_data in events:
+        session_messages.setdefault(event_data['session_id'], set()).add(message_of[id(event_data)])
+    
+    with timer.phase('put_events'):
+        failed = batch_put_items(
+            events_table, [convert_to_dynamodb_format(event_data) for event_data in stored_events],
+            ('event_id', 'timestamp')
+        )
+    failed_events = set()
+    for event_data in stored_events:
+        if (event_data['event_id'], event_data['timestamp']) in failed:
+            failed_events.add(id(event_data))
+            failed_messages.add(message_of[id(event_data)])
+    
+    with timer.phase('put_sessions'):
+        failed = batch_put_items(
+            sessions_table, [convert_to_dynamodb_format(session_data) for session_data in new_sessions.values()],
+            ('session_id',)
+        )
+        expires_at = int((datetime.now() + ACTIVE_SESSION_TTL).timestamp())
+        failed |= batch_put_items(active_sessions_table, [{
+            'session_id': session_id,
+            'user_id': event_data['user_id'],
+            'last_activity': event_data['timestamp'],
+            'activity_minute': activity_minute(event_data['timestamp']),
+            'current_page': event_data['page_url'],
+            'expires_at': expires_at
+        } for session_id, event_data in active_sessions.items()], ('session_id',))
+    for (session_id,) in failed:
+        failed_messages.update(session_messages.get(session_id, ()))
+    for session_id, event_data in active_sessions.items():
+        if (session_id,) not in failed:
+            mark_active_session_refreshed(session_id, event_data['timestamp'])
+    
+    for event_data in stored_events:
+        if id(event_data) in failed_events:
+            continue
+        if event_data['event_id'].startswith('evt_c_'):
+            recent_event_ids.add(event_data['event_id'])
+        count_event(event_data)
+    
+    # 이번 묶음의 기존 세션 변경분 반영 (실패분은 session_aggregator 에 남아 다음 호출에서)
+    flush_sessions([session_id for session_id in active_sessions if session_id not in new_sessions])
+    flush_counters()
+    
+    lag_ms = time.time() * 1000 - min(received) if received else 0
+    with timer.phase('metrics'):
+        put_custom_metric('EventsProcessed', len(stored_events))
+        put_custom_metric('QueueLag', lag_ms, 'Milliseconds')
+    
+    log_event('INFO', 'Queue batch processed',
+             messages=len(received),
+             events=len(events),
+             stored=len(stored_events),
+             new_sessions=len(new_sessions),
+             failed_messages=len(failed_messages),
+             lag_ms=lag_ms,
+             processing_time=time.time() - start_time,
+             request_id=context.aws_request_id,
+             **timer.fields())
+    
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in sorted(failed_messages)]}
+
+def sessionize(events):
+    """시각순 이벤트 → (새 세션 아이템, 세션별 마지막 이벤트, 저장할 이벤트)
+
+    이 컨테이너가 모르는 세션은 BatchGetItem 으로 한 번에 확인한다. 큐 경로에서는 클라이언트가
+    발급된 ID 를 받을 수 없으므로 저장소에 없는 클라이언트 세션 ID 는 그대로 새 세션 ID 로 쓴다.
+    """
+    unknown = {
+        event_data['session_id'] for event_data in events
+        if event_data['session_id'] and event_data['session_id'] not in session_aggregator
+    }
+    for session_id, item in batch_get_sessions(unknown).items():
+        session_aggregator.track(session_id, item.get('exit_page'))
+    
+    new_sessions = {}
+    active_sessions = {}
+    stored_events = []
+    for event_data in events:
+        session_id = event_data['session_id']
+        if not session_id or not CLIENT_EVENT_ID_PATTERN.match(session_id):
+            session_id = f"sess_{ids.derive(event_data['timestamp'], event_data['event_id'])}"
+            event_data['session_id'] = session_id
+        
+        if session_id in new_sessions:
+            session_data = new_sessions[session_id]
+            if event_data['event_type'] != 'heartbeat':
+                session_data['total_events'] += 1
+            session_data['last_activity'] = event_data['timestamp']
+            session_data['exit_page'] = event_data['page_url']
+            session_data['session_duration'] = event_data['timestamp'] - session_data['start_time']
+        elif session_id in session_aggregator:
+            session_aggregator.record(event_data, count=0 if event_data['event_type'] == 'heartbeat' else 1)
+        else:
+            new_sessions[session_id] = {
+                'session_id': session_id,
+                'user_id': event_data['user_id'],
+                'start_time': event_data['timestamp'],
+                'last_activity': event_data['timestamp'],
+                'is_active': True,
+                'entry_page': event_data['page_url'],
+                'exit_page': event_data['page_url'],
+                'referrer': event_data['referrer'],
+                'total_events': 0 if event_data['event_type'] == 'heartbeat' else 1,
+                'session_duration': 0,
+                'ip_address': event_data['ip_address']
+            }
+        
+        active_sessions[session_id] = event_data
+        if event_data['event_type'] != 'heartbeat':
+            stored_events.append(event_data)
+    
+    for session_id, session_data in new_sessions.items():
+        session_aggregator.track(session_id, session_data['exit_page'])
+    return new_sessions, active_sessions, stored_events
+
+def batch_get_sessions(session_ids):
+    """BatchGetItem (100 개씩, 미처리 키 재요청) → session_id: 아이템"""
+    found = {}
+    session_ids = list(session_ids)
+    for start in range(0, len(session_ids), 100):
+        request = {sessions_table.name: {
+            'Keys': [{'session_id': session_id} for session_id in session_ids[start:start + 100]],
+            'ProjectionExpression': 'session_id, exit_page'
+        }}
+        while request:
+            response = safe_dynamodb_operation(lambda: dynamodb.batch_get_item(RequestItems=request))
+            for item in response.get('Responses', {}).get(sessions_table.name, []):
+                found[item['session_id']] = item
+            request = response.get('UnprocessedKeys') or None
+    return found
+
+def batch_put_items(table, items, key_fields):
+    """BatchWriteItem (25 개씩, 같은 키는 마지막 것만, 미처리 아이템은 백오프 후 재요청) → 쓰지 못한 아이템의 키 집합"""
+    items = list({tuple(item[field] for field in key_fields): item for item in items}.values())
+    failed = set()
+    for start in range(0, len(items), BATCH_WRITE_ITEMS):
+        request = {table.name: [{'PutRequest': {'Item': item}} for item in items[start:start + BATCH_WRITE_ITEMS]]}
+        try:
+            for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+                if attempt:
+                    time.sleep(random.uniform(0, min(RETRY_CAP_MS, RETRY_BASE_MS * 2 ** attempt)) / 1000)
+                response = safe_dynamodb_operation(lambda: dynamodb.batch_write_item(RequestItems=request))
+                request = response.get('UnprocessedItems') or None
+                if not request:
+                    break
+        except (ClientError, ThrottledError) as e:
+            log_event('ERROR', 'Batch write failed', table=table.name, error=str(e))
+        for entry in (request or {}).get(table.name, []):
+            failed.add(tuple(entry['PutRequest']['Item'][field] for field in key_fields))
+    return failed
+
 def log_event(level, message, **kwargs):
     """구조화된 로깅"""
     log_data = {
@@ -250,18 +1410,21 @@ def put_custom_metric(metric_name, value, unit='Count'):
         logger.error(f"Failed to send metric {metric_name}: {str(e)}")
 
 def safe_dynamodb_operation(operation, max_retries=3):
-    """안전한 DynamoDB 작업 (재시도 로직)"""
+    """안전한 DynamoDB 작업 (스로틀 시 full jitter 재시도, 호출당 대기 예산 안에서만)"""
     for attempt in range(max_retries):
         try:
             return operation()
         except ClientError as e:
-            if e.response['Error']['Code'] == 'ProvisionedThroughputExceededException':
-                wait_time = 2 ** attempt
-                logger.warning(f"Throttled, retrying in {wait_time}s (attempt {attempt + 1})")
-                time.sleep(wait_time)
-                continue
-            raise e
-    raise Exception(f"Max retries ({max_retries}) exceeded")
+            if e.response['Error']['Code'] not in THROTTLE_ERROR_CODES:
+                raise e
+            timer.count('throttles')
+            retry_allowed = throttle_bucket.on_throttle()
+            wait_time = random.uniform(0, min(RETRY_CAP_MS, RETRY_BASE_MS * 2 ** attempt)) / 1000
+            if attempt + 1 >= max_retries or not retry_allowed \
+                    or time.monotonic() + wait_time > timer.retry_deadline:
+                raise ThrottledError(f"Throttled after {attempt + 1} attempts") from e
+            timer.count('retries')
+            time.sleep(wait_time)
 
 def convert_to_dynamodb_format(data):
     """Python 데이터를 DynamoDB 형식으로 변환"""
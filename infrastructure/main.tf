@@ -5,6 +5,10 @@ terraform {
       source  = "hashicorp/aws"
       version = "~> 5.0"
     }
+    archive = {
+      source  = "hashicorp/archive"
+      version = "~> 2.0"
+    }
   }
 }
 
@@ -41,6 +45,11 @@ resource "aws_dynamodb_table" "events" {
     type = "S"
   }
 
+  attribute {
+    name = "time_bucket"
+    type = "S"
+  }
+
   global_secondary_index {
     name            = "UserIndex"
     hash_key        = "user_id"
@@ -59,6 +68,16 @@ resource "aws_dynamodb_table" "events" {
     projection_type = "ALL"
   }
 
+  # 시간 범위 조회용 (time_bucket = UTC 'YYYYMMDDHH')
+  global_secondary_index {
+    name            = "TimeBucketIndex"
+    hash_key        = "time_bucket"
+    range_key       = "timestamp"
+    read_capacity   = 5
+    write_capacity  = 5
+    projection_type = "ALL"
+  }
+
   tags = {
     Name        = "LiveInsight-Events"
     Environment = "hackathon"
@@ -118,6 +137,27 @@ resource "aws_dynamodb_table" "active_sessions" {
     type = "S"
   }
 
+  attribute {
+    name = "activity_minute"
+    type = "N"
+  }
+
+  attribute {
+    name = "last_activity"
+    type = "N"
+  }
+
+  # 프레즌스 증분 동기화용 (activity_minute = last_activity 의 epoch 분)
+  # 지난 동기화 이후의 분마다 Query 하므로 테이블 크기가 아니라 그 사이 활동한 세션만큼만 읽는다
+  global_secondary_index {
+    name            = "ActivityMinuteIndex"
+    hash_key        = "activity_minute"
+    range_key       = "last_activity"
+    read_capacity   = 5
+    write_capacity  = 5
+    projection_type = "ALL"
+  }
+
   ttl {
     attribute_name = "expires_at"
     enabled        = true
@@ -130,6 +170,24 @@ resource "aws_dynamodb_table" "active_sessions" {
   }
 }
 
+# DynamoDB Counters 테이블 (쓰기 샤딩 핫 카운터: counter_id = '<이름>#<샤드>', '<이름>#shards')
+resource "aws_dynamodb_table" "counters" {
+  name         = "LiveInsight-Counters"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "counter_id"
+
+  attribute {
+    name = "counter_id"
+    type = "S"
+  }
+
+  tags = {
+    Name        = "LiveInsight-Counters"
+    Environment = "hackathon"
+    Project     = "LiveInsight"
+  }
+}
+
 # IAM 역할 (Lambda보다 먼저 생성)
 resource "aws_iam_role" "lambda_role" {
   name = "LiveInsight-Lambda-Role"
@@ -175,12 +233,15 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
           "dynamodb:GetItem",
           "dynamodb:Query",
           "dynamodb:Scan",
-          "dynamodb:UpdateItem"
+          "dynamodb:UpdateItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
         ]
         Resource = [
           aws_dynamodb_table.events.arn,
           aws_dynamodb_table.sessions.arn,
           aws_dynamodb_table.active_sessions.arn,
+          aws_dynamodb_table.counters.arn,
           "${aws_dynamodb_table.events.arn}/index/*",
           "${aws_dynamodb_table.sessions.arn}/index/*"
         ]
@@ -208,6 +269,20 @@ resource "aws_iam_role_policy" "lambda_cloudwatch" {
   })
 }
 
+# 종료 알림 확장 레이어: 외부 확장이 있어야 Lambda 가 회수 전에 런타임에 SIGTERM 을 보낸다
+data "archive_file" "shutdown_extension" {
+  type        = "zip"
+  source_dir  = "${path.module}/lambda-extension"
+  output_path = "${path.module}/lambda-extension.zip"
+}
+
+resource "aws_lambda_layer_version" "shutdown_extension" {
+  layer_name          = "LiveInsight-ShutdownExtension"
+  filename            = data.archive_file.shutdown_extension.output_path
+  source_code_hash    = data.archive_file.shutdown_extension.output_base64sha256
+  compatible_runtimes = ["python3.9"]
+}
+
 # Lambda 함수
 resource "aws_lambda_function" "event_collector" {
   filename         = "lambda_function.zip"
@@ -217,12 +292,16 @@ resource "aws_lambda_function" "event_collector" {
   runtime         = "python3.9"
   memory_size     = 512
   timeout         = 30
+  layers          = [aws_lambda_layer_version.shutdown_extension.arn]
 
   environment {
     variables = {
       EVENTS_TABLE          = aws_dynamodb_table.events.name
       SESSIONS_TABLE        = aws_dynamodb_table.sessions.name
       ACTIVE_SESSIONS_TABLE = aws_dynamodb_table.active_sessions.name
+      COUNTERS_TABLE        = aws_dynamodb_table.counters.name
+      TRACE_SAMPLE_RATE     = var.trace_sample_rate
+      INGEST_QUEUE_URL      = var.enable_ingest_queue ? aws_sqs_queue.ingest[0].url : ""
     }
   }
 
@@ -233,10 +312,104 @@ resource "aws_lambda_function" "event_collector" {
   }
 }
 
+# 수집 큐 (enable_ingest_queue): 수집기는 큐에 넣고 202, 소비자가 배치로 저장
+resource "aws_sqs_queue" "ingest_dlq" {
+  count                     = var.enable_ingest_queue ? 1 : 0
+  name                      = "LiveInsight-Ingest-DLQ"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Name        = "LiveInsight-Ingest-DLQ"
+    Environment = "hackathon"
+    Project     = "LiveInsight"
+  }
+}
+
+resource "aws_sqs_queue" "ingest" {
+  count = var.enable_ingest_queue ? 1 : 0
+  name  = "LiveInsight-Ingest"
+
+  # 소비자 타임아웃의 6배 (AWS 권장)
+  visibility_timeout_seconds = 180
+  receive_wait_time_seconds  = 20
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.ingest_dlq[0].arn
+    maxReceiveCount     = 5
+  })
+
+  tags = {
+    Name        = "LiveInsight-Ingest"
+    Environment = "hackathon"
+    Project     = "LiveInsight"
+  }
+}
+
+resource "aws_iam_role_policy" "lambda_sqs" {
+  count = var.enable_ingest_queue ? 1 : 0
+  name  = "LiveInsight-SQS-Policy"
+  role  = aws_iam_role.lambda_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage",
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = aws_sqs_queue.ingest[0].arn
+      }
+    ]
+  })
+}
+
+resource "aws_lambda_function" "ingest_consumer" {
+  count            = var.enable_ingest_queue ? 1 : 0
+  filename         = "lambda_function.zip"
+  function_name    = "LiveInsight-IngestConsumer"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "lambda_function.consume_handler"
+  runtime         = "python3.9"
+  memory_size     = 512
+  timeout         = 30
+  layers          = [aws_lambda_layer_version.shutdown_extension.arn]
+
+  environment {
+    variables = {
+      EVENTS_TABLE          = aws_dynamodb_table.events.name
+      SESSIONS_TABLE        = aws_dynamodb_table.sessions.name
+      ACTIVE_SESSIONS_TABLE = aws_dynamodb_table.active_sessions.name
+      COUNTERS_TABLE        = aws_dynamodb_table.counters.name
+    }
+  }
+
+  tags = {
+    Name        = "LiveInsight-IngestConsumer"
+    Environment = "hackathon"
+    Project     = "LiveInsight"
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "ingest_consumer" {
+  count                              = var.enable_ingest_queue ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.ingest[0].arn
+  function_name                      = aws_lambda_function.ingest_consumer[0].arn
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
 # API Gateway
 resource "aws_api_gateway_rest_api" "main" {
   name = "LiveInsight-API"
 
+  # 압축된 응답/요청 본문을 base64 로 주고받기 위해 바이너리 타입 허용
+  binary_media_types = ["*/*"]
+
   tags = {
     Name        = "LiveInsight-API"
     Environment = "hackathon"
@@ -28,11 +28,21 @@ output "active_sessions_table_arn" {
   value       = aws_dynamodb_table.active_sessions.arn
 }
 
+output "counters_table_name" {
+  description = "Name of the Counters DynamoDB table"
+  value       = aws_dynamodb_table.counters.name
+}
+
 output "lambda_function_name" {
   description = "Name of the Lambda function"
   value       = aws_lambda_function.event_collector.function_name
 }
 
+output "ingest_queue_url" {
+  description = "SQS ingest queue URL (empty when enable_ingest_queue is false)"
+  value       = var.enable_ingest_queue ? aws_sqs_queue.ingest[0].url : ""
+}
+
 output "api_gateway_url" {
   description = "API Gateway URL"
   value       = "https://${aws_api_gateway_rest_api.main.id}.execute-api.${var.aws_region}.amazonaws.com/prod"
@@ -20,4 +20,16 @@ variable "enable_web_app" {
   description = "Enable Django web application deployment"
   type        = bool
   default     = true
-}
\ No newline at end of file
+}
+
+variable "trace_sample_rate" {
+  description = "Fraction of collector requests logged as replay traces (0 disables)"
+  type        = number
+  default     = 0
+}
+
+variable "enable_ingest_queue" {
+  description = "Buffer collector writes through SQS and a batching consumer Lambda (collector answers 202)"
+  type        = bool
+  default     = false
+}
@@ -325,7 +325,9 @@ resource "aws_iam_role_policy" "ecs_task_dynamodb" {
           "dynamodb:Query",
           "dynamodb:Scan",
           "dynamodb:UpdateItem",
-          "dynamodb:DeleteItem"
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
         ]
         Resource = [
           "arn:aws:dynamodb:${var.aws_region}:*:table/LiveInsight-*"
@@ -435,6 +437,10 @@ resource "aws_ecs_task_definition" "app" {
           name  = "ACTIVE_SESSIONS_TABLE"
           value = "LiveInsight-ActiveSessions"
         },
+        {
+          name  = "COUNTERS_TABLE"
+          value = "LiveInsight-Counters"
+        },
         {
           name  = "STATIC_FILES_BUCKET"
           value = var.static_files_bucket
@@ -12,6 +12,7 @@ case $MODE in
     export EVENTS_TABLE=LiveInsight-Events
     export SESSIONS_TABLE=LiveInsight-Sessions
     export ACTIVE_SESSIONS_TABLE=LiveInsight-ActiveSessions
+    export COUNTERS_TABLE=LiveInsight-Counters
     
     echo "🌐 Server will be available at http://localhost:8000"
     python manage.py runserver 0.0.0.0:8000
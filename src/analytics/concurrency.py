@@ -0,0 +1,32 @@
+"""
+비동기 뷰에서 동기 boto3 호출을 동시에 실행하기 위한 헬퍼
+
+호출은 전용 스레드 풀에서 실행되며, 풀 크기가 프로세스 전체의 DynamoDB 동시 호출 상한이 된다.
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.DYNAMODB_MAX_CONCURRENCY,
+    thread_name_prefix='dynamodb'
+)
+
+
+async def run_db(func, *args, **kwargs):
+    """동기 함수를 DynamoDB 스레드 풀에서 실행 (요청 계측 contextvar 를 함께 전달)"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(context.run, func, *args, **kwargs))
+
+
+async def gather_db(*calls):
+    """(func, *args) 호출들을 동시에 실행하고 입력 순서대로 결과 반환
+
+    전체 지연 시간은 합이 아니라 가장 느린 호출에 맞춰진다.
+    """
+    return await asyncio.gather(*(run_db(*call) for call in calls))
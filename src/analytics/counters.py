@@ -0,0 +1,222 @@
+"""
+쓰기 샤딩 카운터 (DynamoDB Counters 테이블)
+
+5분 버킷 이벤트 수나 홈페이지 조회 수처럼 한 키에 쓰기가 몰리는 카운터를 여러 아이템에 나눠 쓴다.
+lambda_function.py 의 ShardedCounters 와 같은 키 구조를 쓴다.
+
+- '<이름>#<샤드>' 아이템의 count 속성에 ADD (샤드는 0 ~ 샤드 수-1 중 임의)
+- '<이름>#shards' 아이템의 shards 속성이 샤드 수 (없으면 1). 쓰는 쪽은 스로틀되면 두 배로 늘리고,
+  늘린 샤드 수를 먼저 저장한 뒤 새 샤드에 쓰므로 읽는 쪽은 저장된 샤드 수까지만 합산하면 된다.
+  쓰는 쪽은 샤드 수를 shards_ttl 동안 캐시하지만 (적은 샤드에 쓰는 것은 문제없음),
+  읽는 쪽은 매번 '#shards' 를 알고 있는 샤드들과 같은 BatchGetItem 으로 함께 읽고 늘어난 샤드만 한 번 더 읽는다.
+- 읽기는 모든 샤드 키를 BatchGetItem (100 개씩) 으로 병렬 조회해 합산한다.
+  UnprocessedKeys 는 지터를 준 지수 백오프 후 다시 요청한다.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+THROTTLE_ERROR_CODES = ('ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded')
+BUCKET_MS = 5 * 60 * 1000
+BATCH_GET_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 8
+BATCH_GET_BACKOFF = 0.05
+BATCH_GET_MAX_BACKOFF = 2.0
+
+
+def bucket_counter(timestamp_ms):
+    """timestamp_ms 가 속한 5분 버킷 (UTC) 의 이벤트 수 카운터 이름"""
+    bucket = datetime.fromtimestamp(timestamp_ms // BUCKET_MS * BUCKET_MS / 1000, tz=timezone.utc)
+    return f"events#{bucket.strftime('%Y%m%d%H%M')}"
+
+
+def recent_buckets(now_ms, points):
+    """현재 버킷까지 최근 points 개 5분 버킷 → [(버킷 시작 ms, 카운터 이름)] (오래된 것부터)"""
+    current = now_ms // BUCKET_MS * BUCKET_MS
+    starts = [current - (points - 1 - index) * BUCKET_MS for index in range(points)]
+    return [(start, bucket_counter(start)) for start in starts]
+
+
+def counter_names(event):
+    """이벤트가 올리는 카운터 (lambda_function.counter_names 와 같은 이름)"""
+    names = [bucket_counter(event['timestamp'])]
+    if event['event_type'] == 'page_view' and event['page_url']:
+        names.append(f"pageviews#{event['page_url'][:512]}")
+    return names
+
+
+def _is_throttle(error):
+    return error.response['Error']['Code'] in THROTTLE_ERROR_CODES
+
+
+class ShardedCounters:
+    """샤드 카운터 읽기 / 쓰기 (스레드 안전)"""
+
+    def __init__(self, dynamodb, table, max_shards=64, shards_ttl=300, max_workers=8):
+        self.dynamodb = dynamodb
+        self.table = table
+        self.max_shards = max_shards
+        self.shards_ttl = shards_ttl
+        self.max_workers = max_workers
+        # 이름 → (샤드 수, 확인 시각 monotonic)
+        self._shards = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._random = random.Random()
+        self.stats = {'writes': 0, 'throttles': 0, 'grown': 0}
+
+    # 샤드 수
+
+    def shard_counts(self, names):
+        """이름 → 샤드 수 (쓰기용, 오래된 값만 BatchGetItem 으로 다시 확인)"""
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                name for name in names
+                if name not in self._shards or now - self._shards[name][1] > self.shards_ttl
+            ]
+        if stale:
+            found = {
+                item['counter_id'].rsplit('#', 1)[0]: int(item['shards'])
+                for item in self._batch_get([f"{name}#shards" for name in stale], 'counter_id, shards')
+            }
+            with self._lock:
+                for name in stale:
+                    known = self._shards.get(name, (1, 0))[0]
+                    self._shards[name] = (max(found.get(name, 1), known), now)
+        with self._lock:
+            return {name: self._shards[name][0] for name in names}
+
+    def grow(self, name, current):
+        """샤드 수를 두 배로 저장 → 새 샤드 수 (다른 쓰기 주체가 먼저 늘렸으면 그 값)"""
+        target = min(current * 2, self.max_shards)
+        if target <= current:
+            return current
+        try:
+            self.table.update_item(
+                Key={'counter_id': f"{name}#shards"},
+                UpdateExpression='SET shards = :n',
+                ConditionExpression='attribute_not_exists(shards) OR shards < :n',
+                ExpressionAttributeValues={':n': target}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            with self._lock:
+                self._shards.pop(name, None)
+            return self.shard_counts([name])[name]
+        with self._lock:
+            self._shards[name] = (target, time.monotonic())
+            self.stats['grown'] += 1
+        return target
+
+    # 쓰기
+
+    def increment(self, increments):
+        """{이름: 증가분} 반영 (카운터당 UpdateItem 한 번, 스로틀되면 샤드를 늘려 한 번 더) → 반영하지 못한 증가분"""
+        if not increments:
+            return {}
+        shards = self.shard_counts(list(increments))
+        failed = {}
+        for name, amount in increments.items():
+            try:
+                try:
+                    self._add(name, amount, shards[name])
+                except ClientError as e:
+                    if not _is_throttle(e):
+                        raise
+                    with self._lock:
+                        self.stats['throttles'] += 1
+                    self._add(name, amount, self.grow(name, shards[name]))
+            except ClientError as e:
+                # 샤드를 늘린 뒤에도 스로틀되면 조용히 넘겨 호출한 쪽이 다음에 다시 쓰도록
+                if not _is_throttle(e):
+                    print(f"Error incrementing counter {name}: {e}")
+                failed[name] = amount
+        return failed
+
+    def _add(self, name, amount, shards):
+        with self._lock:
+            shard = self._random.randrange(shards)
+        self.table.update_item(
+            Key={'counter_id': f"{name}#{shard}"},
+            UpdateExpression='ADD #count :n',
+            ExpressionAttributeNames={'#count': 'count'},
+            ExpressionAttributeValues={':n': amount}
+        )
+        with self._lock:
+            self.stats['writes'] += 1
+
+    # 읽기
+
+    def get(self, names):
+        """이름 → 모든 샤드 합계 (저장된 샤드 수를 매번 함께 확인)"""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        with self._lock:
+            known = {name: self._shards.get(name, (1, 0))[0] for name in names}
+        # 샤드 수 아이템과 알고 있는 샤드를 한 번에 읽음
+        keys = [f"{name}#shards" for name in names]
+        keys += [f"{name}#{shard}" for name, count in known.items() for shard in range(count)]
+        totals = dict.fromkeys(names, 0)
+        stored = {}
+        self._sum_shards(keys, totals, stored)
+        # 다른 쓰기 주체가 늘린 샤드만 한 번 더
+        extra = [
+            f"{name}#{shard}"
+            for name in names
+            for shard in range(known[name], stored.get(name, 1))
+        ]
+        if extra:
+            self._sum_shards(extra, totals, stored)
+        now = time.monotonic()
+        with self._lock:
+            for name in names:
+                self._shards[name] = (max(stored.get(name, 1), known[name]), now)
+        return totals
+
+    def _sum_shards(self, counter_ids, totals, stored):
+        items = self._batch_get(counter_ids, 'counter_id, shards, #count', {'#count': 'count'})
+        for item in items:
+            name, suffix = item['counter_id'].rsplit('#', 1)
+            if suffix == 'shards':
+                stored[name] = int(item['shards'])
+            elif name in totals:
+                totals[name] += int(item.get('count', 0))
+
+    def _batch_get(self, counter_ids, projection, names=None):
+        """counter_id 목록을 100 개씩 나눠 병렬 BatchGetItem → 아이템 목록"""
+        chunks = [counter_ids[start:start + BATCH_GET_KEYS] for start in range(0, len(counter_ids), BATCH_GET_KEYS)]
+        if len(chunks) == 1:
+            return self._batch_get_chunk(chunks[0], projection, names)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='counters')
+        items = []
+        for result in self._executor.map(lambda chunk: self._batch_get_chunk(chunk, projection, names), chunks):
+            items.extend(result)
+        return items
+
+    def _batch_get_chunk(self, counter_ids, projection, names=None):
+        request = {'Keys': [{'counter_id': counter_id} for counter_id in counter_ids], 'ProjectionExpression': projection}
+        if names:
+            request['ExpressionAttributeNames'] = names
+        pending = {self.table.name: request}
+        items = []
+        attempt = 0
+        while pending:
+            if attempt >= BATCH_GET_MAX_ATTEMPTS:
+                raise RuntimeError(f"BatchGetItem on {self.table.name} left keys unprocessed after {attempt} attempts")
+            if attempt:
+                # 스로틀된 읽기를 바로 다시 두드리지 않도록 full jitter 백오프
+                time.sleep(random.uniform(0, min(BATCH_GET_MAX_BACKOFF, BATCH_GET_BACKOFF * 2 ** attempt)))
+            response = self.dynamodb.batch_get_item(RequestItems=pending)
+            items.extend(response.get('Responses', {}).get(self.table.name, []))
+            pending = response.get('UnprocessedKeys') or None
+            attempt += 1
+        return items
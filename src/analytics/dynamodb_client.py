@@ -1,9 +1,33 @@
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 from django.conf import settings
 from decimal import Decimal
 import json
+import time
 
-class DynamoDBClient:
+from .counters import ShardedCounters
+from .metrics import instrument_dynamodb
+from .query_planner import QueryPlan, plan_event_query, time_buckets
+from .storage import StorageBackend
+
+def _to_dynamodb(item):
+    """float 을 Decimal 로 변환 (boto3 는 float 을 받지 않음)"""
+    return {
+        key: Decimal(str(value)) if isinstance(value, float) else value
+        for key, value in item.items()
+    }
+
+def _bucket_position(buckets, bucket, newest_first):
+    """커서의 버킷 키 ('YYYYMMDDHH') 로 이어서 읽을 위치 (end 를 생략해 버킷 목록이 바뀌어도 같은 버킷부터)"""
+    if not isinstance(bucket, str):
+        return 0
+    for position, candidate in enumerate(buckets):
+        if (candidate <= bucket) if newest_first else (candidate >= bucket):
+            return position
+    return len(buckets)
+
+class DynamoDBClient(StorageBackend):
     def __init__(self):
         self.dynamodb = boto3.resource(
             'dynamodb',
@@ -14,26 +38,315 @@ class DynamoDBClient:
         self.events_table = self.dynamodb.Table(settings.EVENTS_TABLE)
         self.sessions_table = self.dynamodb.Table(settings.SESSIONS_TABLE)
         self.active_sessions_table = self.dynamodb.Table(settings.ACTIVE_SESSIONS_TABLE)
+        self.counters_table = self.dynamodb.Table(settings.COUNTERS_TABLE)
+        # 핫 카운터는 쓰기 샤딩 (Lambda 수집기와 같은 키 구조)
+        self.counters = ShardedCounters(
+            self.dynamodb, self.counters_table,
+            max_shards=settings.COUNTER_MAX_SHARDS,
+            shards_ttl=settings.COUNTER_SHARDS_TTL
+        )
+        instrument_dynamodb(self.dynamodb.meta.client)
     
-    def get_active_sessions(self):
+    def get_active_sessions(self, since_ms=None):
+        """아직 만료되지 않은 활성 세션 (TTL 삭제 전 아이템 제외, since_ms 이후 활동만 선택 가능)
+
+        since_ms 가 없으면 전체 Scan (프로세스당 최초 백필 1회), 있으면 ActivityMinuteIndex 를
+        since_ms 이후의 분마다 Query 해 그 사이 활동한 세션만 읽는다.
+        """
+        sessions = []
+        now = time.time()
+        not_expired = Attr('expires_at').gt(int(now))
         try:
-            response = self.active_sessions_table.scan()
-            return response.get('Items', [])
+            if since_ms is None:
+                operation = self.active_sessions_table.scan
+                requests = [{'FilterExpression': not_expired}]
+            else:
+                operation = self.active_sessions_table.query
+                # PRESENCE_TTL_SECONDS 보다 오래된 활동은 이미 만료
+                since_ms = max(int(since_ms), int(now * 1000) - settings.PRESENCE_TTL_SECONDS * 1000)
+                requests = [{
+                    'IndexName': 'ActivityMinuteIndex',
+                    'KeyConditionExpression': Key('activity_minute').eq(minute) & Key('last_activity').gt(since_ms),
+                    'FilterExpression': not_expired,
+                } for minute in range(since_ms // 60000, int(now * 1000) // 60000 + 1)]
+            for params in requests:
+                while True:
+                    response = operation(**params)
+                    sessions.extend(response.get('Items', []))
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            return sessions
         except Exception as e:
             print(f"Error getting active sessions: {e}")
-            return []
+            return sessions
+    
+    def ping(self):
+        """연결 확인용 최소 읽기 (실패 시 예외 발생)"""
+        self.active_sessions_table.scan(Limit=1, Select='COUNT')
+    
+    def put_events(self, events):
+        """batch_writer 로 25개씩 BatchWriteItem (미처리 아이템 자동 재시도, 같은 키는 마지막 것만)"""
+        with self.events_table.batch_writer(overwrite_by_pkeys=['event_id', 'timestamp']) as batch:
+            for event in events:
+                batch.put_item(Item=_to_dynamodb(event))
+    
+    def put_sessions(self, sessions):
+        with self.sessions_table.batch_writer(overwrite_by_pkeys=['session_id']) as batch:
+            for session in sessions:
+                batch.put_item(Item=_to_dynamodb(session))
+    
+    def merge_sessions(self, deltas):
+        """세션마다 ADD total_events + 조건부 SET (Lambda SessionAggregator 와 같은 방식)"""
+        failed = []
+        for delta in deltas:
+            try:
+                self._merge_session(_to_dynamodb(delta))
+            except ClientError as e:
+                print(f"Error merging session {delta['session_id']}: {e}")
+                failed.append(delta['session_id'])
+        return failed
     
-    def get_session_events(self, session_id):
+    def _merge_session(self, delta):
+        key = {'session_id': delta['session_id']}
+        values = {
+            ':user': delta['user_id'],
+            ':start': delta['start_time'],
+            ':entry': delta['entry_page'],
+            ':referrer': delta['referrer'],
+            ':n': delta['total_events'],
+        }
+        # 처음 만드는 쓰기 주체만 채우는 속성
+        initial = ('user_id = if_not_exists(user_id, :user), start_time = if_not_exists(start_time, :start), '
+                   'entry_page = if_not_exists(entry_page, :entry), referrer = if_not_exists(referrer, :referrer)')
         try:
-            response = self.events_table.query(
-                IndexName='SessionIndex',
-                KeyConditionExpression='session_id = :sid',
-                ExpressionAttributeValues={':sid': session_id}
+            stored = self.sessions_table.update_item(
+                Key=key,
+                UpdateExpression=f'SET {initial}, last_activity = :last, exit_page = :exit, is_active = :active, '
+                                 'session_duration = :last - if_not_exists(start_time, :start) ADD total_events :n',
+                ConditionExpression='attribute_not_exists(last_activity) OR last_activity <= :last',
+                ExpressionAttributeValues={
+                    **values, ':last': delta['last_activity'], ':exit': delta['exit_page'], ':active': True
+                },
+                ReturnValues='ALL_NEW'
+            )['Attributes']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # 다른 쓰기 주체가 더 최근 활동을 이미 반영 → 이벤트 수만 더함
+            stored = self.sessions_table.update_item(
+                Key=key,
+                UpdateExpression=f'SET {initial} ADD total_events :n',
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )['Attributes']
+        if stored['start_time'] <= delta['start_time']:
+            return
+        # 이 변경분에 저장된 것보다 이른 이벤트가 있음 → 시작 시각 / 진입 페이지를 앞당김
+        try:
+            self.sessions_table.update_item(
+                Key=key,
+                UpdateExpression='SET start_time = :start, entry_page = :entry, '
+                                 'session_duration = last_activity - :start',
+                ConditionExpression='start_time > :start',
+                ExpressionAttributeValues={':start': delta['start_time'], ':entry': delta['entry_page']}
             )
-            return response.get('Items', [])
-        except Exception as e:
-            print(f"Error getting session events: {e}")
-            return []
+        except ClientError as e:
+            # 조건 실패는 다른 쓰기 주체가 더 이른 값을 먼저 반영한 것. 이벤트 수는 이미 반영됐으므로 실패로 보지 않음
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error updating session start {delta['session_id']}: {e}")
+    
+    def put_active_sessions(self, sessions):
+        """ActiveSessions 저장 (증분 동기화용 activity_minute 포함, lambda_function.activity_minute 와 같은 값)"""
+        with self.active_sessions_table.batch_writer(overwrite_by_pkeys=['session_id']) as batch:
+            for session in sessions:
+                item = dict(session, activity_minute=int(session['last_activity']) // 60000)
+                batch.put_item(Item=_to_dynamodb(item))
+    
+    def increment_counters(self, increments):
+        return self.counters.increment(increments)
+    
+    def get_counters(self, names):
+        """모든 샤드를 BatchGetItem 으로 읽어 합산"""
+        return self.counters.get(names)
+    
+    def query_session_events(self, session_id, limit=100, exclusive_start_key=None, newest_first=False):
+        """세션 이벤트 한 페이지 조회 → (items, LastEvaluatedKey)"""
+        params = {
+            'IndexName': 'SessionIndex',
+            'KeyConditionExpression': Key('session_id').eq(session_id),
+            'ScanIndexForward': not newest_first,
+        }
+        if limit:
+            params['Limit'] = limit
+        if exclusive_start_key:
+            params['ExclusiveStartKey'] = exclusive_start_key
+        response = self.events_table.query(**params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+    
+    def scan_events_between(self, start_ms, end_ms, limit=20, exclusive_start_key=None, max_pages=10):
+        """시간 범위 이벤트 한 페이지 조회 → (items, 다음 시작 키)"""
+        plan = QueryPlan('scan', filter_expression=Attr('timestamp').between(start_ms, end_ms))
+        items, next_key, _ = self.query_events(plan, limit, exclusive_start_key, max_pages=max_pages)
+        return items, next_key
+    
+    def count_events_between(self, start_ms, end_ms):
+        """시간 범위 이벤트 수 (시간 버킷마다 Select='COUNT' Query, 인덱스가 없으면 Scan)"""
+        range_condition = Key('timestamp').between(start_ms, end_ms)
+        if settings.EVENTS_TIME_BUCKET_INDEX:
+            requests = [{
+                'IndexName': settings.EVENTS_TIME_BUCKET_INDEX,
+                'KeyConditionExpression': Key('time_bucket').eq(bucket) & range_condition,
+            } for bucket in time_buckets(start_ms, end_ms)]
+            operation = self.events_table.query
+        else:
+            requests = [{'FilterExpression': Attr('timestamp').between(start_ms, end_ms)}]
+            operation = self.events_table.scan
+        count = 0
+        for params in requests:
+            while True:
+                response = operation(Select='COUNT', **params)
+                count += response.get('Count', 0)
+                if 'LastEvaluatedKey' not in response:
+                    break
+                params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return count
+    
+    def get_event(self, event_id):
+        """event_id 로 단일 이벤트 조회"""
+        response = self.events_table.query(
+            KeyConditionExpression=Key('event_id').eq(event_id),
+            Limit=1
+        )
+        items = response.get('Items', [])
+        return items[0] if items else None
+    
+    def find_events(self, filters, limit=50, exclusive_start_key=None, newest_first=False):
+        """인덱스를 고려한 조회 계획을 세워 실행"""
+        plan = plan_event_query(
+            filters,
+            time_bucket_index=settings.EVENTS_TIME_BUCKET_INDEX,
+            max_buckets=settings.EVENTS_TIME_BUCKET_MAX
+        )
+        items, next_key, stats = self.query_events(
+            plan, limit=limit, exclusive_start_key=exclusive_start_key, newest_first=newest_first
+        )
+        stats['reason'] = plan.reason
+        return items, next_key, stats
+    
+    def query_events(self, plan, limit=50, exclusive_start_key=None, newest_first=False, max_pages=10):
+        """QueryPlan 실행 → (items, 다음 시작 키, 통계)
+
+        한 요청에서 읽는 페이지 수는 max_pages 로 제한하고, 다 채우지 못하면
+        현재 위치를 다음 시작 키로 돌려준다.
+        """
+        stats = {'plan': plan.describe(), 'consumed_capacity': 0.0, 'scanned_count': 0, 'pages': 0}
+        
+        if plan.kind == 'scan':
+            items, next_key, _ = self._collect_pages(
+                self.events_table.scan, {}, plan, limit, exclusive_start_key, stats, max_pages
+            )
+            return items, next_key, stats
+        
+        if plan.kind == 'query':
+            base = {
+                'IndexName': plan.index,
+                'KeyConditionExpression': plan.key_condition,
+                'ScanIndexForward': not newest_first,
+            }
+            items, next_key, _ = self._collect_pages(
+                self.events_table.query, base, plan, limit, exclusive_start_key, stats, max_pages
+            )
+            return items, next_key, stats
+        
+        # 시간 버킷별로 차례대로 Query (커서에 현재 버킷 키 포함)
+        buckets = list(reversed(plan.buckets)) if newest_first else plan.buckets
+        start_key = dict(exclusive_start_key or {})
+        bucket = start_key.pop('__bucket', None)
+        bucket_pos = _bucket_position(buckets, bucket, newest_first)
+        if bucket_pos >= len(buckets) or buckets[bucket_pos] != bucket:
+            # 커서의 버킷이 범위에 없으면 그 버킷 안의 시작 키도 쓸 수 없음
+            start_key = {}
+        items = []
+        while bucket_pos < len(buckets) and len(items) < limit:
+            key_condition = Key('time_bucket').eq(buckets[bucket_pos])
+            if plan.key_condition is not None:
+                key_condition = key_condition & plan.key_condition
+            base = {
+                'IndexName': plan.index,
+                'KeyConditionExpression': key_condition,
+                'ScanIndexForward': not newest_first,
+            }
+            page, next_key, done = self._collect_pages(
+                self.events_table.query, base, plan, limit - len(items), start_key or None, stats, max_pages
+            )
+            items.extend(page)
+            if not done:
+                next_key = dict(next_key or {})
+                next_key['__bucket'] = buckets[bucket_pos]
+                return items, next_key, stats
+            bucket_pos += 1
+            start_key = None
+        next_key = {'__bucket': buckets[bucket_pos]} if bucket_pos < len(buckets) else None
+        return items, next_key, stats
+    
+    def _collect_pages(self, fetch, base_params, plan, limit, start_key, stats, max_pages):
+        """필터 적용 후 limit 개가 찰 때까지 페이지 조회 → (items, 다음 시작 키, 소진 여부)"""
+        items = []
+        while stats['pages'] < max_pages:
+            # 필터가 있으면 Limit 은 필터 전 평가 개수이므로 넉넉하게 읽음
+            params = dict(base_params)
+            params['Limit'] = max(limit * 5, 100) if plan.filter_expression is not None else limit
+            params['ReturnConsumedCapacity'] = 'TOTAL'
+            if plan.filter_expression is not None:
+                params['FilterExpression'] = plan.filter_expression
+            if start_key:
+                params['ExclusiveStartKey'] = start_key
+            
+            response = fetch(**params)
+            stats['pages'] += 1
+            stats['scanned_count'] += response.get('ScannedCount', 0)
+            stats['consumed_capacity'] += float(response.get('ConsumedCapacity', {}).get('CapacityUnits', 0))
+            
+            page = response.get('Items', [])
+            start_key = response.get('LastEvaluatedKey')
+            remaining = limit - len(items)
+            if len(page) >= remaining:
+                items.extend(page[:remaining])
+                if len(page) > remaining or start_key:
+                    # 마지막으로 반환한 아이템 다음부터 이어서 읽도록 키 구성
+                    start_key = {attr: items[-1][attr] for attr in plan.key_attributes() if attr in items[-1]}
+                return items, start_key, start_key is None
+            items.extend(page)
+            if not start_key:
+                return items, None, True
+        return items, start_key, False
+    
+    def query_user_sessions(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        """사용자 세션 한 페이지 조회 (Sessions UserIndex) → (items, LastEvaluatedKey)"""
+        params = {
+            'IndexName': 'UserIndex',
+            'KeyConditionExpression': Key('user_id').eq(user_id),
+            'ScanIndexForward': not newest_first,
+            'Limit': limit,
+        }
+        if exclusive_start_key:
+            params['ExclusiveStartKey'] = exclusive_start_key
+        response = self.sessions_table.query(**params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+    
+    def query_user_events(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        """사용자 이벤트 한 페이지 조회 (Events UserIndex) → (items, LastEvaluatedKey)"""
+        params = {
+            'IndexName': 'UserIndex',
+            'KeyConditionExpression': Key('user_id').eq(user_id),
+            'ScanIndexForward': not newest_first,
+            'Limit': limit,
+        }
+        if exclusive_start_key:
+            params['ExclusiveStartKey'] = exclusive_start_key
+        response = self.events_table.query(**params)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
     
     def get_hourly_stats(self, hours=24):
         # 시간대별 통계 조회 (UTC 기준)
@@ -98,31 +411,13 @@ class DynamoDBClient:
             print(f"Error getting referrer stats: {e}")
             return []
     
-    def get_summary_stats(self):
+    def count_events(self):
+        """이벤트 테이블 전체 아이템 수"""
         try:
-            # 기본 통계 데이터
-            active_sessions = len(self.get_active_sessions())
-            
-            # 총 이벤트 수
             events_response = self.events_table.scan(
                 Select='COUNT'
             )
-            total_events = events_response.get('Count', 0)
-            
-            return {
-                'total_sessions': active_sessions,
-                'total_events': total_events,
-                'avg_session_time': '2분 30초',
-                'conversion_rate': '3.2%'
-            }
+            return events_response.get('Count', 0)
         except Exception as e:
-            print(f"Error getting summary stats: {e}")
-            return {
-                'total_sessions': 0,
-                'total_events': 0,
-                'avg_session_time': '0분',
-                'conversion_rate': '0%'
-            }
-
-# 싱글톤 인스턴스
-db_client = DynamoDBClient()
\ No newline at end of file
+            print(f"Error counting events: {e}")
+            return 0
@@ -0,0 +1,53 @@
+"""
+ULID 형식 이벤트 ID (lambda_function.py 의 IdGenerator 와 같은 형식)
+
+48비트 ms 시각 + 80비트 난수를 Crockford base32 26자로 표기한다. 시각순으로 정렬되고,
+같은 ms 안에서는 난수부를 1씩 올려 프로세스 안에서 단조 증가한다.
+"""
+
+import os
+import random
+import threading
+import time
+
+# Crockford base32 (ULID 표기), 10비트씩 두 글자 단위로 변환
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_BASE32_PAIRS = [a + b for a in CROCKFORD_BASE32 for b in CROCKFORD_BASE32]
+
+
+def encode(timestamp_ms, random_bits):
+    value = (timestamp_ms << 80) | random_bits
+    return ''.join([_BASE32_PAIRS[(value >> shift) & 0x3FF] for shift in range(120, -1, -10)])
+
+
+class IdGenerator:
+    """ULID 생성기 (스레드 안전, fork 된 워커는 난수를 다시 시드)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reseed()
+        if hasattr(os, 'register_at_fork'):
+            # gunicorn --preload 처럼 fork 된 워커끼리 같은 난수열을 쓰지 않도록
+            os.register_at_fork(after_in_child=self._reseed)
+
+    def _reseed(self):
+        self._random = random.Random(os.urandom(16))
+        self._last_ms = 0
+        self._last_random = 0
+
+    def new(self):
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = self._random.getrandbits(80)
+            else:
+                # 같은 ms (또는 시계 역행): 이전 ID 바로 다음 값
+                self._last_random += 1
+                if self._last_random >> 80:
+                    self._last_ms += 1
+                    self._last_random = 0
+            return encode(self._last_ms, self._last_random)
+
+
+ids = IdGenerator()
@@ -0,0 +1,389 @@
+"""
+Django 수집 경로 버퍼
+
+EventCollectionView 는 검증한 이벤트를 ingest_buffer 에 넣고 바로 202 로 응답한다.
+백그라운드 플러셔 스레드가 batch_size 개가 모이거나 flush_interval 초가 지나면
+이벤트를 db_client.put_events (DynamoDB BatchWriteItem) 로 묶어 저장하고,
+이번 플러시에서 바뀐 세션 변경분과 활성 세션도 merge_sessions / put_active_sessions 로 함께 쓴다.
+
+- 버퍼는 max_events 개로 제한되며, 가득 차면 offer() 가 False → 뷰가 429 로 응답한다.
+- 스로틀 / 5xx / 연결 오류로 실패한 묶음은 버퍼 앞으로 되돌려 백오프 후 성공할 때까지 다시 시도한다
+  (버퍼가 차면 429 로 역압). 그 밖의 오류 (검증 / 직렬화 오류 등) 는 재시도해도 소용없으므로 묶음을 한 건씩 다시 저장해
+  실패한 이벤트만 데드레터로 옮긴다 (WAL 이 있으면 슬롯의 dead-letter.ndjson 에 내구화한 뒤에만 체크포인트를 넘김).
+- 프로세스 종료 시 (gunicorn 워커 종료 등) atexit 에서 남은 이벤트를 모두 저장한다.
+- INGEST_WAL_DIR 을 지정하면 이벤트를 로컬 WAL (analytics.wal) 에 기록하고 그룹 커밋을 기다린 뒤 202 로 응답하며,
+  저장이 끝난 위치를 체크포인트로 남긴다. 워커가 시작할 때 (asgi.py / wsgi.py 에서 start()) 자기 슬롯의
+  체크포인트 이후 이벤트를 재생하고, 아무도 점유하지 않은 슬롯 (워커 수가 줄어든 경우) 의 이벤트도 가져온다.
+- 세션은 이 프로세스가 본 이벤트의 변경분 (이벤트 수 증가분, 가장 이른/늦은 활동) 만 보내고 저장소에서 합치므로
+  다른 워커나 Lambda 수집기가 같은 세션을 처리해도 서로 덮어쓰지 않는다.
+- 5분 버킷 이벤트 수 / 페이지 조회 수 카운터 증가분도 모아 플러시마다 increment_counters 로 한 번에 반영한다.
+"""
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
+from django.conf import settings
+
+from .counters import THROTTLE_ERROR_CODES, counter_names
+from .ids import ids
+from .metrics import ingest_events, ingest_flush_duration, ingest_wal_syncs
+from .serialization import dumps
+from .storage import db_client
+from .wal import open_slot, orphan_slots
+
+REQUIRED_FIELDS = ('user_id', 'session_id', 'event_type', 'timestamp')
+# 없으면 빈 문자열, 있으면 문자열이어야 함 (dict 나 float 은 저장 단계에서 실패해 버퍼를 막음)
+OPTIONAL_STRING_FIELDS = ('page_url', 'referrer', 'user_agent')
+# Lambda 수집기와 같은 규칙 (재전송돼도 같은 event_id)
+CLIENT_EVENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,64}$')
+MAX_BACKOFF_SECONDS = 30
+
+
+def _retryable(error):
+    """다시 시도하면 성공할 수 있는 저장 오류 (스로틀, 5xx, 연결 오류, SQLite 잠금) 인지"""
+    if isinstance(error, ClientError):
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        return error.response['Error']['Code'] in THROTTLE_ERROR_CODES or status >= 500
+    if isinstance(error, (BotocoreConnectionError, HTTPClientError)):
+        return True
+    return isinstance(error, sqlite3.OperationalError) and 'locked' in str(error)
+
+
+def client_ip(request):
+    forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def build_event(data, ip_address=''):
+    """요청 본문 → 이벤트 아이템 (Lambda 수집기와 같은 형태), 잘못된 본문이면 ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError('Invalid event payload')
+    for field in REQUIRED_FIELDS:
+        if field not in data:
+            raise ValueError(f'Missing required field: {field}')
+    try:
+        timestamp = int(data['timestamp'])
+    except (TypeError, ValueError):
+        raise ValueError('Invalid timestamp')
+    for field in OPTIONAL_STRING_FIELDS:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            raise ValueError(f'Invalid field: {field}')
+
+    client_event_id = data.get('event_id')
+    if isinstance(client_event_id, str) and CLIENT_EVENT_ID_PATTERN.match(client_event_id):
+        event_id = f"evt_c_{client_event_id}"
+    else:
+        event_id = f"evt_{ids.new()}"
+    return {
+        'event_id': event_id,
+        'timestamp': timestamp,
+        'user_id': str(data['user_id']),
+        'session_id': str(data['session_id']),
+        'event_type': str(data['event_type']),
+        'page_url': data.get('page_url') or '',
+        'referrer': data.get('referrer') or '',
+        'user_agent': data.get('user_agent') or '',
+        'ip_address': ip_address,
+        'time_bucket': datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y%m%d%H'),
+    }
+
+
+class IngestBuffer:
+    """메모리 상한이 있는 이벤트 버퍼와 백그라운드 배치 플러셔"""
+
+    def __init__(self, backend, batch_size=100, flush_interval=1.0, max_events=10000,
+                 session_ttl=1800, wal_factory=None, orphans_factory=None):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_events = max_events
+        self.session_ttl = session_ttl
+        # 워커 프로세스에서 시작할 때 WAL 을 열고 재생, 남겨진 슬롯 WAL 들을 가져옴
+        self.wal_factory = wal_factory
+        self.orphans_factory = orphans_factory
+        self.wal = None
+        self._events = deque()  # (이벤트, WAL LSN)
+        self._condition = threading.Condition()
+        # 플러셔 스레드와 close() 가 동시에 저장하지 않도록
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._attempts = 0  # 맨 앞 묶음의 연속 실패 횟수
+        self._sessions = {}  # session_id → 아직 반영하지 않은 세션 변경분
+        self._active = {}  # session_id → 아직 저장하지 않은 활성 세션
+        self._counters = {}  # 카운터 이름 → 아직 반영하지 않은 증가분
+
+    def __len__(self):
+        return len(self._events)
+
+    def offer(self, event):
+        """이벤트 추가 (버퍼가 가득 찼거나 닫혔으면 False, WAL 이 있으면 디스크 기록까지 대기)"""
+        self.start()
+        with self._condition:
+            if self._closed or len(self._events) >= self.max_events:
+                ingest_events.inc('rejected')
+                return False
+            # 버퍼와 WAL 의 순서가 같아야 체크포인트가 맞으므로 같은 잠금 안에서 기록
+            lsn = self.wal.append(dumps(event)) if self.wal is not None else None
+            self._events.append((event, lsn))
+            if len(self._events) >= self.batch_size:
+                self._condition.notify()
+        if lsn is not None and self.wal.commit(lsn):
+            ingest_wal_syncs.inc()
+        ingest_events.inc('accepted')
+        return True
+
+    def start(self):
+        """WAL 재생 후 플러셔 시작 (워커 프로세스마다 한 번, 이미 시작했으면 아무것도 안 함)"""
+        # gunicorn --preload 처럼 fork 된 워커에는 부모의 스레드가 없으므로 새로 시작
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                if self.wal_factory is not None:
+                    self.wal = self.wal_factory()
+                    self._replay()
+                    if self.orphans_factory is not None:
+                        self._adopt_orphans()
+                self._thread = threading.Thread(target=self._run, name='ingest-flusher', daemon=True)
+                self._thread.start()
+
+    def _replay(self):
+        """체크포인트 이후 (저장되지 않았을 수 있는) 이벤트를 버퍼 앞에 되돌림 (버퍼 상한 무시)"""
+        replayed = [(json.loads(payload), lsn) for lsn, payload in self.wal.replay()]
+        if replayed:
+            with self._condition:
+                self._events.extendleft(reversed(replayed))
+            ingest_events.inc('replayed', amount=len(replayed))
+            print(f"Replayed {len(replayed)} events from ingest WAL {self.wal.path}")
+
+    def _adopt_orphans(self):
+        """점유자가 없는 슬롯의 미저장 이벤트를 자기 WAL 로 옮겨 버퍼에 넣고 그 슬롯을 체크포인트"""
+        for orphan in self.orphans_factory():
+            try:
+                records = list(orphan.replay())
+                if not records:
+                    continue
+                with self._condition:
+                    for _, payload in records:
+                        lsn = self.wal.append(payload)
+                        self._events.append((json.loads(payload), lsn))
+                # 자기 WAL 에 내구화한 뒤에만 원래 슬롯을 비움
+                self.wal.commit(lsn)
+                orphan.checkpoint(records[-1][0])
+                ingest_events.inc('replayed', amount=len(records))
+                print(f"Adopted {len(records)} events from orphaned ingest WAL {orphan.path}")
+            finally:
+                orphan.close()
+
+    def _backoff(self):
+        return min(self.flush_interval * 2 ** self._attempts, MAX_BACKOFF_SECONDS)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._attempts:
+                    # 직전 저장이 실패했으면 버퍼가 차 있어도 백오프만큼 기다림 (offer 의 notify 로 깨지 않음)
+                    deadline = time.monotonic() + self._backoff()
+                    while not self._closed and time.monotonic() < deadline:
+                        self._condition.wait(deadline - time.monotonic())
+                elif not self._closed and len(self._events) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing ingest buffer: {e}")
+
+    def flush(self):
+        """지금까지 쌓인 이벤트를 batch_size 개씩 저장하고 세션 변경분 반영 → 저장한 이벤트 수"""
+        written = 0
+        checkpoint = None
+        with self._flush_lock:
+            started = time.perf_counter()
+            remaining = len(self._events)
+            while remaining > 0:
+                with self._condition:
+                    count = min(self.batch_size, len(self._events))
+                    batch = [self._events.popleft() for _ in range(count)]
+                stored = self._write_events(batch) if batch else None
+                if stored is None:
+                    break
+                remaining -= len(batch)
+                written += stored
+                checkpoint = batch[-1][1]
+            if checkpoint is not None:
+                self.wal.checkpoint(checkpoint)
+            if self._sessions or self._active:
+                self._write_sessions()
+            if self._counters:
+                self._write_counters()
+            if written:
+                ingest_flush_duration.observe(time.perf_counter() - started)
+        return written
+
+    def _write_events(self, batch):
+        """(이벤트, LSN) 묶음 저장 → 저장한 이벤트 수 (데드레터로 옮긴 것 제외), 묶음을 되돌려 뒀으면 None"""
+        events = [event for event, _ in batch]
+        try:
+            self.backend.put_events(events)
+        except Exception as e:
+            if _retryable(e):
+                return self._requeue(batch, e)
+            # 재시도해도 같은 오류 → 한 건씩 저장해 문제 이벤트만 빼냄
+            stored, rejected = [], []
+            for event in events:
+                try:
+                    self.backend.put_events([event])
+                except Exception as event_error:
+                    if _retryable(event_error):
+                        # 이미 저장한 이벤트는 다시 써도 같은 아이템이므로 묶음째 되돌림 (세션 / 카운터는 아직 반영 전)
+                        return self._requeue(batch, event_error)
+                    rejected.append(event)
+                    error = event_error
+                else:
+                    stored.append(event)
+            if rejected and not self._dead_letter(rejected, error):
+                return self._requeue(batch, error)
+            events = stored
+        self._attempts = 0
+        ingest_events.inc('written', amount=len(events))
+        self._aggregate(events)
+        return len(events)
+
+    def _requeue(self, batch, error):
+        """묶음을 버퍼 앞으로 되돌리고 다음 플러시를 백오프 → None"""
+        self._attempts += 1
+        print(f"Error writing ingest batch (attempt {self._attempts}): {error}")
+        with self._condition:
+            self._events.extendleft(reversed(batch))
+        return None
+
+    def _dead_letter(self, events, error):
+        """저장할 수 없는 이벤트를 버퍼에서 빼냄 → 빼냈는지 (WAL 이 있으면 데드레터 파일에 내구화한 뒤에만)"""
+        if self.wal is not None:
+            try:
+                path = self.wal.dead_letter(dumps(event) for event in events)
+            except OSError as e:
+                print(f"Error writing ingest dead letters: {e}")
+                return False
+            print(f"Error writing ingest batch, moved {len(events)} events to {path}: {error}")
+        else:
+            print(f"Error writing ingest batch, dropping {len(events)} events: {error}")
+        ingest_events.inc('failed', amount=len(events))
+        return True
+
+    def _aggregate(self, events):
+        """저장한 이벤트를 세션 변경분에 반영"""
+        for event in sorted(events, key=lambda event: event['timestamp']):
+            session_id = event['session_id']
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = {
+                    'session_id': session_id,
+                    'user_id': event['user_id'],
+                    'start_time': event['timestamp'],
+                    'last_activity': event['timestamp'],
+                    'is_active': True,
+                    'entry_page': event['page_url'],
+                    'exit_page': event['page_url'],
+                    'referrer': event['referrer'],
+                    'total_events': 0,
+                    'session_duration': 0,
+                }
+            if event['timestamp'] < session['start_time']:
+                session['start_time'] = event['timestamp']
+                session['entry_page'] = event['page_url']
+            if event['timestamp'] >= session['last_activity']:
+                session['last_activity'] = event['timestamp']
+                session['exit_page'] = event['page_url']
+            session['total_events'] += 1
+            session['session_duration'] = session['last_activity'] - session['start_time']
+            for name in counter_names(event):
+                self._counters[name] = self._counters.get(name, 0) + 1
+
+    def _write_sessions(self):
+        sessions, self._sessions = self._sessions, {}
+        expires_at = int(time.time()) + self.session_ttl
+        for session in sessions.values():
+            active = self._active.get(session['session_id'])
+            if active is None or active['last_activity'] <= session['last_activity']:
+                self._active[session['session_id']] = {
+                    'session_id': session['session_id'],
+                    'user_id': session['user_id'],
+                    'last_activity': session['last_activity'],
+                    'current_page': session['exit_page'],
+                    'expires_at': expires_at,
+                }
+        try:
+            failed = self.backend.merge_sessions(list(sessions.values()))
+        except Exception as e:
+            print(f"Error writing ingest sessions: {e}")
+            failed = list(sessions)
+        # 반영하지 못한 변경분만 남겨 다음 플러시에서 다시 (반영된 변경분을 다시 보내면 이벤트 수가 중복됨)
+        for session_id in failed:
+            self._sessions[session_id] = sessions[session_id]
+        try:
+            self.backend.put_active_sessions(list(self._active.values()))
+        except Exception as e:
+            print(f"Error writing ingest active sessions: {e}")
+            return
+        self._active.clear()
+
+    def _write_counters(self):
+        counters, self._counters = self._counters, {}
+        try:
+            failed = self.backend.increment_counters(counters)
+        except Exception as e:
+            print(f"Error writing ingest counters: {e}")
+            failed = counters
+        # 반영하지 못한 증가분은 다음 플러시에서 다시
+        for name, amount in failed.items():
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def close(self, timeout=10):
+        """새 이벤트를 받지 않고 남은 이벤트를 모두 저장 (프로세스 종료 시)"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        deadline = time.monotonic() + timeout
+        while (self._events or self._sessions or self._active or self._counters) and time.monotonic() < deadline:
+            if not self.flush():
+                time.sleep(min(0.1 * 2 ** self._attempts, 1))
+        if self.wal is not None and self._pid == os.getpid():
+            self.wal.close()
+
+
+ingest_buffer = IngestBuffer(
+    db_client,
+    batch_size=settings.INGEST_BATCH_SIZE,
+    flush_interval=settings.INGEST_FLUSH_INTERVAL,
+    max_events=settings.INGEST_MAX_BUFFER,
+    session_ttl=settings.PRESENCE_TTL_SECONDS,
+    wal_factory=(
+        lambda: open_slot(settings.INGEST_WAL_DIR, segment_bytes=settings.INGEST_WAL_SEGMENT_MB * 1024 * 1024)
+    ) if settings.INGEST_WAL_DIR else None,
+    orphans_factory=(
+        lambda: orphan_slots(settings.INGEST_WAL_DIR, segment_bytes=settings.INGEST_WAL_SEGMENT_MB * 1024 * 1024)
+    ) if settings.INGEST_WAL_DIR else None
+)
+atexit.register(ingest_buffer.close)
@@ -0,0 +1,70 @@
+"""
+TTL 이 있는 스레드 안전 LRU 캐시
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import record_cache
+
+_MISSING = object()
+
+
+class LRUCache:
+    """최대 크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거"""
+
+    def __init__(self, maxsize=1024, ttl=None, name=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # 요청 계측에 기록할 캐시 이름 (없으면 기록 안 함)
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] is not None and entry[1] < time.monotonic():
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if self.name:
+            record_cache(self.name, entry is not _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory, ttl=None):
+        """캐시에 없으면 factory() 결과를 저장 후 반환"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value, ttl)
+        return value
+
+    def delete_prefix(self, prefix):
+        """튜플 키의 첫 요소가 prefix 인 항목 제거 (사용자 단위 무효화)"""
+        with self._lock:
+            for key in [k for k in self._data if isinstance(k, tuple) and k and k[0] == prefix]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
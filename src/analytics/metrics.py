@@ -0,0 +1,367 @@
+"""
+요청 단위 성능 계측과 Prometheus 메트릭
+
+- RequestMetricsMiddleware: 요청마다 RequestMetrics 를 contextvar 로 열고,
+  끝나면 엔드포인트(URL name)별 메트릭에 반영하고 Server-Timing 헤더를 붙인다.
+- instrument_dynamodb(): boto3 이벤트 훅으로 DynamoDB 호출마다
+  ReturnConsumedCapacity=TOTAL 을 붙이고 지연 시간 / 용량 / 스캔·반환 아이템 / 응답 바이트를 기록한다.
+- record_cache(), timed(): 캐시 적중 여부와 집계 구간(벽시계 / CPU 시간) 기록.
+- metrics_view: /metrics (Prometheus 텍스트 형식)
+
+메트릭은 프로세스 메모리에 있으므로 gunicorn 워커가 여럿이면 워커별 값이다.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+# 초 단위 지연 시간 버킷
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# 요청당 소비 용량(RCU/WCU) 버킷
+CAPACITY_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+# 요청당 DynamoDB 호출 수 버킷
+CALL_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+# ReturnConsumedCapacity 를 받는 DynamoDB 작업
+CAPACITY_OPERATIONS = (
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems',
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.labels, label_values)} {value:g}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # {라벨 값: [버킷별 개수..., 합계, 개수]}
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for label_values, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state):
+                    cumulative += count
+                    labels = _format_labels(self.labels, label_values, [('le', f'{bound:g}')])
+                    lines.append(f'{self.name}_bucket{labels} {cumulative}')
+                labels = _format_labels(self.labels, label_values, [('le', '+Inf')])
+                lines.append(f'{self.name}_bucket{labels} {state[-1]}')
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f'{self.name}_sum{labels} {state[-2]:g}')
+                lines.append(f'{self.name}_count{labels} {state[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    'liveinsight_http_requests_total', 'HTTP requests', ('endpoint', 'method', 'status'))
+http_duration = registry.histogram(
+    'liveinsight_http_request_duration_seconds', 'HTTP request latency', ('endpoint',))
+request_capacity = registry.histogram(
+    'liveinsight_request_consumed_capacity', 'DynamoDB capacity units consumed per request',
+    ('endpoint',), buckets=CAPACITY_BUCKETS)
+request_calls = registry.histogram(
+    'liveinsight_request_dynamodb_calls', 'DynamoDB calls per request', ('endpoint',), buckets=CALL_BUCKETS)
+dynamodb_calls = registry.counter(
+    'liveinsight_dynamodb_calls_total', 'DynamoDB calls', ('endpoint', 'operation', 'table'))
+dynamodb_duration = registry.histogram(
+    'liveinsight_dynamodb_call_duration_seconds', 'DynamoDB call latency', ('operation', 'table'))
+dynamodb_capacity = registry.counter(
+    'liveinsight_dynamodb_consumed_capacity_total', 'DynamoDB capacity units consumed', ('endpoint', 'table'))
+dynamodb_scanned = registry.counter(
+    'liveinsight_dynamodb_items_scanned_total', 'Items read by Query/Scan before filtering', ('endpoint',))
+dynamodb_returned = registry.counter(
+    'liveinsight_dynamodb_items_returned_total', 'Items returned by Query/Scan', ('endpoint',))
+dynamodb_bytes = registry.counter(
+    'liveinsight_dynamodb_response_bytes_total', 'DynamoDB response payload bytes', ('endpoint',))
+cache_requests = registry.counter(
+    'liveinsight_cache_requests_total', 'Cache lookups', ('endpoint', 'cache', 'result'))
+span_cpu = registry.counter(
+    'liveinsight_span_cpu_seconds_total', 'CPU time spent in named spans (aggregation etc.)', ('endpoint', 'span'))
+ingest_events = registry.counter(
+    'liveinsight_ingest_events_total', 'Events through the ingest buffer (accepted/rejected/written/failed)',
+    ('result',))
+ingest_wal_syncs = registry.counter(
+    'liveinsight_ingest_wal_syncs_total', 'Ingest WAL fdatasync calls (accepted / syncs = events per group commit)')
+ingest_flush_duration = registry.histogram(
+    'liveinsight_ingest_flush_duration_seconds', 'Ingest buffer flush latency (events + sessions)')
+
+
+class RequestMetrics:
+    """요청 하나 동안 모은 측정값"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.capacity = 0.0
+        self.scanned = 0
+        self.returned = 0
+        self.response_bytes = 0
+        self.calls = []      # (operation, table, seconds, capacity)
+        self.cache = []      # (cache, hit)
+        self.spans = {}      # {이름: [벽시계 초, CPU 초]}
+        self._lock = threading.Lock()
+
+    def add_call(self, operation, table, seconds, capacity, scanned, returned, size):
+        with self._lock:
+            self.db_calls += 1
+            self.db_seconds += seconds
+            self.capacity += capacity
+            self.scanned += scanned
+            self.returned += returned
+            self.response_bytes += size
+            self.calls.append((operation, table, seconds, capacity))
+
+    def add_span(self, name, wall, cpu):
+        with self._lock:
+            span = self.spans.setdefault(name, [0.0, 0.0])
+            span[0] += wall
+            span[1] += cpu
+
+    def server_timing(self, total):
+        entries = [
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_calls} calls, {self.capacity:g} CU"'
+        ]
+        for name, (wall, cpu) in self.spans.items():
+            entries.append(f'{name};dur={wall * 1000:.1f};desc="cpu {cpu * 1000:.1f}ms"')
+        if self.cache:
+            hits = sum(1 for _, hit in self.cache if hit)
+            entries.append(f'cache;desc="hit {hits} miss {len(self.cache) - hits}"')
+        entries.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(entries)
+
+
+_current = contextvars.ContextVar('liveinsight_request_metrics', default=None)
+
+
+def current():
+    return _current.get()
+
+
+def record_cache(cache, hit):
+    """캐시 조회 결과 기록 (요청 밖에서는 무시)"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cache.append((cache, hit))
+
+
+@contextmanager
+def timed(name):
+    """구간의 벽시계/CPU 시간 기록 (CPU 는 현재 스레드 기준)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    finally:
+        metrics.add_span(name, time.perf_counter() - wall_started, time.thread_time() - cpu_started)
+
+
+# boto3 훅
+
+def _capacity_units(consumed):
+    if not consumed:
+        return 0.0
+    if isinstance(consumed, list):  # Batch / Transact 는 테이블별 목록
+        return sum(float(entry.get('CapacityUnits', 0)) for entry in consumed)
+    return float(consumed.get('CapacityUnits', 0))
+
+
+def _before_call(params, model, context, **kwargs):
+    # provide-client-params: API 파라미터 단계 (TableName 확인 가능, 스텁에서도 항상 호출됨)
+    if model.name in CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    context['liveinsight_started'] = time.perf_counter()
+    table = params.get('TableName')
+    if table is None and params.get('RequestItems'):
+        table = ','.join(sorted(params['RequestItems']))
+    context['liveinsight_table'] = table or '-'
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    metrics = _current.get()
+    started = context.get('liveinsight_started')
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    operation = model.name
+    table = context.get('liveinsight_table', '-')
+    dynamodb_duration.observe(seconds, operation, table)
+    if metrics is None:
+        return
+    if 'Count' in parsed:
+        returned = parsed['Count']
+    elif 'Responses' in parsed:
+        returned = sum(len(items) for items in parsed['Responses'].values())
+    else:
+        returned = int('Item' in parsed)
+    scanned = parsed.get('ScannedCount', returned)
+    # 응답 본문은 이미 파싱되었으므로 Content-Length 헤더로 크기 확인
+    size = int((getattr(http_response, 'headers', None) or {}).get('content-length') or 0)
+    metrics.add_call(
+        operation, table, seconds, _capacity_units(parsed.get('ConsumedCapacity')), scanned, returned, size
+    )
+
+
+def instrument_dynamodb(client):
+    """boto3 DynamoDB 클라이언트에 계측 훅 등록 (이벤트 시스템이 없는 대역은 무시)"""
+    events = getattr(getattr(client, 'meta', None), 'events', None)
+    if events is None or not settings.REQUEST_METRICS_ENABLED:
+        return
+    events.register('provide-client-params.dynamodb', _before_call)
+    events.register('after-call.dynamodb', _after_call)
+
+
+# 미들웨어
+
+def _endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unnamed'
+
+
+class RequestMetricsMiddleware:
+    """요청별 DynamoDB 비용 / 캐시 / 집계 시간 계측 (동기·비동기 모두 지원)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED or request.path == '/metrics':
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED or request.path == '/metrics':
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        total = time.perf_counter() - metrics.started
+        endpoint = _endpoint(request)
+
+        http_requests.inc(endpoint, request.method, str(response.status_code))
+        http_duration.observe(total, endpoint)
+        request_calls.observe(metrics.db_calls, endpoint)
+        if metrics.db_calls:
+            request_capacity.observe(metrics.capacity, endpoint)
+            for operation, table, _, capacity in metrics.calls:
+                dynamodb_calls.inc(endpoint, operation, table)
+                dynamodb_capacity.inc(endpoint, table, amount=capacity)
+            dynamodb_scanned.inc(endpoint, amount=metrics.scanned)
+            dynamodb_returned.inc(endpoint, amount=metrics.returned)
+            dynamodb_bytes.inc(endpoint, amount=metrics.response_bytes)
+        for cache, hit in metrics.cache:
+            cache_requests.inc(endpoint, cache, 'hit' if hit else 'miss')
+        for name, (_, cpu) in metrics.spans.items():
+            span_cpu.inc(endpoint, name, amount=cpu)
+
+        if settings.SERVER_TIMING_HEADERS:
+            response['Server-Timing'] = metrics.server_timing(total)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus 텍스트 형식 메트릭 (METRICS_TOKEN 설정 시 Bearer 토큰 필요)"""
+    token = settings.METRICS_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION', '') != f'Bearer {token}':
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
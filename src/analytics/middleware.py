@@ -0,0 +1,60 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .serialization import choose_encoding, compress
+
+
+class APICompressionMiddleware:
+    """일정 크기 이상의 JSON 응답을 brotli/gzip 으로 압축 (동기·비동기 모두 지원)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # 비동기 체인에서 동기 전용이면 Django 가 뒤의 비동기 뷰를 모두 한 스레드로 직렬화함
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if response.status_code != 200:
+            return response
+        if 'json' not in response.get('Content-Type', ''):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        # 작은 응답은 압축 이득보다 CPU 비용이 큼
+        if len(response.content) < settings.API_COMPRESSION_MIN_BYTES:
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # 압축 후에는 바이트가 달라지므로 약한 ETag 로 변경 (Django GZipMiddleware 와 동일)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,72 @@
+"""
+DynamoDB ExclusiveStartKey 기반 커서(keyset) 페이지네이션
+"""
+
+from decimal import Decimal
+
+from django.core import signing
+
+CURSOR_SALT = 'analytics.pagination.cursor'
+
+
+class InvalidCursor(Exception):
+    """변조되었거나 다른 조회에 속한 커서"""
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def encode_cursor(last_evaluated_key, scope):
+    """LastEvaluatedKey 를 서명된 불투명 커서 문자열로 변환"""
+    if not last_evaluated_key:
+        return None
+    payload = {'k': _plain(last_evaluated_key), 's': scope}
+    # 같은 위치는 항상 같은 커서가 되도록 타임스탬프 없는 서명 사용 (ETag 안정성)
+    return signing.Signer(salt=CURSOR_SALT).sign_object(payload, compress=True)
+
+
+def decode_cursor(cursor, scope):
+    """커서 문자열을 ExclusiveStartKey 로 복원 (서명/범위 검증)"""
+    if not cursor:
+        return None
+    try:
+        payload = signing.Signer(salt=CURSOR_SALT).unsign_object(cursor)
+    except (signing.BadSignature, ValueError):
+        raise InvalidCursor('Invalid cursor')
+    if payload.get('s') != scope:
+        raise InvalidCursor('Cursor does not belong to this query')
+    return payload['k']
+
+
+def parse_limit(value, default, maximum):
+    """limit 쿼리 파라미터 파싱 (1 ~ maximum)"""
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+
+def parse_newest_first(value):
+    """order 쿼리 파라미터 파싱 (desc 이면 최신순)"""
+    return (value or 'asc').lower() == 'desc'
+
+
+def add_pagination_headers(request, response, next_cursor):
+    """다음 페이지 커서를 X-Next-Cursor / Link 헤더로 전달"""
+    if next_cursor:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        response['X-Next-Cursor'] = next_cursor
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
@@ -0,0 +1,291 @@
+"""
+활성 세션 프레즌스 인덱스
+
+세션 → 마지막 활동 해시 맵과 계층형 타이밍 휠로 만료를 O(1) 에 처리하고,
+페이지별 동시 방문자 수와 분 단위 활동 버킷을 함께 유지한다.
+수집 경로에서 바로 갱신되며, 다른 프로세스(Lambda)의 기록은 DynamoDB 에서 주기적으로 따라잡는다.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class TimingWheel:
+    """계층형 타이밍 휠 (레벨마다 slots 배, 기본 1초 × 64 × 64 × 64 ≈ 73시간)"""
+
+    def __init__(self, tick_ms=1000, slots=64, levels=3, now_ms=None):
+        self.tick_ms = tick_ms
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = (now_ms if now_ms is not None else _now_ms()) // tick_ms
+        self._wheels = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._location = {}  # key → (level, slot, deadline_tick)
+
+    def __len__(self):
+        return len(self._location)
+
+    def schedule(self, key, deadline_ms):
+        """key 의 만료 시각 등록 (이미 있으면 옮김)"""
+        self.cancel(key)
+        self._place(key, -(-deadline_ms // self.tick_ms))
+
+    def cancel(self, key):
+        location = self._location.pop(key, None)
+        if location is not None:
+            level, slot, _ = location
+            self._wheels[level][slot].discard(key)
+
+    def _place(self, key, deadline_tick):
+        # 이미 지난 만료는 다음 틱에 처리
+        deadline_tick = max(deadline_tick, self.current_tick + 1)
+        delta = deadline_tick - self.current_tick
+        level = 0
+        span = self.slots
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= self.slots
+        slot_tick = deadline_tick
+        if delta >= span:
+            # 휠 범위 밖 → 최상위 레벨 마지막 칸에 두고 캐스케이드 때 다시 배치
+            slot_tick = self.current_tick + span - 1
+        slot = (slot_tick // self.slots ** level) % self.slots
+        self._wheels[level][slot].add(key)
+        self._location[key] = (level, slot, deadline_tick)
+
+    def advance(self, now_ms=None):
+        """현재 시각까지 틱을 진행하고 만료된 key 목록 반환"""
+        target = (now_ms if now_ms is not None else _now_ms()) // self.tick_ms
+        expired = []
+        while self.current_tick < target:
+            if not self._location:
+                # 비어 있으면 바로 목표 틱으로 이동
+                self.current_tick = target
+                break
+            self.current_tick += 1
+            # 상위 레벨 칸이 돌아오면 아래 레벨로 내려 보냄
+            for level in range(self.levels - 1, 0, -1):
+                period = self.slots ** level
+                if self.current_tick % period == 0:
+                    slot = (self.current_tick // period) % self.slots
+                    bucket = self._wheels[level][slot]
+                    self._wheels[level][slot] = set()
+                    for key in bucket:
+                        _, _, deadline_tick = self._location.pop(key)
+                        self._place(key, deadline_tick)
+            slot = self.current_tick % self.slots
+            bucket = self._wheels[0][slot]
+            if bucket:
+                self._wheels[0][slot] = set()
+                for key in bucket:
+                    del self._location[key]
+                    expired.append(key)
+        return expired
+
+
+class PresenceIndex:
+    """활성 세션 인메모리 인덱스
+
+    - 지금 활성 세션 수: O(1)
+    - 최근 N분 내 활동 세션 수: O(min(N, 비어 있지 않은 분 버킷 수 ≤ TTL 분))
+    - 페이지 X 의 방문자 수: O(1), 상위 k 페이지: O(페이지 수)
+    """
+
+    def __init__(self, ttl_ms, loader=None, sync_interval=15, tick_ms=1000):
+        self.ttl_ms = ttl_ms
+        self.loader = loader
+        self.sync_interval = sync_interval
+        self._wheel = TimingWheel(tick_ms=tick_ms)
+        self._sessions = {}
+        self._page_counts = {}
+        self._minute_buckets = {}  # 분(epoch) → 그 분에 마지막으로 활동한 세션 id 집합
+        self._activity_sum = 0  # last_activity 합 (평균 경과 시간 계산용)
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._synced_at = None
+        self._watermark = None
+
+    # 갱신
+
+    def touch(self, session_id, user_id=None, page=None, last_activity=None, expires_at=None):
+        """세션 활동 반영 (expires_at 은 ms, 없으면 last_activity + ttl)"""
+        last_activity = int(last_activity) if last_activity is not None else _now_ms()
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is not None and record['last_activity'] > last_activity:
+                return  # 더 오래된 활동은 무시
+            if record is None:
+                record = {
+                    'session_id': session_id,
+                    'user_id': user_id,
+                    'last_activity': last_activity,
+                    'current_page': page or '',
+                }
+                self._sessions[session_id] = record
+                self._add_page(record['current_page'])
+            else:
+                self._remove_activity(record)
+                if page is not None and page != record['current_page']:
+                    self._remove_page(record['current_page'])
+                    record['current_page'] = page
+                    self._add_page(page)
+                if user_id is not None:
+                    record['user_id'] = user_id
+                record['last_activity'] = last_activity
+            self._add_activity(record)
+
+            expires_at = int(expires_at) if expires_at is not None else last_activity + self.ttl_ms
+            self._wheel.schedule(session_id, expires_at)
+
+    def remove(self, session_id):
+        with self._lock:
+            record = self._sessions.pop(session_id, None)
+            if record is None:
+                return
+            self._wheel.cancel(session_id)
+            self._remove_page(record['current_page'])
+            self._remove_activity(record)
+
+    def load(self, items, now_ms=None):
+        """ActiveSessions 아이템 목록 반영 (이미 만료된 아이템 제외)"""
+        now_ms = now_ms if now_ms is not None else _now_ms()
+        latest = None
+        for item in items:
+            last_activity = item.get('last_activity')
+            if item.get('session_id') is None or last_activity is None:
+                continue
+            expires_at = item.get('expires_at')
+            # DynamoDB TTL 은 초 단위
+            expires_at = int(expires_at) * 1000 if expires_at is not None else None
+            if expires_at is not None and expires_at <= now_ms:
+                continue
+            self.touch(
+                item.get('session_id'), item.get('user_id'), item.get('current_page', ''),
+                last_activity, expires_at
+            )
+            latest = max(latest or 0, int(last_activity))
+        return latest
+
+    def expire(self, now_ms=None):
+        """만료 시각이 지난 세션 제거"""
+        with self._lock:
+            for session_id in self._wheel.advance(now_ms):
+                record = self._sessions.pop(session_id, None)
+                if record is not None:
+                    self._remove_page(record['current_page'])
+                    self._remove_activity(record)
+
+    def _add_page(self, page):
+        self._page_counts[page] = self._page_counts.get(page, 0) + 1
+
+    def _remove_page(self, page):
+        count = self._page_counts.get(page, 0) - 1
+        if count > 0:
+            self._page_counts[page] = count
+        else:
+            self._page_counts.pop(page, None)
+
+    def _add_activity(self, record):
+        minute = record['last_activity'] // 60000
+        self._minute_buckets.setdefault(minute, set()).add(record['session_id'])
+        self._activity_sum += record['last_activity']
+
+    def _remove_activity(self, record):
+        minute = record['last_activity'] // 60000
+        bucket = self._minute_buckets.get(minute)
+        if bucket is not None:
+            bucket.discard(record['session_id'])
+            if not bucket:
+                del self._minute_buckets[minute]
+        self._activity_sum -= record['last_activity']
+
+    # DynamoDB 동기화
+
+    def sync(self, force=False):
+        """sync_interval 마다 loader 로 다른 프로세스의 기록을 따라잡음 (최초 1회는 전체 백필)"""
+        if self.loader is None:
+            return
+        if not force and self._synced_at is not None and time.monotonic() - self._synced_at < self.sync_interval:
+            return
+        if not self._sync_lock.acquire(blocking=self._synced_at is None):
+            return  # 다른 스레드가 동기화 중이면 현재 상태로 응답
+        try:
+            # 늦게 도착한 쓰기를 놓치지 않도록 워터마크를 조금 겹쳐서 조회
+            since = self._watermark - 5000 if self._watermark is not None else None
+            started_ms = _now_ms()
+            latest = self.load(self.loader(since))
+            # 활동이 없던 동안에도 워터마크를 진행 (다음 동기화가 지난 분들을 다시 읽지 않도록)
+            self._watermark = max(self._watermark or 0, latest or 0, started_ms)
+            self._synced_at = time.monotonic()
+        finally:
+            self._sync_lock.release()
+
+    def _refresh(self, now_ms):
+        self.sync()
+        self.expire(now_ms)
+
+    # 조회
+
+    def active_count(self, now_ms=None):
+        self._refresh(now_ms)
+        return len(self._sessions)
+
+    def active_within(self, minutes, now_ms=None):
+        """최근 minutes 분 안에 활동한 세션 수"""
+        now_ms = now_ms if now_ms is not None else _now_ms()
+        self._refresh(now_ms)
+        current_minute = now_ms // 60000
+        first_minute = current_minute - minutes + 1
+        with self._lock:
+            if minutes > len(self._minute_buckets):
+                # 만료된 세션은 버킷에서 빠지므로 버킷 수는 TTL 분 수 정도로 제한됨
+                return sum(
+                    len(bucket) for minute, bucket in self._minute_buckets.items()
+                    if first_minute <= minute <= current_minute
+                )
+            return sum(
+                len(self._minute_buckets.get(minute, ()))
+                for minute in range(first_minute, current_minute + 1)
+            )
+
+    def page_visitors(self, page, now_ms=None):
+        self._refresh(now_ms)
+        return self._page_counts.get(page, 0)
+
+    def top_pages(self, limit=10, now_ms=None):
+        self._refresh(now_ms)
+        with self._lock:
+            pages = sorted(self._page_counts.items(), key=lambda x: x[1], reverse=True)[:limit]
+        return [{'page': page, 'visitors': count} for page, count in pages]
+
+    def average_duration(self, now_ms=None):
+        """활성 세션의 마지막 활동 이후 평균 경과 시간 (ms)"""
+        now_ms = now_ms if now_ms is not None else _now_ms()
+        self._refresh(now_ms)
+        with self._lock:
+            if not self._sessions:
+                return 0
+            return max(0, now_ms - self._activity_sum / len(self._sessions))
+
+    def sessions(self, now_ms=None):
+        """활성 세션 목록 (ActiveSessions 아이템과 같은 형태)"""
+        self._refresh(now_ms)
+        with self._lock:
+            return [dict(record) for record in self._sessions.values()]
+
+
+def _load_active_sessions(since_ms):
+    from .storage import db_client
+    return db_client.get_active_sessions(since_ms=since_ms)
+
+
+presence = PresenceIndex(
+    ttl_ms=settings.PRESENCE_TTL_SECONDS * 1000,
+    loader=_load_active_sessions,
+    sync_interval=settings.PRESENCE_SYNC_INTERVAL
+)
@@ -0,0 +1,136 @@
+"""
+이벤트 조회 쿼리 플래너
+
+주어진 필터로 SessionIndex / UserIndex Query, TimeBucketIndex Query, Scan 중
+가장 적은 아이템을 읽는 방법을 고른다.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from boto3.dynamodb.conditions import Attr, Key
+
+TIME_BUCKET_FORMAT = '%Y%m%d%H'
+
+
+def time_bucket(timestamp_ms):
+    """타임스탬프(ms)의 시간 버킷 키 (UTC 'YYYYMMDDHH')"""
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=dt_timezone.utc).strftime(TIME_BUCKET_FORMAT)
+
+
+def time_buckets(start_ms, end_ms):
+    """시간 범위에 걸친 버킷 키 목록 (오래된 순)"""
+    current = datetime.fromtimestamp(start_ms / 1000, tz=dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    end = datetime.fromtimestamp(end_ms / 1000, tz=dt_timezone.utc)
+    buckets = []
+    while current <= end:
+        buckets.append(current.strftime(TIME_BUCKET_FORMAT))
+        current += timedelta(hours=1)
+    return buckets
+
+
+class QueryPlan:
+    """선택된 조회 방법"""
+
+    def __init__(self, kind, index=None, partition_key=None, key_condition=None,
+                 filter_expression=None, buckets=None, reason=''):
+        self.kind = kind  # 'query' | 'time_bucket' | 'scan'
+        self.index = index
+        self.partition_key = partition_key
+        self.key_condition = key_condition
+        self.filter_expression = filter_expression
+        self.buckets = buckets or []
+        self.reason = reason
+
+    def key_attributes(self):
+        """ExclusiveStartKey 를 만들 때 필요한 속성 (테이블 키 + 인덱스 키)"""
+        attributes = ['event_id', 'timestamp']
+        if self.partition_key:
+            attributes.append(self.partition_key)
+        return attributes
+
+    def describe(self):
+        if self.kind == 'scan':
+            return 'scan'
+        if self.kind == 'time_bucket':
+            return f'query:{self.index}[{len(self.buckets)} buckets]'
+        return f'query:{self.index}'
+
+    def __repr__(self):
+        return f'<QueryPlan {self.describe()} ({self.reason})>'
+
+
+def _range_condition(start, end):
+    if start is not None and end is not None:
+        return Key('timestamp').between(start, end)
+    if start is not None:
+        return Key('timestamp').gte(start)
+    if end is not None:
+        return Key('timestamp').lte(end)
+    return None
+
+
+def _and(conditions):
+    combined = None
+    for condition in conditions:
+        if condition is None:
+            continue
+        combined = condition if combined is None else combined & condition
+    return combined
+
+
+def plan_event_query(filters, time_bucket_index=None, max_buckets=48):
+    """필터(user_id, session_id, event_type, start, end)로 조회 계획 수립
+
+    우선순위: 세션(카디널리티 가장 작음) > 사용자 > 시간 버킷 > 전체 Scan
+    """
+    session_id = filters.get('session_id')
+    user_id = filters.get('user_id')
+    event_type = filters.get('event_type')
+    start = filters.get('start')
+    end = filters.get('end')
+
+    if session_id or user_id:
+        if session_id:
+            index, partition_key, value = 'SessionIndex', 'session_id', session_id
+            residual = [Attr('user_id').eq(user_id)] if user_id else []
+            reason = 'session_id equality'
+        else:
+            index, partition_key, value = 'UserIndex', 'user_id', user_id
+            residual = []
+            reason = 'user_id equality'
+        if event_type:
+            residual.append(Attr('event_type').eq(event_type))
+        return QueryPlan(
+            'query',
+            index=index,
+            partition_key=partition_key,
+            key_condition=_and([Key(partition_key).eq(value), _range_condition(start, end)]),
+            filter_expression=_and(residual),
+            reason=reason,
+        )
+
+    residual = [Attr('event_type').eq(event_type)] if event_type else []
+
+    if time_bucket_index and start is not None:
+        range_end = end if end is not None else int(datetime.now(tz=dt_timezone.utc).timestamp() * 1000)
+        buckets = time_buckets(start, range_end)
+        if len(buckets) <= max_buckets:
+            return QueryPlan(
+                'time_bucket',
+                index=time_bucket_index,
+                partition_key='time_bucket',
+                key_condition=_range_condition(start, range_end),
+                filter_expression=_and(residual),
+                buckets=buckets,
+                reason=f'time range spans {len(buckets)} buckets',
+            )
+
+    reason = 'no indexed filter'
+    if start is not None or end is not None:
+        residual.insert(0, Attr('timestamp').between(
+            start if start is not None else 0,
+            end if end is not None else 2 ** 63 - 1,
+        ))
+        if time_bucket_index and start is not None:
+            reason = 'time range too wide for bucket index'
+    return QueryPlan('scan', filter_expression=_and(residual), reason=reason)
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from .serialization import dumps
+
+
+class FastJSONRenderer(JSONRenderer):
+    """orjson 기반 JSON 렌더러 (들여쓰기 요청 시 기본 렌더러 사용)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data, fast=settings.API_FAST_JSON)
@@ -0,0 +1,90 @@
+"""
+API 응답 헬퍼 (조건부 GET - ETag / Last-Modified)
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .serialization import dumps
+
+
+def compute_etag(content):
+    """응답 본문(또는 버전 객체)으로 ETag 계산"""
+    if not isinstance(content, bytes):
+        content = dumps(content, fast=settings.API_FAST_JSON)
+    return quote_etag(hashlib.blake2b(content, digest_size=12).hexdigest())
+
+
+def latest_activity_seconds(items, field='last_activity'):
+    """아이템 목록에서 가장 최근 활동 시각 (초 단위, Last-Modified 용)"""
+    values = [int(item.get(field) or 0) for item in items]
+    latest = max(values, default=0)
+    return latest // 1000 if latest else None
+
+
+def _finalize(request, response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # 캐시는 허용하되 매번 재검증
+    patch_cache_control(response, no_cache=True)
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+
+
+def _not_modified(request, etag, last_modified):
+    """If-None-Match / If-Modified-Since 가 일치하면 304 응답 반환"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_json_response(request, data, safe=True, version=None, last_modified=None):
+    """조건부 GET 을 지원하는 JsonResponse
+
+    version 이 주어지면 본문 대신 version 으로 ETag 를 계산하고,
+    304 인 경우 data(호출 가능 객체 허용) 생성과 직렬화를 생략한다.
+    """
+    if version is not None:
+        etag = compute_etag(version)
+        response = _not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
+    if callable(data):
+        data = data()
+    if safe and not isinstance(data, dict):
+        raise TypeError('In order to allow non-dict objects to be serialized set the safe parameter to False.')
+
+    content = dumps(data, fast=settings.API_FAST_JSON)
+    if version is None:
+        etag = compute_etag(content)
+    response = HttpResponse(content, content_type='application/json')
+    return _finalize(request, response, etag, last_modified)
+
+
+def conditional_api_response(request, data, version=None, last_modified=None):
+    """조건부 GET 을 지원하는 DRF Response"""
+    if version is not None:
+        etag = compute_etag(version)
+        response = _not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        if callable(data):
+            data = data()
+    else:
+        if callable(data):
+            data = data()
+        etag = compute_etag(data)
+
+    return _finalize(request, Response(data), etag, last_modified)
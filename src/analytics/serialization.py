@@ -0,0 +1,85 @@
+"""
+빠른 JSON 직렬화 및 응답 압축 유틸리티
+
+orjson / brotli 는 선택 의존성이며, 설치되어 있지 않으면 표준 라이브러리로 동작한다.
+"""
+
+import datetime
+import gzip
+import json
+import uuid
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 선택 의존성
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 선택 의존성
+    brotli = None
+
+
+def _default(obj):
+    """DynamoDB Decimal 등 기본 JSON 타입이 아닌 값 변환"""
+    if isinstance(obj, Decimal):
+        # 정수 값은 int 로, 나머지는 float 로 (DynamoDB 숫자는 모두 Decimal)
+        if obj == obj.to_integral_value():
+            return int(obj)
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(data, fast=True):
+    """JSON 바이트로 직렬화 (orjson 사용 가능 시 빠른 경로)"""
+    if fast and orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding 헤더를 {인코딩: q} 딕셔너리로 파싱"""
+    encodings = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[token] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding):
+    """클라이언트가 허용하는 가장 좋은 압축 방식 선택 (br > gzip)"""
+    encodings = parse_accept_encoding(accept_encoding)
+    wildcard = encodings.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = encodings.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(content, encoding):
+    """지정한 방식으로 바이트 압축"""
+    if encoding == 'br':
+        return brotli.compress(content, quality=5)
+    if encoding == 'gzip':
+        return gzip.compress(content, compresslevel=6, mtime=0)
+    return content
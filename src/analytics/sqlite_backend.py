@@ -0,0 +1,331 @@
+"""
+SQLite 저장소 백엔드
+
+작은 자체 호스팅 환경과 오프라인 벤치마크용.
+WAL 모드, 시간/세션/사용자/페이지 인덱스와 executemany 대량 삽입으로
+DynamoDB Scan 대신 인덱스 범위 조회를 사용한다.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+
+from .serialization import dumps
+from .storage import StorageBackend
+
+EVENT_COLUMNS = (
+    'event_id', 'timestamp', 'user_id', 'session_id', 'event_type',
+    'page_url', 'referrer', 'user_agent', 'ip_address', 'time_bucket',
+)
+SESSION_COLUMNS = (
+    'session_id', 'user_id', 'start_time', 'last_activity', 'is_active',
+    'entry_page', 'exit_page', 'referrer', 'total_events', 'session_duration',
+)
+ACTIVE_SESSION_COLUMNS = ('session_id', 'user_id', 'last_activity', 'current_page', 'expires_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    user_id TEXT,
+    session_id TEXT,
+    event_type TEXT,
+    page_url TEXT,
+    referrer TEXT,
+    user_agent TEXT,
+    ip_address TEXT,
+    time_bucket TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp, event_id);
+CREATE INDEX IF NOT EXISTS events_session ON events (session_id, timestamp, event_id);
+CREATE INDEX IF NOT EXISTS events_user ON events (user_id, timestamp, event_id);
+CREATE INDEX IF NOT EXISTS events_type_page ON events (event_type, page_url);
+CREATE INDEX IF NOT EXISTS events_type_referrer ON events (event_type, referrer);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    start_time INTEGER,
+    last_activity INTEGER,
+    is_active INTEGER,
+    entry_page TEXT,
+    exit_page TEXT,
+    referrer TEXT,
+    total_events INTEGER,
+    session_duration INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id, start_time, session_id);
+
+CREATE TABLE IF NOT EXISTS active_sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    last_activity INTEGER,
+    current_page TEXT,
+    expires_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS active_sessions_expires ON active_sessions (expires_at);
+CREATE INDEX IF NOT EXISTS active_sessions_activity ON active_sessions (last_activity);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+def _plain_number(value):
+    # Decimal 등 숫자형을 SQLite 가 받는 int/float 로 변환
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+class SQLiteBackend(StorageBackend):
+    """스레드마다 연결을 하나씩 여는 SQLite 백엔드"""
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.SQLITE_STORAGE_PATH)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            if self.path == ':memory:':
+                # 스레드별 연결이 같은 DB 를 보도록 공유 캐시 메모리 DB 사용
+                conn = sqlite3.connect(
+                    f'file:liveinsight-{id(self)}?mode=memory&cache=shared', uri=True, check_same_thread=False
+                )
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-65536')  # 64MB
+            conn.executescript(SCHEMA)
+            self._local.connection = conn
+        return conn
+
+    def _query(self, sql, params=()):
+        """행을 DynamoDB 아이템과 같은 dict 로 변환 (NULL 컬럼은 생략)"""
+        cursor = self.connection.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        items = []
+        for row in cursor:
+            item = {column: value for column, value in zip(columns, row) if value is not None}
+            extra = item.pop('extra', None)
+            if extra:
+                item.update(json.loads(extra))
+            items.append(item)
+        return items
+
+    # 쓰기 (대량)
+
+    def put_events(self, events):
+        rows = []
+        for event in events:
+            # 고정 컬럼 외 속성은 JSON 으로 보관
+            extra = {k: v for k, v in event.items() if k not in EVENT_COLUMNS}
+            rows.append(
+                tuple(_plain_number(event.get(column)) for column in EVENT_COLUMNS)
+                + (dumps(extra).decode('utf-8') if extra else None,)
+            )
+        placeholders = ', '.join('?' * (len(EVENT_COLUMNS) + 1))
+        with self.connection as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO events ({', '.join(EVENT_COLUMNS)}, extra) VALUES ({placeholders})",
+                rows
+            )
+
+    def _put_rows(self, table, columns, items):
+        rows = [tuple(_plain_number(item.get(column)) for column in columns) for item in items]
+        with self.connection as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+
+    def put_sessions(self, sessions):
+        self._put_rows('sessions', SESSION_COLUMNS, sessions)
+
+    def merge_sessions(self, deltas):
+        rows = [tuple(_plain_number(delta.get(column)) for column in SESSION_COLUMNS) for delta in deltas]
+        # DO UPDATE 의 우변은 모두 갱신 전 행 값을 본다
+        with self.connection as conn:
+            conn.executemany(
+                f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}) VALUES ({', '.join('?' * len(SESSION_COLUMNS))}) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "start_time = MIN(start_time, excluded.start_time), "
+                "entry_page = CASE WHEN excluded.start_time < start_time THEN excluded.entry_page ELSE entry_page END, "
+                "last_activity = MAX(last_activity, excluded.last_activity), "
+                "exit_page = CASE WHEN excluded.last_activity >= last_activity THEN excluded.exit_page ELSE exit_page END, "
+                "is_active = excluded.is_active, "
+                "total_events = total_events + excluded.total_events, "
+                "session_duration = MAX(last_activity, excluded.last_activity) - MIN(start_time, excluded.start_time)",
+                rows
+            )
+        return []
+
+    def put_active_sessions(self, sessions):
+        self._put_rows('active_sessions', ACTIVE_SESSION_COLUMNS, sessions)
+
+    # 카운터 (단일 쓰기 주체라 샤딩 없이 upsert)
+
+    def increment_counters(self, increments):
+        with self.connection as conn:
+            conn.executemany(
+                'INSERT INTO counters (name, count) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET count = count + excluded.count',
+                list(increments.items())
+            )
+        return {}
+
+    def get_counters(self, names):
+        names = list(names)
+        counts = dict.fromkeys(names, 0)
+        if names:
+            rows = self.connection.execute(
+                f"SELECT name, count FROM counters WHERE name IN ({', '.join('?' * len(names))})", names
+            )
+            counts.update(rows)
+        return counts
+
+    # 활성 세션
+
+    def get_active_sessions(self, since_ms=None):
+        sql = 'SELECT * FROM active_sessions WHERE expires_at > ?'
+        params = [int(time.time())]
+        if since_ms is not None:
+            sql += ' AND last_activity > ?'
+            params.append(since_ms)
+        return self._query(sql, params)
+
+    def ping(self):
+        self.connection.execute('SELECT 1')
+
+    # 이벤트 (키셋 페이지네이션: (timestamp, event_id) 다음부터)
+
+    def _page(self, where, params, key_columns, limit, start_key, newest_first, table='events'):
+        direction = 'DESC' if newest_first else 'ASC'
+        comparison = '<' if newest_first else '>'
+        where = list(where)
+        params = list(params)
+        if start_key:
+            where.append(f"({', '.join(key_columns)}) {comparison} ({', '.join('?' * len(key_columns))})")
+            params.extend(start_key[column] for column in key_columns)
+        sql = f'SELECT * FROM {table}'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY ' + ', '.join(f'{column} {direction}' for column in key_columns)
+        if limit:
+            # 한 개 더 읽어서 다음 페이지 존재 여부 판단
+            sql += ' LIMIT ?'
+            params.append(limit + 1)
+        items = self._query(sql, params)
+        if limit and len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            return items, {column: last[column] for column in key_columns}
+        return items, None
+
+    def count_events_between(self, start_ms, end_ms):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM events WHERE timestamp BETWEEN ? AND ?', (start_ms, end_ms)
+        ).fetchone()[0]
+
+    def get_event(self, event_id):
+        items = self._query('SELECT * FROM events WHERE event_id = ?', (event_id,))
+        return items[0] if items else None
+
+    def query_session_events(self, session_id, limit=100, exclusive_start_key=None, newest_first=False):
+        return self._page(
+            ['session_id = ?'], [session_id], ('timestamp', 'event_id'),
+            limit, exclusive_start_key, newest_first
+        )
+
+    def scan_events_between(self, start_ms, end_ms, limit=20, exclusive_start_key=None, max_pages=10):
+        return self._page(
+            ['timestamp BETWEEN ? AND ?'], [start_ms, end_ms], ('timestamp', 'event_id'),
+            limit, exclusive_start_key, False
+        )
+
+    def find_events(self, filters, limit=50, exclusive_start_key=None, newest_first=False):
+        where, params = [], []
+        for field in ('session_id', 'user_id', 'event_type'):
+            if filters.get(field):
+                where.append(f'{field} = ?')
+                params.append(filters[field])
+        if filters.get('start') is not None:
+            where.append('timestamp >= ?')
+            params.append(filters['start'])
+        if filters.get('end') is not None:
+            where.append('timestamp <= ?')
+            params.append(filters['end'])
+        items, next_key = self._page(
+            where, params, ('timestamp', 'event_id'), limit, exclusive_start_key, newest_first
+        )
+        reason = ''
+        if settings.QUERY_DEBUG_HEADERS:
+            detail = self.connection.execute(
+                'EXPLAIN QUERY PLAN SELECT * FROM events' + (' WHERE ' + ' AND '.join(where) if where else '')
+                + ' ORDER BY timestamp, event_id', params
+            ).fetchall()
+            reason = '; '.join(row[-1] for row in detail)
+        stats = {
+            'plan': 'sqlite',
+            'reason': reason,
+            'consumed_capacity': 0.0,
+            'scanned_count': len(items),
+            'pages': 1,
+        }
+        return items, next_key, stats
+
+    # 사용자
+
+    def query_user_sessions(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        return self._page(
+            ['user_id = ?'], [user_id], ('start_time', 'session_id'),
+            limit, exclusive_start_key, newest_first, table='sessions'
+        )
+
+    def query_user_events(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        return self._page(
+            ['user_id = ?'], [user_id], ('timestamp', 'event_id'),
+            limit, exclusive_start_key, newest_first
+        )
+
+    # 집계 (인덱스 범위 조회 / GROUP BY)
+
+    def get_hourly_stats(self, hours=24):
+        end_ms = int(time.time() * 1000)
+        start_ms = end_ms - hours * 3600 * 1000
+        return self._query(
+            'SELECT * FROM events WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp',
+            (start_ms, end_ms)
+        )
+
+    def get_page_stats(self):
+        rows = self.connection.execute(
+            "SELECT page_url, COUNT(*) AS views FROM events WHERE event_type = 'page_view' GROUP BY page_url"
+        )
+        return [
+            {'page': page_url if page_url is not None else 'Unknown', 'views': views}
+            for page_url, views in rows
+        ]
+
+    def get_referrer_stats(self):
+        rows = self.connection.execute(
+            "SELECT COALESCE(NULLIF(referrer, ''), 'direct') AS referrer, COUNT(*) AS count "
+            "FROM events WHERE event_type = 'page_view' GROUP BY 1 ORDER BY count DESC LIMIT 10"
+        )
+        return [{'referrer': referrer, 'count': count} for referrer, count in rows]
+
+    def count_events(self):
+        return self.connection.execute('SELECT COUNT(*) FROM events').fetchone()[0]
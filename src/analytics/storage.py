@@ -0,0 +1,159 @@
+"""
+이벤트 저장소 백엔드 인터페이스
+
+settings.STORAGE_BACKEND 에 지정한 클래스를 첫 사용 시점에 생성한다.
+- analytics.dynamodb_client.DynamoDBClient (기본)
+- analytics.sqlite_backend.SQLiteBackend (로컬/자체 호스팅, 오프라인 벤치마크)
+"""
+
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+
+class StorageBackend(ABC):
+    """이벤트 / 세션 / 활성 세션 / 집계 저장소 (하위 클래스가 모든 추상 메서드를 구현해야 생성 가능)"""
+
+    # 쓰기 (대량)
+
+    @abstractmethod
+    def put_events(self, events):
+        """이벤트 여러 개 저장"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_sessions(self, sessions):
+        """세션 여러 개 저장 (session_id 기준 덮어쓰기)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def merge_sessions(self, deltas):
+        """세션 변경분 여러 개 반영 → 반영하지 못한 session_id 목록
+
+        변경분은 세션 아이템과 같은 형태이며 total_events 는 증가분이다.
+        여러 쓰기 주체가 같은 세션을 나눠 처리해도 이벤트 수는 더해지고,
+        start_time / entry_page 는 더 이른 값, last_activity / exit_page 는 더 늦은 값이 남는다.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_active_sessions(self, sessions):
+        """활성 세션 여러 개 저장 (session_id 기준 덮어쓰기)"""
+        raise NotImplementedError
+
+    # 카운터
+
+    @abstractmethod
+    def increment_counters(self, increments):
+        """{카운터 이름: 증가분} 반영 → 반영하지 못한 증가분"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_counters(self, names):
+        """카운터 이름 → 현재 값 (없으면 0)"""
+        raise NotImplementedError
+
+    # 활성 세션
+
+    @abstractmethod
+    def get_active_sessions(self, since_ms=None):
+        """만료되지 않은 활성 세션 (since_ms 이후 활동만 선택 가능)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def ping(self):
+        """연결 확인 (실패 시 예외 발생)"""
+        raise NotImplementedError
+
+    # 이벤트
+
+    @abstractmethod
+    def get_event(self, event_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_session_events(self, session_id, limit=100, exclusive_start_key=None, newest_first=False):
+        """세션 이벤트 한 페이지 → (items, 다음 시작 키)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan_events_between(self, start_ms, end_ms, limit=20, exclusive_start_key=None, max_pages=10):
+        """시간 범위 이벤트 한 페이지 → (items, 다음 시작 키)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_events_between(self, start_ms, end_ms):
+        """시간 범위 이벤트 수"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_events(self, filters, limit=50, exclusive_start_key=None, newest_first=False):
+        """필터(user_id, session_id, event_type, start, end) 조회 → (items, 다음 시작 키, 통계)
+
+        통계: plan, reason, consumed_capacity, scanned_count, pages
+        """
+        raise NotImplementedError
+
+    # 사용자
+
+    @abstractmethod
+    def query_user_sessions(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_user_events(self, user_id, limit=50, exclusive_start_key=None, newest_first=False):
+        raise NotImplementedError
+
+    # 집계
+
+    @abstractmethod
+    def get_hourly_stats(self, hours=24):
+        """최근 hours 시간의 이벤트"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_page_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_referrer_stats(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def count_events(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def summary_payload(active_sessions, total_events):
+        return {
+            'total_sessions': active_sessions,
+            'total_events': total_events,
+            'avg_session_time': '2분 30초',
+            'conversion_rate': '3.2%'
+        }
+
+    def get_summary_stats(self):
+        try:
+            from .presence import presence
+
+            # 기본 통계 데이터
+            return self.summary_payload(presence.active_count(), self.count_events())
+        except Exception as e:
+            print(f"Error getting summary stats: {e}")
+            return {
+                'total_sessions': 0,
+                'total_events': 0,
+                'avg_session_time': '0분',
+                'conversion_rate': '0%'
+            }
+
+
+def get_backend(path=None):
+    """설정된 저장소 백엔드 인스턴스 생성"""
+    return import_string(path or settings.STORAGE_BACKEND)()
+
+
+# 프로세스 공용 인스턴스 (import 시점이 아니라 첫 사용 시점에 연결)
+db_client = SimpleLazyObject(get_backend)
@@ -1,13 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet, SessionViewSet, StatisticsViewSet, EventCollectionView
+from . import views
+from .views import EventViewSet, SessionViewSet, UserViewSet, EventCollectionView
 
 router = DefaultRouter()
 router.register(r'events', EventViewSet, basename='event')
 router.register(r'sessions', SessionViewSet, basename='session')
-router.register(r'statistics', StatisticsViewSet, basename='statistics')
+router.register(r'users', UserViewSet, basename='user')
 
 urlpatterns = [
     path('events/', EventCollectionView.as_view(), name='event-collection'),
+    path('statistics/hourly/', views.statistics_hourly, name='statistics-hourly'),
+    path('statistics/pages/', views.statistics_pages, name='statistics-pages'),
+    path('statistics/referrers/', views.statistics_referrers, name='statistics-referrers'),
+    path('statistics/summary/', views.statistics_summary, name='statistics-summary'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+사용자 여정 조회 (Sessions / Events UserIndex GSI)
+
+세션과 이벤트를 동시에 Query 한 뒤 시간순 타임라인으로 병합하고,
+결과는 사용자별 LRU 캐시에 짧게 보관한다.
+"""
+
+import contextvars
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .storage import db_client
+from .lru import LRUCache
+
+journey_cache = LRUCache(
+    maxsize=settings.USER_JOURNEY_CACHE_SIZE,
+    ttl=settings.USER_JOURNEY_CACHE_TTL,
+    name='user_journey'
+)
+
+# 세션/이벤트 동시 조회용 (요청마다 스레드를 만들지 않도록 공유)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='user-journey')
+
+SESSION_KEY_ATTRIBUTES = ('session_id', 'user_id', 'start_time')
+EVENT_KEY_ATTRIBUTES = ('event_id', 'timestamp', 'user_id')
+
+
+def _key_of(item, attributes):
+    return {attr: item[attr] for attr in attributes if attr in item}
+
+
+def get_user_sessions(user_id, limit, start_key=None, newest_first=False):
+    """사용자 세션 한 페이지 → (sessions, 다음 시작 키)"""
+    cache_key = (user_id, 'sessions', repr(start_key), limit, newest_first)
+    return journey_cache.get_or_set(
+        cache_key,
+        lambda: db_client.query_user_sessions(
+            user_id, limit=limit, exclusive_start_key=start_key, newest_first=newest_first
+        )
+    )
+
+
+def _session_entry(session):
+    return {
+        'type': 'session',
+        'timestamp': session.get('start_time'),
+        'session_id': session.get('session_id'),
+        'entry_page': session.get('entry_page'),
+        'exit_page': session.get('exit_page'),
+        'referrer': session.get('referrer'),
+        'total_events': session.get('total_events'),
+        'session_duration': session.get('session_duration'),
+    }
+
+
+def _event_entry(event):
+    return {
+        'type': 'event',
+        'timestamp': event.get('timestamp'),
+        'session_id': event.get('session_id'),
+        'event_id': event.get('event_id'),
+        'event_type': event.get('event_type'),
+        'page_url': event.get('page_url'),
+        'referrer': event.get('referrer'),
+    }
+
+
+def _next_stream_state(state, page, consumed, last_key, attributes):
+    """병합 후 스트림별 다음 위치 계산"""
+    if consumed == len(page):
+        # 가져온 페이지를 모두 사용 → DynamoDB 가 준 다음 키로 진행
+        return {'k': last_key, 'done': last_key is None}
+    if consumed == 0:
+        return state
+    return {'k': _key_of(page[consumed - 1], attributes), 'done': False}
+
+
+def get_user_timeline(user_id, limit, state=None, newest_first=False):
+    """세션 시작과 이벤트를 시간순으로 병합한 타임라인 한 페이지
+
+    state 는 {'s': 세션 스트림 위치, 'e': 이벤트 스트림 위치} 이며 커서에 그대로 담긴다.
+    반환: (entries, 다음 state 또는 None)
+    """
+    state = state or {}
+    session_state = state.get('s') or {'k': None, 'done': False}
+    event_state = state.get('e') or {'k': None, 'done': False}
+
+    cache_key = (user_id, 'timeline', repr(state), limit, newest_first)
+    cached = journey_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # 두 GSI 를 동시에 조회 (요청 계측 contextvar 는 호출마다 복사해 전달)
+    sessions_future = events_future = None
+    if not session_state['done']:
+        sessions_future = _executor.submit(
+            contextvars.copy_context().run,
+            db_client.query_user_sessions, user_id, limit, session_state['k'], newest_first
+        )
+    if not event_state['done']:
+        events_future = _executor.submit(
+            contextvars.copy_context().run,
+            db_client.query_user_events, user_id, limit, event_state['k'], newest_first
+        )
+    sessions, sessions_last_key = sessions_future.result() if sessions_future else ([], None)
+    events, events_last_key = events_future.result() if events_future else ([], None)
+
+    # 시간순 병합 (각 스트림은 이미 정렬되어 있음)
+    tagged_sessions = ((int(s.get('start_time') or 0), index, 's') for index, s in enumerate(sessions))
+    tagged_events = ((int(e.get('timestamp') or 0), index, 'e') for index, e in enumerate(events))
+    merged = heapq.merge(tagged_sessions, tagged_events, key=lambda entry: entry[0], reverse=newest_first)
+
+    entries = []
+    consumed = {'s': 0, 'e': 0}
+    for _, index, stream in merged:
+        if len(entries) >= limit:
+            break
+        if stream == 's':
+            entries.append(_session_entry(sessions[index]))
+        else:
+            entries.append(_event_entry(events[index]))
+        consumed[stream] += 1
+
+    next_state = {
+        's': session_state if session_state['done'] else _next_stream_state(
+            session_state, sessions, consumed['s'], sessions_last_key, SESSION_KEY_ATTRIBUTES
+        ),
+        'e': event_state if event_state['done'] else _next_stream_state(
+            event_state, events, consumed['e'], events_last_key, EVENT_KEY_ATTRIBUTES
+        ),
+    }
+    if next_state['s']['done'] and next_state['e']['done']:
+        next_state = None
+
+    result = (entries, next_state)
+    journey_cache.set(cache_key, result)
+    return result
@@ -1,56 +1,155 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.conf import settings
+from django.http import JsonResponse
 from django.core.cache import cache
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from .models import Event, Session
 from .serializers import EventSerializer, SessionSerializer, ActiveSessionSerializer
-from .dynamodb_client import db_client
+from .storage import db_client
+from .responses import (
+    compute_etag, conditional_api_response, conditional_json_response, latest_activity_seconds,
+)
+from .user_journey import get_user_sessions, get_user_timeline
+from .presence import presence
+from .ingest import build_event, client_ip, ingest_buffer
+from .concurrency import gather_db, run_db
+from .counters import recent_buckets
+from .metrics import record_cache, timed
+from .pagination import (
+    InvalidCursor, add_pagination_headers, decode_cursor, encode_cursor,
+    parse_limit, parse_newest_first,
+)
 from datetime import datetime
 from collections import defaultdict
+import hashlib
 import json
+import time
 
 @method_decorator(csrf_exempt, name='dispatch')
 class EventCollectionView(APIView):
     """이벤트 수집 API"""
     
+    def get(self, request):
+        """이벤트 조회는 EventViewSet 으로 위임 (같은 /api/events/ 경로)"""
+        return event_list_view(request._request)
+    
     def post(self, request):
+        """검증 후 수집 버퍼에 넣고 202 (저장은 플러셔 스레드가 묶어서), 버퍼가 가득 차면 429"""
         try:
             if hasattr(request, 'data') and request.data:
                 event_data = request.data
             else:
                 event_data = json.loads(request.body.decode('utf-8'))
-            
-            required_fields = ['user_id', 'session_id', 'event_type', 'timestamp']
-            for field in required_fields:
-                if field not in event_data:
-                    return Response(
-                        {'error': f'Missing required field: {field}'}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            
-            db_client.save_event(event_data)
-            return Response({'status': 'success'}, status=status.HTTP_201_CREATED)
-            
-        except json.JSONDecodeError:
+            event = build_event(event_data, client_ip(request))
+        except (json.JSONDecodeError, ParseError):
             return Response(
                 {'error': 'Invalid JSON data'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        if not ingest_buffer.offer(event):
+            response = Response(
+                {'error': 'Ingest buffer full, retry later'},
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            response['Retry-After'] = '1'
+            return response
+        presence.touch(event['session_id'], event['user_id'], event['page_url'], event['timestamp'])
+        return Response(
+            {'status': 'accepted', 'event_id': event['event_id']},
+            status=status.HTTP_202_ACCEPTED
+        )
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+class EventViewSet(viewsets.ViewSet):
+    """DynamoDB 이벤트 조회 API
+
+    필터: user_id, session_id, event_type, start, end (epoch ms)
+    페이지: limit, cursor, order=desc
+    """
     serializer_class = EventSerializer
+    filter_fields = ('user_id', 'session_id', 'event_type')
+    
+    def list(self, request):
+        try:
+            filters = self.parse_filters(request.query_params)
+            limit = parse_limit(
+                request.query_params.get('limit'), settings.EVENTS_PAGE_SIZE, settings.EVENTS_MAX_PAGE_SIZE
+            )
+            newest_first = parse_newest_first(request.query_params.get('order'))
+            
+            scope_source = json.dumps([filters, newest_first], sort_keys=True).encode('utf-8')
+            scope = 'events:' + hashlib.blake2b(scope_source, digest_size=8).hexdigest()
+            start_key = decode_cursor(request.query_params.get('cursor'), scope)
+            
+            items, next_key, stats = db_client.find_events(
+                filters, limit=limit, exclusive_start_key=start_key, newest_first=newest_first
+            )
+            next_cursor = encode_cursor(next_key, scope)
+            next_url = None
+            if next_cursor:
+                query = request.query_params.copy()
+                query['cursor'] = next_cursor
+                next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+            
+            response = Response({
+                'next': next_url,
+                'next_cursor': next_cursor,
+                'results': items
+            })
+            if settings.QUERY_DEBUG_HEADERS:
+                response['X-Query-Plan'] = stats['plan']
+                response['X-Query-Plan-Reason'] = stats['reason']
+                response['X-Consumed-Capacity'] = f"{stats['consumed_capacity']:.1f}"
+                response['X-Scanned-Count'] = str(stats['scanned_count'])
+                response['X-Returned-Count'] = str(len(items))
+            return response
+            
+        except (ValueError, InvalidCursor) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response(
+                {'error': str(e)}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
     
-    def get_queryset(self):
-        return Event.objects.none()
+    def retrieve(self, request, pk=None):
+        try:
+            event = db_client.get_event(pk)
+            if event is None:
+                return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+            return conditional_api_response(request, event)
+        except Exception as e:
+            return Response(
+                {'error': str(e)}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def parse_filters(self, params):
+        filters = {field: params.get(field) for field in self.filter_fields if params.get(field)}
+        for field in ('start', 'end'):
+            value = params.get(field)
+            if value:
+                try:
+                    filters[field] = int(value)
+                except ValueError:
+                    raise ValueError(f'{field} must be an epoch timestamp in milliseconds')
+        return filters
+
+
+event_list_view = EventViewSet.as_view({'get': 'list'})
 
 class SessionViewSet(viewsets.ViewSet):
     
@@ -58,32 +157,43 @@ class SessionViewSet(viewsets.ViewSet):
     def active(self, request):
         """활성 세션 목록 조회 (캐시 적용)"""
         cache_key = 'active_sessions'
-        cached_data = cache.get(cache_key)
+        cached = cache.get(cache_key)
+        record_cache(cache_key, cached is not None)
         
-        if cached_data is not None:
-            return Response(cached_data)
+        if cached is not None:
+            response_data, etag_source = cached
+            return conditional_api_response(request, response_data, version=etag_source)
             
         try:
-            sessions = db_client.get_active_sessions()
+            sessions = presence.sessions()
             
             # 데이터 변환
             active_sessions = []
             for session in sessions:
+                last_activity = session.get('last_activity')
                 session_data = {
                     'session_id': session.get('session_id'),
                     'user_id': session.get('user_id'),
-                    'last_activity': session.get('last_activity'),
+                    'last_activity': int(last_activity) if last_activity is not None else None,
                     'current_page': session.get('current_page'),
-                    'duration': self.calculate_duration(session.get('last_activity'))
+                    'duration': self.calculate_duration(last_activity)
                 }
                 active_sessions.append(session_data)
             
-            serializer = ActiveSessionSerializer(active_sessions, many=True)
-            response_data = serializer.data
+            if settings.API_FAST_JSON:
+                # 이미 타입이 정해진 dict 이므로 행 단위 serializer 생략
+                response_data = active_sessions
+            else:
+                response_data = ActiveSessionSerializer(active_sessions, many=True).data
+            # 캐시된 결과의 해시를 버전으로 사용 (캐시 히트 시 재직렬화 없음)
+            etag_source = compute_etag(response_data)
             
             # 30초 캐시
-            cache.set(cache_key, response_data, 30)
-            return Response(response_data)
+            cache.set(cache_key, (response_data, etag_source), 30)
+            return conditional_api_response(
+                request, response_data, version=etag_source,
+                last_modified=latest_activity_seconds(sessions)
+            )
             
         except Exception as e:
             return Response(
@@ -91,12 +201,50 @@ class SessionViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'], url_path='presence')
+    def presence_stats(self, request):
+        """현재 접속 현황 (활성 세션 수, 최근 N분 활동, 페이지별 방문자)"""
+        try:
+            minutes = int(request.query_params.get('minutes', 5))
+            data = {
+                'active_now': presence.active_count(),
+                'active_last_minutes': presence.active_within(max(1, min(minutes, 60 * 24))),
+                'minutes': minutes,
+                'top_pages': presence.top_pages(int(request.query_params.get('top', 10))),
+            }
+            page = request.query_params.get('page')
+            if page:
+                data['page'] = page
+                data['page_visitors'] = presence.page_visitors(page)
+            return Response(data)
+        except ValueError:
+            return Response({'error': 'minutes and top must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response(
+                {'error': str(e)}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
     @action(detail=True, methods=['get'])
     def events(self, request, pk=None):
-        """특정 세션의 이벤트 목록"""
+        """특정 세션의 이벤트 목록 (커서 페이지네이션)"""
         try:
-            events = db_client.get_session_events(pk)
-            return Response(events)
+            limit = parse_limit(
+                request.query_params.get('limit'), settings.EVENTS_PAGE_SIZE, settings.EVENTS_MAX_PAGE_SIZE
+            )
+            newest_first = parse_newest_first(request.query_params.get('order'))
+            scope = f"session:{pk}:{'desc' if newest_first else 'asc'}"
+            start_key = decode_cursor(request.query_params.get('cursor'), scope)
+            
+            events, last_key = db_client.query_session_events(
+                pk, limit=limit, exclusive_start_key=start_key, newest_first=newest_first
+            )
+            response = conditional_api_response(
+                request, events, last_modified=latest_activity_seconds(events, 'timestamp')
+            )
+            return add_pagination_headers(request, response, encode_cursor(last_key, scope))
+        except (ValueError, InvalidCursor) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)}, 
@@ -109,91 +257,165 @@ class SessionViewSet(viewsets.ViewSet):
         current_time = int(datetime.now().timestamp() * 1000)
         return max(0, current_time - int(last_activity))
 
-class StatisticsViewSet(viewsets.ViewSet):
+class UserViewSet(viewsets.ViewSet):
+    """사용자 여정 API (Sessions / Events UserIndex GSI)"""
     
-    @action(detail=False, methods=['get'])
-    def hourly(self, request):
-        """시간대별 통계"""
+    @action(detail=True, methods=['get'])
+    def sessions(self, request, pk=None):
+        """사용자의 세션 목록 (커서 페이지네이션)"""
         try:
-            hours = int(request.query_params.get('hours', 24))
-            events = db_client.get_hourly_stats(hours)
-            
-            # 시간대별 집계
-            hourly_data = self.aggregate_by_hour(events)
-            return Response(hourly_data)
+            limit = parse_limit(
+                request.query_params.get('limit'), settings.EVENTS_PAGE_SIZE, settings.EVENTS_MAX_PAGE_SIZE
+            )
+            newest_first = parse_newest_first(request.query_params.get('order'))
+            scope = f"user-sessions:{pk}:{'desc' if newest_first else 'asc'}"
+            start_key = decode_cursor(request.query_params.get('cursor'), scope)
             
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            sessions, last_key = get_user_sessions(
+                pk, limit, start_key=start_key, newest_first=newest_first
             )
-    
-    @action(detail=False, methods=['get'])
-    def pages(self, request):
-        """페이지별 통계"""
-        try:
-            page_stats = db_client.get_page_stats()
-            return Response(page_stats)
+            return self.paginated_response(request, sessions, encode_cursor(last_key, scope))
+        except (ValueError, InvalidCursor) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    @action(detail=False, methods=['get'])
-    def referrers(self, request):
-        """유입경로별 통계"""
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """세션 시작과 이벤트를 시간순으로 병합한 타임라인"""
         try:
-            referrer_stats = db_client.get_referrer_stats()
-            return Response(referrer_stats)
-        except Exception as e:
-            return Response(
-                {'error': str(e)}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            limit = parse_limit(
+                request.query_params.get('limit'), settings.EVENTS_PAGE_SIZE, settings.EVENTS_MAX_PAGE_SIZE
             )
-    
-    @action(detail=False, methods=['get'])
-    def summary(self, request):
-        """요약 통계"""
-        try:
-            summary_stats = db_client.get_summary_stats()
-            return Response(summary_stats)
+            newest_first = parse_newest_first(request.query_params.get('order'))
+            scope = f"user-timeline:{pk}:{'desc' if newest_first else 'asc'}"
+            state = decode_cursor(request.query_params.get('cursor'), scope)
+            
+            entries, next_state = get_user_timeline(
+                pk, limit, state=state, newest_first=newest_first
+            )
+            return self.paginated_response(request, entries, encode_cursor(next_state, scope))
+        except (ValueError, InvalidCursor) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {'error': str(e)}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
-    def aggregate_by_hour(self, events):
-        from datetime import datetime, timedelta, timezone as dt_timezone
-        from django.utils import timezone
-        
-        hourly_counts = defaultdict(int)
-        
-        # 한국 시간 기준으로 현재 시간 가져오기
-        now = timezone.localtime(timezone.now())
-        hours_range = []
-        
-        # 100분 전부터 현재까지 5분 간격으로 라벨 생성 (20개 포인트)
-        for i in range(20):
-            time_point = now - timedelta(minutes=(19 - i) * 5)
-            # 한국 시간대로 포맷팅
-            time_key = time_point.strftime('%H:%M')
-            hours_range.append((time_key, time_point))
-            hourly_counts[time_key] = 0
+    def paginated_response(self, request, results, next_cursor):
+        next_url = None
+        if next_cursor:
+            query = request.query_params.copy()
+            query['cursor'] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+        response = conditional_api_response(request, {
+            'next': next_url,
+            'next_cursor': next_cursor,
+            'results': results
+        })
+        return add_pagination_headers(request, response, next_cursor)
+
+# 통계 API (비동기 뷰, DynamoDB 호출은 concurrency 스레드 풀에서 실행)
+
+async def statistics_hourly(request):
+    """시간대별 통계 (최근 100분, 5분 단위)"""
+    try:
+        if settings.EVENT_RATE_FROM_COUNTERS:
+            hourly_data = await recent_event_counts()
+            return conditional_json_response(request, hourly_data, safe=False)
+        hours = int(request.GET.get('hours', 24))
+        events = await run_db(db_client.get_hourly_stats, hours)
         
-        # 실제 이벤트 데이터로 카운트 업데이트
-        for event in events:
-            timestamp = int(event.get('timestamp', 0))
-            # UTC 타임스탬프를 한국 시간대로 변환
-            utc_time = datetime.fromtimestamp(timestamp / 1000, tz=dt_timezone.utc)
-            event_time = timezone.localtime(utc_time)
-            # 이벤트 시간을 5분 단위로 맞춤
-            minute_slot = (event_time.minute // 5) * 5
-            event_rounded = event_time.replace(minute=minute_slot, second=0, microsecond=0)
-            time_key = event_rounded.strftime('%H:%M')
-            if time_key in hourly_counts:
-                hourly_counts[time_key] += 1
+        # 시간대별 집계
+        with timed('aggregate'):
+            hourly_data = aggregate_by_hour(events)
+        return conditional_json_response(request, hourly_data, safe=False)
         
-        # 시간 순서대로 정렬하여 반환
-        return [{'hour': hour_key, 'count': hourly_counts[hour_key]} for hour_key, _ in hours_range]
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def statistics_pages(request):
+    """페이지별 통계"""
+    try:
+        page_stats = await run_db(db_client.get_page_stats)
+        return conditional_json_response(request, page_stats, safe=False)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def statistics_referrers(request):
+    """유입경로별 통계"""
+    try:
+        referrer_stats = await run_db(db_client.get_referrer_stats)
+        return conditional_json_response(request, referrer_stats, safe=False)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def statistics_summary(request):
+    """요약 통계 (활성 세션 수와 이벤트 수를 동시에 조회)"""
+    try:
+        active_sessions, total_events = await gather_db(
+            (presence.active_count,),
+            (db_client.count_events,),
+        )
+        return conditional_json_response(request, db_client.summary_payload(active_sessions, total_events))
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+async def recent_event_counts(points=20):
+    """최근 points 개 5분 버킷의 이벤트 수 (이벤트 Scan 대신 샤드 카운터 합산)"""
+    from datetime import timezone as dt_timezone
+    from django.utils import timezone
+
+    buckets = recent_buckets(int(time.time() * 1000), points)
+    counts = await run_db(db_client.get_counters, [name for _, name in buckets])
+    return [
+        {
+            'hour': timezone.localtime(datetime.fromtimestamp(start / 1000, tz=dt_timezone.utc)).strftime('%H:%M'),
+            'count': counts[name],
+        }
+        for start, name in buckets
+    ]
+
+
+def aggregate_by_hour(events):
+    """최근 100분 이벤트를 5분 단위로 집계"""
+    from datetime import datetime, timedelta, timezone as dt_timezone
+    from django.utils import timezone
+
+    hourly_counts = defaultdict(int)
+
+    # 한국 시간 기준으로 현재 시간 가져오기
+    now = timezone.localtime(timezone.now())
+    hours_range = []
+
+    # 100분 전부터 현재까지 5분 간격으로 라벨 생성 (20개 포인트)
+    for i in range(20):
+        time_point = now - timedelta(minutes=(19 - i) * 5)
+        # 한국 시간대로 포맷팅
+        time_key = time_point.strftime('%H:%M')
+        hours_range.append((time_key, time_point))
+        hourly_counts[time_key] = 0
+
+    # 실제 이벤트 데이터로 카운트 업데이트
+    for event in events:
+        timestamp = int(event.get('timestamp', 0))
+        # UTC 타임스탬프를 한국 시간대로 변환
+        utc_time = datetime.fromtimestamp(timestamp / 1000, tz=dt_timezone.utc)
+        event_time = timezone.localtime(utc_time)
+        # 이벤트 시간을 5분 단위로 맞춤
+        minute_slot = (event_time.minute // 5) * 5
+        event_rounded = event_time.replace(minute=minute_slot, second=0, microsecond=0)
+        time_key = event_rounded.strftime('%H:%M')
+        if time_key in hourly_counts:
+            hourly_counts[time_key] += 1
+
+    # 시간 순서대로 정렬하여 반환
+    return [{'hour': hour_key, 'count': hourly_counts[hour_key]} for hour_key, _ in hours_range]
@@ -4,7 +4,16 @@ from django.views.static import serve
 from django.conf import settings
 import os
 from django.utils import timezone
-from analytics.dynamodb_client import db_client
+from analytics.storage import db_client
+from analytics.presence import presence
+from analytics.concurrency import gather_db, run_db
+from analytics.metrics import timed
+from analytics.responses import conditional_json_response, latest_activity_seconds
+from analytics.views import recent_event_counts
+from analytics.pagination import (
+    InvalidCursor, add_pagination_headers, decode_cursor, encode_cursor,
+    parse_limit, parse_newest_first,
+)
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
@@ -27,105 +36,131 @@ def statistics(request):
     return render(request, 'dashboard/index.html')
 
 
-def api_active_sessions(request):
+async def api_active_sessions(request):
     """활성 세션 API"""
     try:
-        sessions = db_client.get_active_sessions()
-
-        # 데이터 변환
-        formatted_sessions = []
-        for session in sessions:
-            formatted_sessions.append({
-                'session_id': session.get('session_id'),
-                'user_id': session.get('user_id'),
-                'last_activity': session.get('last_activity'),
-                'current_page': session.get('current_page', ''),
-                'duration': calculate_duration(session.get('last_activity'))
-            })
-
-        return JsonResponse(formatted_sessions, safe=False)
+        sessions = await run_db(presence.sessions)
+
+        def format_sessions():
+            # 데이터 변환
+            formatted_sessions = []
+            for session in sessions:
+                formatted_sessions.append({
+                    'session_id': session.get('session_id'),
+                    'user_id': session.get('user_id'),
+                    'last_activity': session.get('last_activity'),
+                    'current_page': session.get('current_page', ''),
+                    'duration': calculate_duration(session.get('last_activity'))
+                })
+            return formatted_sessions
+
+        # duration 은 매 요청마다 바뀌므로 원본 세션 상태로 버전 계산 (클라이언트가 경과 시간 보정)
+        version = sorted(
+            (str(s.get('session_id')), str(s.get('last_activity')), str(s.get('current_page', '')))
+            for s in sessions
+        )
+        return conditional_json_response(
+            request, format_sessions, safe=False, version=version,
+            last_modified=latest_activity_seconds(sessions)
+        )
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_session_events(request, session_id):
-    """세션별 이벤트 API"""
+async def api_session_events(request, session_id):
+    """세션별 이벤트 API (커서 페이지네이션, ?limit=&cursor=&order=desc)"""
     try:
-        events = db_client.get_session_events(session_id)
-        return JsonResponse(events, safe=False)
+        limit = parse_limit(request.GET.get('limit'), settings.EVENTS_PAGE_SIZE, settings.EVENTS_MAX_PAGE_SIZE)
+        newest_first = parse_newest_first(request.GET.get('order'))
+        scope = f"session:{session_id}:{'desc' if newest_first else 'asc'}"
+        start_key = decode_cursor(request.GET.get('cursor'), scope)
+
+        events, last_key = await run_db(
+            db_client.query_session_events,
+            session_id, limit=limit, exclusive_start_key=start_key, newest_first=newest_first
+        )
+        response = conditional_json_response(
+            request, events, safe=False, last_modified=latest_activity_seconds(events, 'timestamp')
+        )
+        return add_pagination_headers(request, response, encode_cursor(last_key, scope))
+    except (ValueError, InvalidCursor) as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_hourly_stats(request):
+async def api_hourly_stats(request):
     """시간대별 통계 API"""
     try:
+        if settings.EVENT_RATE_FROM_COUNTERS:
+            return conditional_json_response(request, await recent_event_counts(), safe=False)
         hours = int(request.GET.get('hours', 24))
-        events = db_client.get_hourly_stats(hours)
+        events = await run_db(db_client.get_hourly_stats, hours)
 
         # 시간대별 집계
-        hourly_counts = defaultdict(int)
-
-        # 로컬 타임존 기준 현재 시간
-        now = timezone.now()
-        now_local = now.astimezone(timezone.get_current_timezone())
-        hours_range = []
-
-        # 100분 전부터 현재까지 5분 간격으로 라벨 생성 (20개 포인트)
-        for i in range(20):
-            time_point = now_local - timedelta(minutes=(19 - i) * 5)
-            time_key = time_point.strftime('%H:%M')
-            hours_range.append(time_key)
-            hourly_counts[time_key] = 0
-
-        # 실제 이벤트 데이터로 카운트 업데이트
-        for event in events:
-            timestamp = int(event.get('timestamp', 0))
-            # UTC 타임스탬프를 서버 타임존으로 변환하여 표시
-            utc_time = datetime.fromtimestamp(timestamp / 1000, tz=pytz.UTC)
-            local_time = utc_time.astimezone(timezone.get_current_timezone())
+        with timed('aggregate'):
+            hourly_counts = defaultdict(int)
+
+            # 로컬 타임존 기준 현재 시간
+            now = timezone.now()
+            now_local = now.astimezone(timezone.get_current_timezone())
+            hours_range = []
+
+            # 100분 전부터 현재까지 5분 간격으로 라벨 생성 (20개 포인트)
+            for i in range(20):
+                time_point = now_local - timedelta(minutes=(19 - i) * 5)
+                time_key = time_point.strftime('%H:%M')
+                hours_range.append(time_key)
+                hourly_counts[time_key] = 0
+
+            # 실제 이벤트 데이터로 카운트 업데이트
+            for event in events:
+                timestamp = int(event.get('timestamp', 0))
+                # UTC 타임스탬프를 서버 타임존으로 변환하여 표시
+                utc_time = datetime.fromtimestamp(timestamp / 1000, tz=pytz.UTC)
+                local_time = utc_time.astimezone(timezone.get_current_timezone())
 
-            # 100분 이내 데이터만 포함
-            time_diff = (now - local_time).total_seconds()
-            if time_diff <= 100 * 60 and time_diff >= 0:
-                # 이벤트 시간을 5분 단위로 맞춤
-                minute_slot = (local_time.minute // 5) * 5
-                event_rounded = local_time.replace(minute=minute_slot, second=0, microsecond=0)
-                time_key = event_rounded.strftime('%H:%M')
-                if time_key in hourly_counts:
-                    hourly_counts[time_key] += 1
+                # 100분 이내 데이터만 포함
+                time_diff = (now - local_time).total_seconds()
+                if time_diff <= 100 * 60 and time_diff >= 0:
+                    # 이벤트 시간을 5분 단위로 맞춤
+                    minute_slot = (local_time.minute // 5) * 5
+                    event_rounded = local_time.replace(minute=minute_slot, second=0, microsecond=0)
+                    time_key = event_rounded.strftime('%H:%M')
+                    if time_key in hourly_counts:
+                        hourly_counts[time_key] += 1
 
         # 최근 20개 포인트만 반환 (현재 시간이 마지막)
         result = [{'hour': hour_key, 'count': hourly_counts[hour_key]} for hour_key in hours_range[-20:]]
-        return JsonResponse(result, safe=False)
+        return conditional_json_response(request, result, safe=False)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_page_stats(request):
+async def api_page_stats(request):
     """페이지별 통계 API"""
     try:
-        page_stats = db_client.get_page_stats()
-        return JsonResponse(page_stats, safe=False)
+        page_stats = await run_db(db_client.get_page_stats)
+        return conditional_json_response(request, page_stats, safe=False)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_summary_stats(request):
+async def api_summary_stats(request):
     """요약 통계 API"""
     try:
-        # 활성 세션 수
-        active_sessions = db_client.get_active_sessions()
-        total_sessions = len(active_sessions)
+        # 활성 세션 수 / 평균 경과 시간과 최근 24시간 이벤트를 동시에 조회
+        total_sessions, avg_duration, events = await gather_db(
+            (presence.active_count,),
+            (presence.average_duration,),
+            (db_client.get_hourly_stats, 24),
+        )
 
         # 총 이벤트 수 (최근 24시간)
-        events = db_client.get_hourly_stats(24)
         total_events = len(events)
 
         # 평균 세션 시간 계산
-        if active_sessions:
-            total_duration = sum(calculate_duration(s.get('last_activity')) for s in active_sessions)
-            avg_duration = total_duration / len(active_sessions)
+        if total_sessions:
             avg_minutes = int(avg_duration / 60000)
             avg_seconds = int((avg_duration % 60000) / 1000)
             avg_session_time = f"{avg_minutes}분 {avg_seconds}초"
@@ -133,10 +168,11 @@ def api_summary_stats(request):
             avg_session_time = "0분 0초"
 
         # 전환율 계산
-        conversion_events = [e for e in events if e.get('event_type') == 'conversion']
-        conversion_rate = f"{(len(conversion_events) / max(total_events, 1) * 100):.1f}%" if total_events > 0 else "0.0%"
+        with timed('aggregate'):
+            conversion_events = [e for e in events if e.get('event_type') == 'conversion']
+            conversion_rate = f"{(len(conversion_events) / max(total_events, 1) * 100):.1f}%" if total_events > 0 else "0.0%"
 
-        return JsonResponse({
+        return conditional_json_response(request, {
             'total_sessions': f"{total_sessions:,}",
             'total_events': f"{total_events:,}",
             'avg_session_time': avg_session_time,
@@ -146,33 +182,34 @@ def api_summary_stats(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_referrer_stats(request):
+async def api_referrer_stats(request):
     """유입 경로 통계 API"""
     try:
-        events = db_client.get_hourly_stats(168)  # 7일간 데이터
+        events = await run_db(db_client.get_hourly_stats, 168)  # 7일간 데이터
 
         # 리퍼러별 집계
-        referrer_counts = {}
-        for event in events:
-            if event.get('event_type') == 'page_view':
-                referrer = event.get('referrer', '')
-                if not referrer:
-                    referrer = 'Direct'
-                elif 'google' in referrer.lower():
-                    referrer = 'Google'
-                elif 'facebook' in referrer.lower():
-                    referrer = 'Facebook'
-                elif 'twitter' in referrer.lower():
-                    referrer = 'Twitter'
-                else:
-                    referrer = 'Other'
-
-                referrer_counts[referrer] = referrer_counts.get(referrer, 0) + 1
+        with timed('aggregate'):
+            referrer_counts = {}
+            for event in events:
+                if event.get('event_type') == 'page_view':
+                    referrer = event.get('referrer', '')
+                    if not referrer:
+                        referrer = 'Direct'
+                    elif 'google' in referrer.lower():
+                        referrer = 'Google'
+                    elif 'facebook' in referrer.lower():
+                        referrer = 'Facebook'
+                    elif 'twitter' in referrer.lower():
+                        referrer = 'Twitter'
+                    else:
+                        referrer = 'Other'
+
+                    referrer_counts[referrer] = referrer_counts.get(referrer, 0) + 1
 
         # 상위 5개 리퍼러
         sorted_referrers = sorted(referrer_counts.items(), key=lambda x: x[1], reverse=True)[:5]
 
-        return JsonResponse({
+        return conditional_json_response(request, {
             'labels': [item[0] for item in sorted_referrers],
             'data': [item[1] for item in sorted_referrers]
         })
@@ -180,46 +217,70 @@ def api_referrer_stats(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_hourly_details(request):
-    """특정 시간대 상세 데이터 API"""
+async def api_hourly_details(request):
+    """특정 시간대 상세 데이터 API (커서 페이지네이션, ?limit=&cursor=)"""
     try:
         hour = request.GET.get('hour')  # 'HH:MM' 형식
         if not hour:
             return JsonResponse({'error': 'hour parameter required'}, status=400)
-
-        # 해당 시간대의 이벤트 조회
-        events = db_client.get_hourly_stats(24)
-
-        # 해당 시간대 필터링
-        filtered_events = []
+        try:
+            hour_value, minute_value = (int(part) for part in hour.split(':'))
+        except ValueError:
+            return JsonResponse({'error': 'hour must be HH:MM'}, status=400)
+
+        limit = parse_limit(request.GET.get('limit'), 20, 100)
+
+        # 최근 24시간 중 해당 HH:MM 의 1분 구간 계산 (서버 타임존 기준)
+        now_local = timezone.now().astimezone(timezone.get_current_timezone())
+        window_start = now_local.replace(hour=hour_value, minute=minute_value, second=0, microsecond=0)
+        if window_start > now_local:
+            window_start -= timedelta(days=1)
+        start_ms = int(window_start.timestamp() * 1000)
+        end_ms = start_ms + 60 * 1000 - 1
+
+        scope = f"hourly:{start_ms}"
+        start_key = decode_cursor(request.GET.get('cursor'), scope)
+
+        # 해당 시간대의 이벤트 한 페이지 조회 (total_events 는 페이지가 아니라 그 1분 전체의 이벤트 수)
+        (events, next_key), total_events = await gather_db(
+            (db_client.scan_events_between, start_ms, end_ms, limit, start_key),
+            (db_client.count_events_between, start_ms, end_ms),
+        )
+
+        page_events = []
         for event in events:
             timestamp = int(event.get('timestamp', 0))
             # UTC 타임스탬프를 서버 타임존으로 변환
             utc_time = datetime.fromtimestamp(timestamp / 1000, tz=pytz.UTC)
             local_time = utc_time.astimezone(timezone.get_current_timezone())
-            event_hour = local_time.strftime('%H:%M')
 
-            if event_hour == hour:
-                filtered_events.append({
-                    'event_id': event.get('event_id'),
-                    'user_id': event.get('user_id'),
-                    'session_id': event.get('session_id'),
-                    'event_type': event.get('event_type'),
-                    'page_url': event.get('page_url'),
-                    'timestamp': event.get('timestamp'),
-                    'formatted_time': local_time.strftime('%H:%M:%S')
-                })
+            page_events.append({
+                'event_id': event.get('event_id'),
+                'user_id': event.get('user_id'),
+                'session_id': event.get('session_id'),
+                'event_type': event.get('event_type'),
+                'page_url': event.get('page_url'),
+                'timestamp': event.get('timestamp'),
+                'formatted_time': local_time.strftime('%H:%M:%S')
+            })
 
-        return JsonResponse({
+        next_cursor = encode_cursor(next_key, scope)
+        response = conditional_json_response(request, {
             'hour': hour,
-            'total_events': len(filtered_events),
-            'events': filtered_events[:20]  # 최대 20개만 반환
+            'total_events': total_events,
+            'page_size': len(page_events),
+            'events': page_events,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
+        return add_pagination_headers(request, response, next_cursor)
+    except (ValueError, InvalidCursor) as e:
+        return JsonResponse({'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_page_details(request):
+async def api_page_details(request):
     """특정 페이지 상세 데이터 API"""
     try:
         page_url = request.GET.get('page')
@@ -227,7 +288,7 @@ def api_page_details(request):
             return JsonResponse({'error': 'page parameter required'}, status=400)
 
         # 해당 페이지의 이벤트 조회
-        events = db_client.get_hourly_stats(24)
+        events = await run_db(db_client.get_hourly_stats, 24)
 
         # 해당 페이지 필터링
         filtered_events = []
@@ -256,7 +317,7 @@ def api_page_details(request):
             hour_key = local_time.strftime('%H:00')
             hourly_distribution[hour_key] += 1
 
-        return JsonResponse({
+        return conditional_json_response(request, {
             'page_url': page_url,
             'total_views': len(filtered_events),
             'recent_events': filtered_events[:10],  # 최근 10개
@@ -266,7 +327,7 @@ def api_page_details(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_referrer_details(request):
+async def api_referrer_details(request):
     """유입경로 상세 데이터 API"""
     try:
         referrer = request.GET.get('referrer')
@@ -274,7 +335,7 @@ def api_referrer_details(request):
             return JsonResponse({'error': 'referrer parameter required'}, status=400)
 
         # 해당 유입경로의 이벤트 조회
-        events = db_client.get_hourly_stats(168)  # 7일간 데이터
+        events = await run_db(db_client.get_hourly_stats, 168)  # 7일간 데이터
 
         # 해당 유입경로 필터링
         filtered_events = []
@@ -318,7 +379,7 @@ def api_referrer_details(request):
             hour_key = local_time.strftime('%H:00')
             hourly_distribution[hour_key] += 1
 
-        return JsonResponse({
+        return conditional_json_response(request, {
             'referrer': referrer,
             'total_visitors': len(filtered_events),
             'recent_visits': filtered_events[:10],  # 최근 10개
@@ -15,5 +15,8 @@ if [ -n "$STATIC_FILES_BUCKET" ]; then
 fi
 
 # Django 애플리케이션 시작
-echo "🌐 Starting Gunicorn server..."
-exec gunicorn --bind 0.0.0.0:8000 --workers 2 liveinsight.wsgi:application
\ No newline at end of file
+# 비동기 대시보드/통계 뷰를 위해 ASGI(uvicorn 워커)로 실행
+echo "🌐 Starting Gunicorn server (ASGI)..."
+exec gunicorn --bind 0.0.0.0:8000 --workers 2 \
+    --worker-class uvicorn.workers.UvicornWorker \
+    liveinsight.asgi:application
\ No newline at end of file
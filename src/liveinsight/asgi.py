@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "liveinsight.settings")
 
 application = get_asgi_application()
+
+# 워커가 요청을 받기 전에 수집 버퍼 WAL 을 재생하고 플러셔 시작
+from analytics.ingest import ingest_buffer  # noqa: E402
+
+ingest_buffer.start()
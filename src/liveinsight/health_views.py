@@ -1,6 +1,6 @@
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
-from analytics.dynamodb_client import db_client
+from analytics.storage import db_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,7 +10,7 @@ def health_check(request):
     """헬스체크 엔드포인트"""
     try:
         # DynamoDB 연결 테스트
-        db_client.get_active_sessions()
+        db_client.ping()
         
         return JsonResponse({
             'status': 'healthy',
@@ -50,7 +50,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "analytics.metrics.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "analytics.middleware.APICompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -165,10 +167,15 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # CORS 설정
 CORS_ALLOW_ALL_ORIGINS = True
 
+# 저장소 백엔드 설정 (DynamoDB 또는 로컬 SQLite)
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'analytics.dynamodb_client.DynamoDBClient')
+SQLITE_STORAGE_PATH = os.getenv('SQLITE_STORAGE_PATH', str(BASE_DIR / 'liveinsight.sqlite3'))
+
 # DynamoDB 테이블 설정
 EVENTS_TABLE = os.getenv('EVENTS_TABLE', 'LiveInsight-Events')
 SESSIONS_TABLE = os.getenv('SESSIONS_TABLE', 'LiveInsight-Sessions')
 ACTIVE_SESSIONS_TABLE = os.getenv('ACTIVE_SESSIONS_TABLE', 'LiveInsight-ActiveSessions')
+COUNTERS_TABLE = os.getenv('COUNTERS_TABLE', 'LiveInsight-Counters')
 
 # 캐시 설정
 CACHES = {
@@ -190,9 +197,56 @@ CACHES = {
     }
 }
 
+# API 응답 직렬화/압축 설정
+API_FAST_JSON = os.getenv('API_FAST_JSON', 'True') == 'True'
+API_COMPRESSION_MIN_BYTES = int(os.getenv('API_COMPRESSION_MIN_BYTES', '1024'))
+
+# 커서 페이지네이션 설정 (세션 이벤트 / 상세 조회)
+EVENTS_PAGE_SIZE = int(os.getenv('EVENTS_PAGE_SIZE', '100'))
+EVENTS_MAX_PAGE_SIZE = int(os.getenv('EVENTS_MAX_PAGE_SIZE', '1000'))
+
+# 이벤트 조회 API 설정 (시간 버킷 GSI, 디버그 헤더)
+EVENTS_TIME_BUCKET_INDEX = os.getenv('EVENTS_TIME_BUCKET_INDEX', 'TimeBucketIndex')
+EVENTS_TIME_BUCKET_MAX = int(os.getenv('EVENTS_TIME_BUCKET_MAX', '48'))
+QUERY_DEBUG_HEADERS = os.getenv('QUERY_DEBUG_HEADERS', str(DEBUG)) == 'True'
+
+# 사용자 여정 API 캐시 설정 (사용자별 LRU)
+USER_JOURNEY_CACHE_SIZE = int(os.getenv('USER_JOURNEY_CACHE_SIZE', '1024'))
+USER_JOURNEY_CACHE_TTL = int(os.getenv('USER_JOURNEY_CACHE_TTL', '30'))
+
+# 활성 세션 프레즌스 인덱스 설정 (만료 시간, DynamoDB 동기화 주기)
+PRESENCE_TTL_SECONDS = int(os.getenv('PRESENCE_TTL_SECONDS', '1800'))
+PRESENCE_SYNC_INTERVAL = int(os.getenv('PRESENCE_SYNC_INTERVAL', '15'))
+
+# Django 수집 경로 버퍼 설정 (플러시 묶음 크기 / 주기(초), 버퍼 상한)
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '100'))
+INGEST_FLUSH_INTERVAL = float(os.getenv('INGEST_FLUSH_INTERVAL', '1.0'))
+INGEST_MAX_BUFFER = int(os.getenv('INGEST_MAX_BUFFER', '10000'))
+# 수집 버퍼 WAL (빈 값이면 메모리 버퍼만 사용, 워커마다 slot-N 하위 디렉터리)
+INGEST_WAL_DIR = os.getenv('INGEST_WAL_DIR', '')
+INGEST_WAL_SEGMENT_MB = int(os.getenv('INGEST_WAL_SEGMENT_MB', '64'))
+
+# 핫 카운터 쓰기 샤딩 설정 (최대 샤드 수, 다른 쓰기 주체가 늘린 샤드 수를 다시 확인하는 간격(초))
+COUNTER_MAX_SHARDS = int(os.getenv('COUNTER_MAX_SHARDS', '64'))
+COUNTER_SHARDS_TTL = int(os.getenv('COUNTER_SHARDS_TTL', '300'))
+# 시간대별 통계를 5분 버킷 카운터에서 읽기 (False 면 이벤트 Scan 후 집계)
+EVENT_RATE_FROM_COUNTERS = os.getenv('EVENT_RATE_FROM_COUNTERS', 'True') == 'True'
+
+# 비동기 뷰의 DynamoDB 동시 호출 상한 (프로세스당)
+DYNAMODB_MAX_CONCURRENCY = int(os.getenv('DYNAMODB_MAX_CONCURRENCY', '16'))
+
+# 요청 계측 / Prometheus 메트릭 설정 (/metrics, Server-Timing 헤더)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True'
+SERVER_TIMING_HEADERS = os.getenv('SERVER_TIMING_HEADERS', str(DEBUG)) == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
 # DRF 설정
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'analytics.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
@@ -20,11 +20,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from analytics.metrics import metrics_view
 from .health_views import health_check
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health_check, name='health_check'),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include('analytics.urls')),
     path('', include('dashboard.urls')),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -53,12 +53,32 @@ function initCharts() {
     });
 }
 
+// ETag 기반 조건부 요청 (변경이 없으면 304 → 이전 응답 재사용)
+const etagCache = new Map();
+
+async function fetchJSON(url) {
+    const cached = etagCache.get(url);
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    const response = await fetch(url, { headers, cache: 'no-store' });
+
+    if (response.status === 304 && cached) {
+        const elapsed = Date.now() - cached.receivedAt;
+        return { data: cached.data, elapsed };
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        etagCache.set(url, { etag, data, receivedAt: Date.now() });
+    }
+    return { data, elapsed: 0 };
+}
+
 // 데이터 업데이트
 async function updateData() {
     try {
         // 요약 통계
-        const summaryRes = await fetch('/api/statistics/summary/');
-        const summary = await summaryRes.json();
+        const { data: summary } = await fetchJSON('/api/statistics/summary/');
         
         document.getElementById('total-sessions').textContent = summary.total_sessions || '0';
         document.getElementById('total-events').textContent = summary.total_events || '0';
@@ -66,16 +86,14 @@ async function updateData() {
         document.getElementById('conversion-rate').textContent = summary.conversion_rate || '0%';
 
         // 시간대별 데이터
-        const hourlyRes = await fetch('/api/statistics/hourly/');
-        const hourlyData = await hourlyRes.json();
+        const { data: hourlyData } = await fetchJSON('/api/statistics/hourly/');
         
         charts.realtime.data.labels = hourlyData.map(d => d.hour);
         charts.realtime.data.datasets[0].data = hourlyData.map(d => d.count);
         charts.realtime.update();
 
         // 페이지별 데이터
-        const pagesRes = await fetch('/api/statistics/pages/');
-        const pagesData = await pagesRes.json();
+        const { data: pagesData } = await fetchJSON('/api/statistics/pages/');
         
         const topPages = pagesData.slice(0, 5);
         charts.page.data.labels = topPages.map(p => p.page);
@@ -83,8 +101,9 @@ async function updateData() {
         charts.page.update();
 
         // 활성 세션
-        const sessionsRes = await fetch('/api/sessions/active/');
-        const sessions = await sessionsRes.json();
+        const { data: cachedSessions, elapsed } = await fetchJSON('/api/sessions/active/');
+        // 304 로 재사용한 경우 경과 시간 보정
+        const sessions = cachedSessions.map(s => ({ ...s, duration: (s.duration || 0) + elapsed }));
         
         const tbody = document.getElementById('sessions-tbody');
         if (sessions.length === 0) {
@@ -12,6 +12,7 @@ class RealtimeDashboard {
             events: [],
             stats: {}
         };
+        this.etagCache = new Map();
 
         this.init();
     }
@@ -226,11 +227,10 @@ class RealtimeDashboard {
         // 세션 상세 보기
         window.showSessionDetails = async (sessionId) => {
             try {
-                const response = await fetch(`/api/sessions/${sessionId}/events/`);
-                const events = await response.json();
+                const { events, truncated } = await this.fetchSessionEvents(sessionId);
 
                 const modalBody = document.getElementById('session-details');
-                modalBody.innerHTML = this.renderSessionDetails(sessionId, events);
+                modalBody.innerHTML = this.renderSessionDetails(sessionId, events, truncated);
 
                 new bootstrap.Modal(document.getElementById('sessionModal')).show();
             } catch (error) {
@@ -255,14 +255,60 @@ class RealtimeDashboard {
         }, 5000);
     }
 
+    // 세션 이벤트 전체 (X-Next-Cursor 를 따라 최대 maxPages 페이지) → { events, truncated }
+    async fetchSessionEvents(sessionId, maxPages = 10) {
+        const baseUrl = `/api/sessions/${encodeURIComponent(sessionId)}/events/?limit=1000`;
+        const events = [];
+        let cursor = null;
+        for (let page = 0; page < maxPages; page++) {
+            const url = cursor ? `${baseUrl}&cursor=${encodeURIComponent(cursor)}` : baseUrl;
+            const response = await fetch(url, { cache: 'no-store' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            events.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+            if (!cursor) {
+                return { events, truncated: false };
+            }
+        }
+        return { events, truncated: true };
+    }
+
+    // ETag 기반 조건부 요청 (변경이 없으면 304 → 이전 응답 재사용)
+    async fetchJSON(url, { onNotModified } = {}) {
+        const cached = this.etagCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch(url, { headers, cache: 'no-store' });
+
+        if (response.status === 304 && cached) {
+            const elapsed = Date.now() - cached.receivedAt;
+            return onNotModified ? onNotModified(cached.data, elapsed) : cached.data;
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (response.ok && etag) {
+            this.etagCache.set(url, { etag, data, receivedAt: Date.now() });
+        }
+        return data;
+    }
+
+    // 304 로 재사용한 세션 목록의 경과 시간 보정
+    ageSessions(sessions, elapsed) {
+        return sessions.map(session => ({ ...session, duration: (session.duration || 0) + elapsed }));
+    }
+
     async loadAllData() {
         try {
             const [sessions, summary, hourly, pages, referrers] = await Promise.all([
-                fetch('/api/sessions/active/').then(r => r.json()),
-                fetch('/api/statistics/summary/').then(r => r.json()),
-                fetch('/api/statistics/hourly/').then(r => r.json()),
-                fetch('/api/statistics/pages/').then(r => r.json()),
-                fetch('/api/statistics/referrers/').then(r => r.json())
+                this.fetchJSON('/api/sessions/active/', {
+                    onNotModified: (sessions, elapsed) => this.ageSessions(sessions, elapsed)
+                }),
+                this.fetchJSON('/api/statistics/summary/'),
+                this.fetchJSON('/api/statistics/hourly/'),
+                this.fetchJSON('/api/statistics/pages/'),
+                this.fetchJSON('/api/statistics/referrers/')
             ]);
 
             this.updateSessions(sessions);
@@ -371,13 +417,13 @@ class RealtimeDashboard {
             new Date().toLocaleTimeString('ko-KR');
     }
 
-    renderSessionDetails(sessionId, events) {
+    renderSessionDetails(sessionId, events, truncated = false) {
         return `
             <div class="row">
                 <div class="col-md-6">
                     <h6>세션 정보</h6>
                     <p><strong>세션 ID:</strong> ${sessionId}</p>
-                    <p><strong>이벤트 수:</strong> ${events.length}</p>
+                    <p><strong>이벤트 수:</strong> ${events.length}${truncated ? '+' : ''}</p>
                     <p><strong>시작 시간:</strong> ${events.length > 0 ? this.formatTimestamp(events[0].timestamp) : 'N/A'}</p>
                 </div>
                 <div class="col-md-6">
@@ -14,6 +14,7 @@ class TossDashboard {
         };
         this.isModalOpen = false;
         this.updateCounter = 0;
+        this.etagCache = new Map();
         this.sortConfig = {
             field: null,
             direction: 'asc'
@@ -284,11 +285,10 @@ class TossDashboard {
             try {
                 this.isModalOpen = true;
                 this.showModalLoading();
-                const response = await fetch(`/api/sessions/${sessionId}/events/`);
-                const events = await response.json();
+                const { events, truncated } = await this.fetchSessionEvents(sessionId);
                 
                 const modalBody = document.getElementById('session-details');
-                modalBody.innerHTML = this.renderSessionDetails(sessionId, events);
+                modalBody.innerHTML = this.renderSessionDetails(sessionId, events, truncated);
                 
                 // 기존 모달 인스턴스 정리
                 const existingModal = bootstrap.Modal.getInstance(document.getElementById('sessionModal'));
@@ -363,6 +363,50 @@ class TossDashboard {
         }, 10000);
     }
     
+    // 세션 이벤트 전체 (X-Next-Cursor 를 따라 최대 maxPages 페이지) → { events, truncated }
+    async fetchSessionEvents(sessionId, maxPages = 10) {
+        const baseUrl = `/api/sessions/${encodeURIComponent(sessionId)}/events/?limit=1000`;
+        const events = [];
+        let cursor = null;
+        for (let page = 0; page < maxPages; page++) {
+            const url = cursor ? `${baseUrl}&cursor=${encodeURIComponent(cursor)}` : baseUrl;
+            const response = await fetch(url, { cache: 'no-store' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            events.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+            if (!cursor) {
+                return { events, truncated: false };
+            }
+        }
+        return { events, truncated: true };
+    }
+    
+    // ETag 기반 조건부 요청 (변경이 없으면 304 → 이전 응답 재사용)
+    async fetchJSON(url, { onNotModified } = {}) {
+        const cached = this.etagCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        const response = await fetch(url, { headers, cache: 'no-store' });
+
+        if (response.status === 304 && cached) {
+            const elapsed = Date.now() - cached.receivedAt;
+            return onNotModified ? onNotModified(cached.data, elapsed) : cached.data;
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (response.ok && etag) {
+            this.etagCache.set(url, { etag, data, receivedAt: Date.now() });
+        }
+        return data;
+    }
+
+    // 304 로 재사용한 세션 목록의 경과 시간 보정
+    ageSessions(sessions, elapsed) {
+        return sessions.map(session => ({ ...session, duration: (session.duration || 0) + elapsed }));
+    }
+    
     async loadAllData() {
         if (this.data.isLoading) return;
         
@@ -371,11 +415,13 @@ class TossDashboard {
         
         try {
             const [sessions, summary, hourly, pages, referrers] = await Promise.all([
-                fetch('/api/sessions/active/').then(r => r.json()),
-                fetch('/api/statistics/summary/').then(r => r.json()),
-                fetch('/api/statistics/hourly/').then(r => r.json()),
-                fetch('/api/statistics/pages/').then(r => r.json()),
-                fetch('/api/statistics/referrers/').then(r => r.json())
+                this.fetchJSON('/api/sessions/active/', {
+                    onNotModified: (sessions, elapsed) => this.ageSessions(sessions, elapsed)
+                }),
+                this.fetchJSON('/api/statistics/summary/'),
+                this.fetchJSON('/api/statistics/hourly/'),
+                this.fetchJSON('/api/statistics/pages/'),
+                this.fetchJSON('/api/statistics/referrers/')
             ]);
             
             this.updateSessions(sessions);
@@ -794,7 +840,7 @@ class TossDashboard {
         }
     }
     
-    renderSessionDetails(sessionId, events) {
+    renderSessionDetails(sessionId, events, truncated = false) {
         const startTime = events.length > 0 ? events[0].timestamp : null;
         const endTime = events.length > 0 ? events[events.length - 1].timestamp : null;
         const duration = startTime && endTime ? endTime - startTime : 0;
@@ -814,7 +860,7 @@ class TossDashboard {
                             </div>
                             <div class="mb-2">
                                 <small class="text-muted">총 이벤트</small>
-                                <div class="fw-medium">${events.length}개</div>
+                                <div class="fw-medium">${events.length}${truncated ? '+' : ''}개</div>
                             </div>
                             <div class="mb-2">
                                 <small class="text-muted">세션 시간</small>
@@ -908,28 +954,34 @@ class TossDashboard {
                     <div class="col-md-6">
                         <h6 class="mb-3">
                             <i class="fas fa-list text-primary me-2"></i>
-                            최근 이벤트 (최대 20개)
+                            최근 이벤트
                         </h6>
-                        <div class="timeline-container" style="max-height: 500px; overflow-y: auto;">
-                            ${data.events.map((event, index) => `
-                                <div class="timeline-item" style="animation-delay: ${index * 0.05}s">
-                                    <div class="d-flex justify-content-between align-items-start mb-1">
-                                        <span class="badge bg-primary">${event.event_type}</span>
-                                        <small class="text-muted">${event.formatted_time}</small>
-                                    </div>
-                                    <div class="small mb-1">
-                                        <strong>사용자:</strong> ${event.user_id}
-                                    </div>
-                                    <div class="small text-truncate">${event.page_url}</div>
-                                </div>
-                            `).join('')}
+                        <div class="timeline-container" id="hourly-timeline" style="max-height: 500px; overflow-y: auto;">
+                            ${this.renderHourlyEvents(data.events)}
                         </div>
+                        <button class="btn btn-outline-primary btn-sm mt-2 w-100" id="hourly-load-more"
+                                style="display: ${data.has_more ? 'block' : 'none'}">더 보기</button>
                     </div>
                 </div>
             `;
             
             document.querySelector('.modal-title').textContent = `${hour} 시간대 상세 정보`;
             
+            // 커서 기반 다음 페이지 로드
+            let nextCursor = data.next_cursor;
+            const loadMoreButton = document.getElementById('hourly-load-more');
+            loadMoreButton.addEventListener('click', async () => {
+                if (!nextCursor) return;
+                loadMoreButton.disabled = true;
+                const page = await this.fetchJSON(
+                    `/api/hourly-details/?hour=${encodeURIComponent(hour)}&cursor=${encodeURIComponent(nextCursor)}`
+                );
+                document.getElementById('hourly-timeline').insertAdjacentHTML('beforeend', this.renderHourlyEvents(page.events));
+                nextCursor = page.next_cursor;
+                loadMoreButton.style.display = page.has_more ? 'block' : 'none';
+                loadMoreButton.disabled = false;
+            });
+            
             // 기존 모달 인스턴스 정리
             const existingModal = bootstrap.Modal.getInstance(document.getElementById('sessionModal'));
             if (existingModal) {
@@ -946,6 +998,21 @@ class TossDashboard {
         }
     }
     
+    renderHourlyEvents(events) {
+        return events.map((event, index) => `
+            <div class="timeline-item" style="animation-delay: ${index * 0.05}s">
+                <div class="d-flex justify-content-between align-items-start mb-1">
+                    <span class="badge bg-primary">${event.event_type}</span>
+                    <small class="text-muted">${event.formatted_time}</small>
+                </div>
+                <div class="small mb-1">
+                    <strong>사용자:</strong> ${event.user_id}
+                </div>
+                <div class="small text-truncate">${event.page_url}</div>
+            </div>
+        `).join('');
+    }
+    
     async showPageDetails(pageUrl) {
         try {
             this.isModalOpen = true;
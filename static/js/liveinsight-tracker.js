@@ -1,11 +1,26 @@
 (function() {
     'use strict';
     
+    // lambda_function.py MAX_BATCH_EVENTS 기본값
+    const MAX_BATCH_EVENTS = 100;
+    
     class LiveInsightTracker {
         constructor(config) {
             this.apiUrl = config.apiUrl;
             this.userId = this.getUserId();
             this.sessionId = this.getSessionId();
+            
+            // 배치 전송: batchSize 개가 모이거나 flushInterval 이 지나거나 페이지가 숨겨지면 전송
+            // (수집기는 MAX_BATCH_EVENTS 를 넘는 배치를 413 으로 거절)
+            this.batchSize = Math.min(config.batchSize || 20, MAX_BATCH_EVENTS);
+            this.flushInterval = config.flushInterval || 5000;
+            this.compress = config.compress !== false && typeof CompressionStream !== 'undefined';
+            this.queue = [];
+            this.flushTimer = null;
+            
+            // 이벤트 ID = 페이지 로드별 접두사 + 순번 (재전송돼도 같은 ID 라 수집기에서 중복 제거)
+            this.idPrefix = Date.now().toString(36) + Math.random().toString(36).substr(2, 8);
+            this.seq = 0;
             this.init();
         }
         
@@ -69,12 +84,21 @@
                 }
             });
             
-            // 페이지 이탈 추적
-            window.addEventListener('beforeunload', () => {
-                this.sendEvent({
+            // 탭이 숨겨지면 대기 중인 이벤트 전송 (모바일에서는 이후 unload 가 오지 않을 수 있음)
+            document.addEventListener('visibilitychange', () => {
+                if (document.visibilityState === 'hidden') {
+                    this.flush(true);
+                }
+            });
+            
+            // 페이지 이탈 추적 (beforeunload 보다 pagehide 가 bfcache/모바일에서도 안정적)
+            // 큐에만 넣고 (sendEvent 는 비동기 gzip 전송을 시작할 수 있음) 큐 전체를 비콘 하나로 바로 전송
+            window.addEventListener('pagehide', () => {
+                this.enqueue({
                     event_type: 'page_exit',
                     page_url: window.location.href
                 });
+                this.flush(true);
             });
         }
         
@@ -87,20 +111,77 @@
             }, 30000); // 30초마다
         }
         
+        enqueue(eventData) {
+            this.queue.push({ ...eventData, seq: this.seq++, at: Date.now() });
+        }
+        
         sendEvent(eventData) {
-            const payload = {
+            this.enqueue(eventData);
+            
+            if (this.queue.length >= this.batchSize) {
+                this.flush();
+            } else if (!this.flushTimer) {
+                this.flushTimer = setTimeout(() => this.flush(), this.flushInterval);
+            }
+        }
+        
+        // 세션 공통 필드는 봉투에 한 번만, page_url 은 직전 이벤트와 다를 때만 포함
+        buildBatch(events) {
+            const sentAt = Date.now();
+            let lastPage = null;
+            return {
+                v: 1,
                 user_id: this.userId,
                 session_id: this.sessionId,
-                timestamp: Date.now(),
-                ...eventData
+                user_agent: navigator.userAgent,
+                id_prefix: this.idPrefix,
+                sent_at: sentAt,
+                events: events.map(({ at, user_agent, ...event }) => {
+                    event.dt = at - sentAt;
+                    if (event.page_url === lastPage) {
+                        delete event.page_url;
+                    } else {
+                        lastPage = event.page_url;
+                    }
+                    return event;
+                })
             };
+        }
+        
+        // sync: 페이지가 사라지는 중이면 비동기 압축을 기다리지 않고 바로 전송
+        flush(sync = false) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+            if (!this.queue.length) {
+                return;
+            }
             
+            const body = JSON.stringify(this.buildBatch(this.queue.splice(0)));
+            if (sync || !this.compress) {
+                this.transmit(body);
+                return;
+            }
+            this.gzip(body)
+                .then(compressed => this.transmit(compressed))
+                .catch(() => this.transmit(body));
+        }
+        
+        gzip(text) {
+            const stream = new Blob([text]).stream().pipeThrough(new CompressionStream('gzip'));
+            return new Response(stream).arrayBuffer();
+        }
+        
+        // text/plain 은 CORS preflight 가 없어 sendBeacon 이 교차 출처로도 바로 전송됨
+        // (수집기는 gzip 여부를 본문 매직 바이트로 판별)
+        transmit(body) {
+            const blob = new Blob([body], { type: 'text/plain' });
+            if (navigator.sendBeacon && navigator.sendBeacon(this.apiUrl, blob)) {
+                return;
+            }
             fetch(this.apiUrl, {
                 method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify(payload)
+                body: blob,
+                keepalive: true
             }).catch(error => {
                 console.error('LiveInsight tracking error:', error);
             });
@@ -124,6 +205,11 @@
             if (window.liTracker) {
                 window.liTracker.trackConversion(type);
             }
+        },
+        flush: function() {
+            if (window.liTracker) {
+                window.liTracker.flush();
+            }
         }
     };
 })();
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+쓰기 샤딩 카운터 벤치마크
+여러 쓰기 스레드가 핫 카운터 하나 (5분 버킷 이벤트 수) 를 동시에 올릴 때 샤드 수 N 별 처리량 / 스로틀 수를 비교한다.
+fake DynamoDB Counters 테이블에 파티션 (counter_id) 별 쓰기 용량 (--partition-wcu) 을 주어 핫 파티션 스로틀을 재현하고,
+고정 N (최대 샤드 수 = N) 과 스로틀에 따라 샤드를 늘리는 적응형 (1 → --max-shards) 을 실행한 뒤
+get() (모든 샤드 BatchGetItem 합산) 결과가 반영된 증가분과 같은지 확인한다.
+
+    python tests/performance/counter_benchmark.py
+    python tests/performance/counter_benchmark.py --shards 1 4 16 --threads 32 --partition-wcu 500 --output counters.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from fake_dynamodb import create_liveinsight_tables  # noqa: E402
+from histogram import LatencyHistogram  # noqa: E402
+
+from analytics.counters import ShardedCounters  # noqa: E402
+
+COUNTER = 'events#202311142210'
+
+
+def run_writers(counters, threads, seconds):
+    """threads 개 스레드가 seconds 초 동안 increment({COUNTER: 1}) → (시도, 반영, 지연 히스토그램, 경과 시간)"""
+    latency = LatencyHistogram()
+    attempted = [0] * threads
+    applied = [0] * threads
+    lock = threading.Lock()
+    stop = time.perf_counter() + seconds
+
+    def worker(slot):
+        histogram = LatencyHistogram()
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            failed = counters.increment({COUNTER: 1})
+            histogram.record((time.perf_counter() - started) * 1_000_000)
+            attempted[slot] += 1
+            if not failed:
+                applied[slot] += 1
+        with lock:
+            latency.merge(histogram)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(attempted), sum(applied), latency, time.perf_counter() - started
+
+
+def run_case(label, initial_shards, max_shards, args):
+    resource = create_liveinsight_tables(
+        latency=args.table_latency_ms / 1000, partition_write_capacity=args.partition_wcu
+    )
+    table = resource.Table('LiveInsight-Counters')
+    if initial_shards > 1:
+        table.put_item(Item={'counter_id': f'{COUNTER}#shards', 'shards': initial_shards})
+        table.partition_buckets.clear()
+    counters = ShardedCounters(resource, table, max_shards=max_shards)
+
+    attempted, applied, latency, elapsed = run_writers(counters, args.threads, args.seconds)
+    # 읽기는 새 인스턴스로 (저장된 샤드 수 기준 합산 확인)
+    reader = ShardedCounters(resource, table, max_shards=max_shards)
+    read_started = time.perf_counter()
+    total = reader.get([COUNTER])[COUNTER]
+    read_ms = (time.perf_counter() - read_started) * 1000
+    shards = reader.shard_counts([COUNTER])[COUNTER]
+
+    result = {
+        'mode': label,
+        'shards': shards,
+        'attempted': attempted,
+        'applied': applied,
+        'increments_per_second': applied / elapsed,
+        'throttles': table.stats['throttles'],
+        'failed': attempted - applied,
+        'grown': counters.stats['grown'],
+        'increment_latency': latency.summary_ms(),
+        'read_total': total,
+        'read_ms': read_ms,
+        'consistent': total == applied,
+    }
+    print(f"   {label:<14} N={shards:<3} {result['increments_per_second']:>9,.0f} increments/s  "
+          f"throttles {result['throttles']:>6,}  failed {result['failed']:>6,}  "
+          f"p99 {result['increment_latency']['p99_ms']:.2f}ms  "
+          f"read {read_ms:.1f}ms sum {'ok' if result['consistent'] else f'MISMATCH {total} != {applied}'}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight sharded counter benchmark')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8, 16], help='고정 샤드 수')
+    parser.add_argument('--max-shards', type=int, default=64, help='적응형 최대 샤드 수')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--partition-wcu', type=float, default=1000, help='counter_id 별 초당 쓰기 용량')
+    parser.add_argument('--table-latency-ms', type=float, default=1.0, help='fake DynamoDB 호출당 지연')
+    parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    print(f"🧪 Sharded counter benchmark ({args.threads} writers, {args.partition_wcu:g} WCU/partition, "
+          f"table latency {args.table_latency_ms:g}ms)")
+    results = [run_case('fixed', shards, shards, args) for shards in args.shards]
+    results.append(run_case('adaptive', 1, args.max_shards, args))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
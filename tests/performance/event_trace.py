@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+수집 트래픽 트레이스 기록 / 재생 도구
+
+트레이스 파일: 줄마다 {"t": 수신 시각(ms), "ip": 클라이언트 IP, "body": lambda_handler 가 받은 JSON 본문}
+인 NDJSON (.gz 면 gzip), t 오름차순.
+
+기록:
+    Lambda 환경변수 TRACE_SAMPLE_RATE (terraform var.trace_sample_rate) 비율만큼
+    'Trace request' 로그가 남는다. 내보낸 CloudWatch 로그에서 추출한다.
+    python tests/performance/event_trace.py extract logs/*.log -o trace.ndjson.gz
+    python tests/performance/event_trace.py from-events events.ndjson.gz -o trace.ndjson.gz   # 생성기 출력 변환
+
+재생:
+    python tests/performance/event_trace.py replay trace.ndjson.gz --url http://127.0.0.1:9000/events --speed 10
+    python tests/performance/event_trace.py replay trace.ndjson.gz --url http://127.0.0.1:8000/api/events/ \\
+        --django --speed max --workers 128
+
+세션 단위로 워커에 나눠 같은 세션의 이벤트는 기록된 순서대로 하나씩 보내고,
+이벤트 간 간격은 --speed 배로 압축한다 (max 는 간격 없이).
+수집기가 새 session_id 를 발급하면 이후 같은 세션 이벤트는 발급된 ID 로 바꿔 보낸다.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+
+# 재생 본문에 포함할 필드 (트래커가 보내는 필드)
+BODY_FIELDS = ('user_id', 'session_id', 'event_type', 'page_url', 'referrer', 'user_agent')
+
+
+def open_text(path, mode='rt'):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def read_trace(path):
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_trace(path, records):
+    """시각순 정렬 후 저장 → 기록 수"""
+    records = sorted(records, key=lambda record: record['t'])
+    with open_text(path, 'wt') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+    return len(records)
+
+
+# 추출
+
+def log_messages(path):
+    """내보낸 로그의 메시지 (filter-log-events JSON, 줄 단위 텍스트 모두 지원)"""
+    with open_text(path) as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith('{') and '"events"' in stripped[:200]:
+        try:
+            for event in json.loads(stripped).get('events', []):
+                yield event.get('message', '')
+            return
+        except json.JSONDecodeError:
+            pass
+    yield from text.splitlines()
+
+
+def json_payload(message):
+    # "[INFO]\t2025-01-01T00:00:00Z\t<request id>\t{...}" 처럼 앞에 붙은 접두사 제거
+    start = message.find('{')
+    if start < 0:
+        return None
+    try:
+        return json.loads(message[start:])
+    except json.JSONDecodeError:
+        return None
+
+
+def extract(paths):
+    for path in paths:
+        for message in log_messages(path):
+            if 'Trace request' not in message:
+                continue
+            payload = json_payload(message)
+            if payload and isinstance(payload.get('trace'), dict):
+                yield payload['trace']
+
+
+def from_events(path):
+    """이벤트 NDJSON (traffic_generator.py 출력) → 트레이스 기록"""
+    with open_text(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            yield {
+                't': int(event['timestamp']),
+                'ip': event.get('ip_address', ''),
+                'body': {field: event[field] for field in BODY_FIELDS if event.get(field) is not None},
+            }
+
+
+# 재생
+
+def shard_of(record, shards):
+    session_id = record['body'].get('session_id') or record['body'].get('user_id') or ''
+    return zlib.crc32(session_id.encode('utf-8')) % shards
+
+
+class Replayer:
+    """세션별 순서를 지키며 트레이스를 시간 압축 재생"""
+
+    def __init__(self, url, speed=1.0, workers=64, django=False, timeout=10, limit=None):
+        self.url = url
+        self.speed = speed  # None 이면 최대 속도
+        self.workers = workers
+        self.django = django
+        self.timeout = timeout
+        self.limit = limit
+        self.latency = LatencyHistogram()
+        # 예정 시각보다 늦게 보낸 정도 (클라이언트/세션 순서 대기로 밀린 시간)
+        self.lag = LatencyHistogram()
+        self.statuses = {}
+        self.session_ids = {}
+
+    def prepare(self, record):
+        body = dict(record['body'])
+        session_id = body.get('session_id')
+        if session_id in self.session_ids:
+            body['session_id'] = self.session_ids[session_id]
+        if self.django:
+            # EventCollectionView 필수 필드
+            body['timestamp'] = int(time.time() * 1000)
+            body.setdefault('session_id', f"replay_{body.get('user_id', '')}")
+            body.setdefault('user_id', 'replay_user')
+            body.setdefault('event_type', 'page_view')
+        headers = {'X-Forwarded-For': record['ip']} if record.get('ip') else {}
+        return body, headers
+
+    async def _send(self, session, record):
+        body, headers = self.prepare(record)
+        started = time.perf_counter()
+        try:
+            async with session.post(self.url, json=body, headers=headers) as response:
+                payload = await response.read()
+                status = response.status
+            if status == 200 and not self.django:
+                issued = json.loads(payload).get('session_id')
+                original = record['body'].get('session_id')
+                if issued and original and issued != original:
+                    self.session_ids[original] = issued
+        except Exception as e:
+            status = type(e).__name__
+        self.latency.record((time.perf_counter() - started) * 1_000_000)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def _worker(self, session, records, origin_t, started):
+        loop = asyncio.get_running_loop()
+        for record in records:
+            if self.speed:
+                due = started + (record['t'] - origin_t) / 1000 / self.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.lag.record(max(0.0, loop.time() - due) * 1_000_000)
+            await self._send(session, record)
+
+    async def replay(self, path):
+        import aiohttp
+
+        shards = [[] for _ in range(self.workers)]
+        origin_t = None
+        total = 0
+        for record in read_trace(path):
+            if self.limit and total >= self.limit:
+                break
+            if origin_t is None:
+                origin_t = record['t']
+            shards[shard_of(record, self.workers)].append(record)
+            total += 1
+        if not total:
+            return {'records': 0}
+        last_t = max(shard[-1]['t'] for shard in shards if shard)
+
+        connector = aiohttp.TCPConnector(limit=self.workers)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            loop = asyncio.get_running_loop()
+            started = loop.time() + 0.1
+            await asyncio.gather(*(
+                self._worker(session, shard, origin_t, started) for shard in shards if shard
+            ))
+            elapsed = loop.time() - started
+
+        return {
+            'records': total,
+            'trace_seconds': (last_t - origin_t) / 1000,
+            'elapsed_seconds': elapsed,
+            'speed': self.speed or 'max',
+            'achieved_speedup': (last_t - origin_t) / 1000 / elapsed if elapsed > 0 else None,
+            'throughput': total / elapsed if elapsed > 0 else 0.0,
+            'statuses': {str(k): v for k, v in self.statuses.items()},
+            'latency': self.latency.summary_ms(),
+            'schedule_lag': self.lag.summary_ms(),
+            'remapped_sessions': len(self.session_ids),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight ingest trace record / replay')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    extract_parser = commands.add_parser('extract', help='CloudWatch 로그에서 트레이스 추출')
+    extract_parser.add_argument('logs', nargs='+')
+    extract_parser.add_argument('-o', '--output', required=True)
+
+    events_parser = commands.add_parser('from-events', help='이벤트 NDJSON 을 트레이스로 변환')
+    events_parser.add_argument('events')
+    events_parser.add_argument('-o', '--output', required=True)
+
+    replay_parser = commands.add_parser('replay', help='트레이스 재생')
+    replay_parser.add_argument('trace')
+    replay_parser.add_argument('--url', required=True, help='수집기 (Lambda/하네스) 또는 Django /api/events/')
+    replay_parser.add_argument('--speed', default='1', help='배속 (1, 10, ...) 또는 max')
+    replay_parser.add_argument('--workers', type=int, default=64, help='비동기 워커(세션 샤드) 수')
+    replay_parser.add_argument('--django', action='store_true', help='EventCollectionView 형식으로 전송')
+    replay_parser.add_argument('--limit', type=int, help='앞에서부터 N개만 재생')
+    replay_parser.add_argument('--timeout', type=float, default=10)
+    replay_parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    if args.command == 'extract':
+        count = write_trace(args.output, extract(args.logs))
+        print(f"✅ {count:,} trace records → {args.output}")
+    elif args.command == 'from-events':
+        count = write_trace(args.output, from_events(args.events))
+        print(f"✅ {count:,} trace records → {args.output}")
+    else:
+        speed = None if args.speed == 'max' else float(args.speed)
+        replayer = Replayer(args.url, speed, args.workers, args.django, args.timeout, args.limit)
+        pace = 'max speed' if speed is None else f'{speed:g}x'
+        print(f"▶️  Replaying {args.trace} at {pace} with {args.workers} workers...")
+        result = asyncio.run(replayer.replay(args.trace))
+        if not result['records']:
+            print("⚠️ Empty trace")
+            return
+        latency = result['latency']
+        print(f"✅ {result['records']:,} events in {result['elapsed_seconds']:.1f}s "
+              f"({result['throughput']:.1f}/s, trace {result['trace_seconds']:.1f}s)")
+        print(f"   statuses: {result['statuses']}")
+        print(f"   latency p50 {latency['p50_ms']:.2f}ms  p99 {latency['p99_ms']:.2f}ms  "
+              f"p99.9 {latency['p99.9_ms']:.2f}ms  max {latency['max_ms']:.2f}ms")
+        if speed:
+            print(f"   schedule lag p99 {result['schedule_lag']['p99_ms']:.2f}ms")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,724 @@
+"""
+인프로세스 DynamoDB 대역
+
+boto3 Table 리소스 API 중 이 프로젝트가 사용하는 부분(put/get/update/delete_item,
+query, scan, batch_writer, batch_get_item)을 메모리에서 흉내 낸다.
+오프라인 벤치마크와 로컬 하네스에서 사용하며, 페이지 크기/용량 단위/스로틀링도 재현한다.
+"""
+
+import re
+import threading
+import time
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import AttributeBase, ConditionBase
+from botocore.exceptions import ClientError
+
+# 실제 DynamoDB 의 1MB 페이지 대신 아이템 수로 페이지를 자름
+DEFAULT_PAGE_ITEMS = 1000
+
+
+def item_size(item):
+    """아이템 크기 근사치 (바이트)"""
+    size = 0
+    for key, value in item.items():
+        size += len(key) + len(str(value))
+    return size
+
+
+def _throttle_error(operation):
+    return ClientError(
+        {'Error': {'Code': 'ProvisionedThroughputExceededException',
+                   'Message': 'Rate of requests exceeds the allowed throughput'}},
+        operation
+    )
+
+
+def _conditional_error(operation):
+    return ClientError(
+        {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'The conditional request failed'}},
+        operation
+    )
+
+
+# ---------------------------------------------------------------------------
+# 조건식 평가 (boto3 조건 객체 + 문자열 표현식)
+# ---------------------------------------------------------------------------
+
+def _resolve(value, item):
+    if isinstance(value, AttributeBase):
+        return item.get(value.name)
+    return value
+
+
+def evaluate(condition, item):
+    """boto3 조건 객체를 아이템에 대해 평가"""
+    if condition is None:
+        return True
+    expression = condition.get_expression()
+    operator = expression['operator']
+    values = expression['values']
+    if operator == 'AND':
+        return evaluate(values[0], item) and evaluate(values[1], item)
+    if operator == 'OR':
+        return evaluate(values[0], item) or evaluate(values[1], item)
+    if operator == 'NOT':
+        return not evaluate(values[0], item)
+    if operator == 'attribute_exists':
+        return values[0].name in item
+    if operator == 'attribute_not_exists':
+        return values[0].name not in item
+    left = _resolve(values[0], item)
+    if left is None:
+        return False
+    return _compare(operator, left, [_resolve(v, item) for v in values[1:]])
+
+
+def _compare(operator, left, rights):
+    try:
+        if operator == '=':
+            return left == rights[0]
+        if operator == '<>':
+            return left != rights[0]
+        if operator == '<':
+            return left < rights[0]
+        if operator == '<=':
+            return left <= rights[0]
+        if operator == '>':
+            return left > rights[0]
+        if operator == '>=':
+            return left >= rights[0]
+        if operator == 'BETWEEN':
+            return rights[0] <= left <= rights[1]
+        if operator == 'begins_with':
+            return str(left).startswith(rights[0])
+        if operator == 'contains':
+            return rights[0] in left
+        if operator == 'IN':
+            return left in rights[0]
+    except TypeError:
+        return False
+    raise NotImplementedError(operator)
+
+
+_TOKEN_RE = re.compile(r'\s*(<>|<=|>=|=|<|>|\(|\)|,|\+|-|[#:]?[A-Za-z_][A-Za-z0-9_.]*)')
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match:
+            raise ValueError(f'Cannot parse expression: {expression!r}')
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _StringCondition:
+    """문자열 조건식 (FilterExpression / KeyConditionExpression / ConditionExpression)"""
+
+    def __init__(self, expression, names, values):
+        self.tokens = _tokenize(expression)
+        self.names = names or {}
+        self.values = values or {}
+        self.position = 0
+        self.tree = self._parse_or()
+
+    # 재귀 하강 파서
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while self._peek() and self._peek().upper() == 'OR':
+            self._next()
+            node = ('OR', node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._peek() and self._peek().upper() == 'AND':
+            self._next()
+            node = ('AND', node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if self._peek() and self._peek().upper() == 'NOT':
+            self._next()
+            return ('NOT', self._parse_not())
+        return self._parse_primary()
+
+    def _parse_primary(self):
+        token = self._next()
+        if token == '(':
+            node = self._parse_or()
+            self._next()  # ')'
+            return node
+        if token in ('attribute_exists', 'attribute_not_exists', 'begins_with', 'contains'):
+            self._next()  # '('
+            operands = [self._next()]
+            while self._peek() == ',':
+                self._next()
+                operands.append(self._next())
+            self._next()  # ')'
+            return (token, operands)
+        operand = token
+        operator = self._next().upper()
+        if operator == 'BETWEEN':
+            low = self._next()
+            self._next()  # AND
+            high = self._next()
+            return ('BETWEEN', [operand, low, high])
+        if operator == 'IN':
+            self._next()  # '('
+            options = [self._next()]
+            while self._peek() == ',':
+                self._next()
+                options.append(self._next())
+            self._next()
+            return ('IN', [operand] + options)
+        return (operator, [operand, self._next()])
+
+    def _operand(self, token, item):
+        if token.startswith(':'):
+            return self.values[token]
+        name = self.names.get(token, token)
+        return item.get(name)
+
+    def _attribute_name(self, token):
+        return self.names.get(token, token)
+
+    def _eval(self, node, item):
+        operator = node[0]
+        if operator == 'AND':
+            return self._eval(node[1], item) and self._eval(node[2], item)
+        if operator == 'OR':
+            return self._eval(node[1], item) or self._eval(node[2], item)
+        if operator == 'NOT':
+            return not self._eval(node[1], item)
+        operands = node[1]
+        if operator == 'attribute_exists':
+            return self._attribute_name(operands[0]) in item
+        if operator == 'attribute_not_exists':
+            return self._attribute_name(operands[0]) not in item
+        left = self._operand(operands[0], item)
+        if left is None:
+            return False
+        if operator == 'IN':
+            return left in [self._operand(token, item) for token in operands[1:]]
+        return _compare(operator, left, [self._operand(token, item) for token in operands[1:]])
+
+    def matches(self, item):
+        return self._eval(self.tree, item)
+
+    def equality_on(self, attribute):
+        """KeyConditionExpression 에서 파티션 키 값 추출"""
+        return self._find_equality(self.tree, attribute)
+
+    def _find_equality(self, node, attribute):
+        if node[0] == 'AND':
+            return self._find_equality(node[1], attribute) or self._find_equality(node[2], attribute)
+        if node[0] == '=' and self._attribute_name(node[1][0]) == attribute:
+            return self._operand(node[1][1], {})
+        return None
+
+
+def _condition_matcher(condition, names=None, values=None):
+    if condition is None:
+        return lambda item: True
+    if isinstance(condition, ConditionBase):
+        return lambda item: evaluate(condition, item)
+    parsed = _StringCondition(condition, names, values)
+    return parsed.matches
+
+
+def _partition_value(condition, attribute, names=None, values=None):
+    """KeyConditionExpression 의 파티션 키 등호 값"""
+    if isinstance(condition, ConditionBase):
+        return _find_key_equality(condition, attribute)
+    return _StringCondition(condition, names, values).equality_on(attribute)
+
+
+def _find_key_equality(condition, attribute):
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        return (_find_key_equality(expression['values'][0], attribute)
+                or _find_key_equality(expression['values'][1], attribute))
+    if expression['operator'] == '=' and expression['values'][0].name == attribute:
+        return expression['values'][1]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# UpdateExpression
+# ---------------------------------------------------------------------------
+
+_CLAUSE_RE = re.compile(r'\b(SET|ADD|REMOVE|DELETE)\b', re.IGNORECASE)
+
+
+def _split_top_level(text):
+    parts, depth, current = [], 0, ''
+    for char in text:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def apply_update(item, expression, names=None, values=None):
+    """UpdateExpression 을 아이템에 적용 (SET / ADD / REMOVE)"""
+    names = names or {}
+    values = values or {}
+
+    def name_of(token):
+        return names.get(token.strip(), token.strip())
+
+    def value_of(token):
+        token = token.strip()
+        if token.startswith(':'):
+            return values[token]
+        match = re.match(r'if_not_exists\s*\(\s*([^,]+)\s*,\s*([^)]+)\)', token)
+        if match:
+            existing = item.get(name_of(match.group(1)))
+            return existing if existing is not None else value_of(match.group(2))
+        match = re.match(r'list_append\s*\(\s*([^,]+)\s*,\s*([^)]+)\)', token)
+        if match:
+            return list(value_of(match.group(1)) or []) + list(value_of(match.group(2)) or [])
+        return item.get(name_of(token))
+
+    def arithmetic(text):
+        depth = 0
+        for index, char in enumerate(text):
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char in '+-' and depth == 0 and index > 0:
+                left = value_of(text[:index]) or 0
+                right = value_of(text[index + 1:]) or 0
+                return left + right if char == '+' else left - right
+        return value_of(text)
+
+    pieces = _CLAUSE_RE.split(expression)
+    clause = None
+    for piece in pieces:
+        if piece.upper() in ('SET', 'ADD', 'REMOVE', 'DELETE'):
+            clause = piece.upper()
+            continue
+        if not piece.strip():
+            continue
+        for action in _split_top_level(piece):
+            if clause == 'SET':
+                target, _, source = action.partition('=')
+                item[name_of(target)] = arithmetic(source.strip())
+            elif clause == 'ADD':
+                target, source = action.split(None, 1)
+                current = item.get(name_of(target))
+                increment = value_of(source)
+                if isinstance(increment, set):
+                    item[name_of(target)] = (current or set()) | increment
+                else:
+                    item[name_of(target)] = (current or 0) + increment
+            elif clause == 'REMOVE':
+                item.pop(name_of(action), None)
+            elif clause == 'DELETE':
+                target, source = action.split(None, 1)
+                if name_of(target) in item:
+                    item[name_of(target)] = item[name_of(target)] - value_of(source)
+    return item
+
+
+def _normalize(value):
+    """boto3 리소스처럼 숫자를 Decimal 로 저장"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+# ---------------------------------------------------------------------------
+# 테이블 / 리소스
+# ---------------------------------------------------------------------------
+
+class _TokenBucket:
+    """초당 용량 단위 제한 (스로틀링 재현)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self, amount):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+class FakeTable:
+    def __init__(self, name, hash_key, range_key=None, indexes=None,
+                 page_items=DEFAULT_PAGE_ITEMS, write_capacity=None, partition_write_capacity=None,
+                 latency=0.0):
+        self.name = self.table_name = name
+        self.hash_key = hash_key
+        self.range_key = range_key
+        # {인덱스 이름: (hash_key, range_key)}
+        self.indexes = indexes or {}
+        self.page_items = page_items
+        self.latency = latency
+        self.items = {}
+        # Scan 재개 위치를 O(1) 로 찾기 위한 삽입 순서 목록 (삭제된 키는 건너뜀)
+        self.scan_order = []
+        self.scan_position = {}
+        self.index_members = {name: {} for name in self.indexes}
+        self.lock = threading.RLock()
+        self.write_bucket = _TokenBucket(write_capacity) if write_capacity else None
+        self.partition_write_capacity = partition_write_capacity
+        self.partition_buckets = {}
+        self.stats = {'reads': 0, 'writes': 0, 'read_units': 0.0, 'write_units': 0.0, 'throttles': 0}
+
+    # 내부 헬퍼
+    def _key(self, item):
+        if self.range_key:
+            return (item[self.hash_key], item[self.range_key])
+        return (item[self.hash_key],)
+
+    def _key_dict(self, item, index=None):
+        key = {self.hash_key: item[self.hash_key]}
+        if self.range_key:
+            key[self.range_key] = item[self.range_key]
+        if index:
+            index_hash, index_range = self.indexes[index]
+            key[index_hash] = item[index_hash]
+            if index_range:
+                key[index_range] = item[index_range]
+        return key
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _charge_write(self, operation, item):
+        units = max(1, -(-item_size(item) // 1024))
+        if self.write_bucket and not self.write_bucket.take(units):
+            self.stats['throttles'] += 1
+            raise _throttle_error(operation)
+        if self.partition_write_capacity:
+            partition = item[self.hash_key]
+            bucket = self.partition_buckets.get(partition)
+            if bucket is None:
+                bucket = self.partition_buckets[partition] = _TokenBucket(self.partition_write_capacity)
+            if not bucket.take(units):
+                self.stats['throttles'] += 1
+                raise _throttle_error(operation)
+        self.stats['writes'] += 1
+        self.stats['write_units'] += units
+        return units
+
+    def _charge_read(self, items):
+        size = sum(item_size(item) for item in items)
+        units = max(0.5, size / 4096 / 2)
+        self.stats['reads'] += 1
+        self.stats['read_units'] += units
+        return units
+
+    def _index_add(self, item):
+        for name, (index_hash, _) in self.indexes.items():
+            if index_hash in item:
+                self.index_members[name].setdefault(item[index_hash], set()).add(self._key(item))
+
+    def _index_remove(self, item):
+        for name, (index_hash, _) in self.indexes.items():
+            if index_hash in item:
+                members = self.index_members[name].get(item[index_hash])
+                if members:
+                    members.discard(self._key(item))
+
+    def _store(self, item):
+        key = self._key(item)
+        previous = self.items.get(key)
+        if previous is not None:
+            self._index_remove(previous)
+        if key not in self.scan_position:
+            self.scan_position[key] = len(self.scan_order)
+            self.scan_order.append(key)
+        self.items[key] = item
+        self._index_add(item)
+        return previous
+
+    # Table API
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeNames=None,
+                 ExpressionAttributeValues=None, **kwargs):
+        self._simulate_latency()
+        item = _normalize(dict(Item))
+        with self.lock:
+            existing = self.items.get(self._key(item))
+            if ConditionExpression is not None:
+                matcher = _condition_matcher(ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues)
+                if not matcher(existing or {}):
+                    raise _conditional_error('PutItem')
+            units = self._charge_write('PutItem', item)
+            self._store(item)
+        response = {}
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': float(units)}
+        return response
+
+    def get_item(self, Key, **kwargs):
+        self._simulate_latency()
+        key = _normalize(Key)
+        with self.lock:
+            item = self.items.get(self._key(key))
+            units = self._charge_read([item] if item else [])
+            response = {'Item': dict(item)} if item else {}
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': units}
+        return response
+
+    def delete_item(self, Key, **kwargs):
+        self._simulate_latency()
+        key = _normalize(Key)
+        with self.lock:
+            item = self.items.pop(self._key(key), None)
+            if item is not None:
+                self._index_remove(item)
+                self._charge_write('DeleteItem', item)
+        return {}
+
+    def update_item(self, Key, UpdateExpression, ConditionExpression=None, ExpressionAttributeNames=None,
+                    ExpressionAttributeValues=None, ReturnValues='NONE', **kwargs):
+        self._simulate_latency()
+        key = _normalize(Key)
+        values = _normalize(ExpressionAttributeValues or {})
+        with self.lock:
+            existing = self.items.get(self._key(key))
+            if ConditionExpression is not None:
+                matcher = _condition_matcher(ConditionExpression, ExpressionAttributeNames, values)
+                if not matcher(existing or {}):
+                    raise _conditional_error('UpdateItem')
+            item = dict(existing) if existing else dict(key)
+            apply_update(item, UpdateExpression, ExpressionAttributeNames, values)
+            units = self._charge_write('UpdateItem', item)
+            self._store(item)
+        response = {}
+        if ReturnValues == 'ALL_NEW':
+            response['Attributes'] = dict(item)
+        elif ReturnValues == 'ALL_OLD' and existing:
+            response['Attributes'] = dict(existing)
+        if kwargs.get('ReturnConsumedCapacity'):
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': float(units)}
+        return response
+
+    def _page(self, candidates, ExclusiveStartKey, Limit, FilterExpression, names, values,
+              Select=None, index=None, ReturnConsumedCapacity=None):
+        matcher = _condition_matcher(FilterExpression, names, values)
+        start = 0
+        if ExclusiveStartKey:
+            start_key = self._key(_normalize(ExclusiveStartKey))
+            keys = [self._key(item) for item in candidates]
+            # 시작 키 아이템이 사라졌으면 끝까지 읽은 것으로 처리
+            start = keys.index(start_key) + 1 if start_key in keys else len(candidates)
+        page_size = min(Limit, self.page_items) if Limit else self.page_items
+        evaluated = candidates[start:start + page_size]
+        matched = [dict(item) for item in evaluated if matcher(item)]
+        units = self._charge_read(evaluated)
+
+        response = {'Count': len(matched), 'ScannedCount': len(evaluated)}
+        if Select != 'COUNT':
+            response['Items'] = matched
+        if start + page_size < len(candidates) and evaluated:
+            response['LastEvaluatedKey'] = self._key_dict(evaluated[-1], index)
+        if ReturnConsumedCapacity:
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': units}
+        return response
+
+    def query(self, KeyConditionExpression, IndexName=None, FilterExpression=None, ScanIndexForward=True,
+              Limit=None, ExclusiveStartKey=None, ExpressionAttributeNames=None, ExpressionAttributeValues=None,
+              Select=None, ReturnConsumedCapacity=None, **kwargs):
+        self._simulate_latency()
+        values = _normalize(ExpressionAttributeValues or {})
+        if IndexName:
+            index_hash, index_range = self.indexes[IndexName]
+        else:
+            index_hash, index_range = self.hash_key, self.range_key
+        partition = _normalize(_partition_value(KeyConditionExpression, index_hash, ExpressionAttributeNames, values))
+        key_matcher = _condition_matcher(KeyConditionExpression, ExpressionAttributeNames, values)
+
+        with self.lock:
+            if IndexName:
+                keys = self.index_members[IndexName].get(partition, ())
+                candidates = [self.items[key] for key in keys if key in self.items]
+            else:
+                candidates = [item for item in self.items.values() if item.get(self.hash_key) == partition]
+            candidates = [item for item in candidates if key_matcher(item)]
+
+        candidates.sort(
+            key=lambda item: (item.get(index_range, 0) if index_range else 0, self._key(item)),
+            reverse=not ScanIndexForward
+        )
+        return self._page(candidates, ExclusiveStartKey, Limit, FilterExpression,
+                          ExpressionAttributeNames, values, Select, IndexName, ReturnConsumedCapacity)
+
+    def scan(self, FilterExpression=None, Limit=None, ExclusiveStartKey=None, ExpressionAttributeNames=None,
+             ExpressionAttributeValues=None, Select=None, IndexName=None, ReturnConsumedCapacity=None,
+             Segment=None, TotalSegments=None, **kwargs):
+        self._simulate_latency()
+        values = _normalize(ExpressionAttributeValues or {})
+        matcher = _condition_matcher(FilterExpression, ExpressionAttributeNames, values)
+        page_size = min(Limit, self.page_items) if Limit else self.page_items
+
+        with self.lock:
+            position = 0
+            if ExclusiveStartKey:
+                position = self.scan_position.get(self._key(_normalize(ExclusiveStartKey)), -1) + 1
+            evaluated = []
+            while position < len(self.scan_order) and len(evaluated) < page_size:
+                key = self.scan_order[position]
+                position += 1
+                item = self.items.get(key)
+                if item is None:
+                    continue
+                if TotalSegments and hash(key) % TotalSegments != Segment:
+                    continue
+                evaluated.append(item)
+            has_more = position < len(self.scan_order)
+            matched = [dict(item) for item in evaluated if matcher(item)]
+            units = self._charge_read(evaluated)
+
+        response = {'Count': len(matched), 'ScannedCount': len(evaluated)}
+        if Select != 'COUNT':
+            response['Items'] = matched
+        if has_more and evaluated:
+            response['LastEvaluatedKey'] = self._key_dict(evaluated[-1])
+        if ReturnConsumedCapacity:
+            response['ConsumedCapacity'] = {'TableName': self.name, 'CapacityUnits': units}
+        return response
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        return _BatchWriter(self)
+
+    def item_count(self):
+        return len(self.items)
+
+
+class _BatchWriter:
+    def __init__(self, table):
+        self.table = table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def put_item(self, Item):
+        self.table.put_item(Item=Item)
+
+    def delete_item(self, Key):
+        self.table.delete_item(Key=Key)
+
+
+class FakeDynamoDBResource:
+    """boto3.resource('dynamodb') 대역"""
+
+    def __init__(self, tables=None):
+        self.tables = {}
+        self.meta = _Meta(self)
+        for table in tables or []:
+            self.add_table(table)
+
+    def add_table(self, table):
+        self.tables[table.name] = table
+        return table
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def batch_get_item(self, RequestItems, **kwargs):
+        responses = {}
+        for table_name, request in RequestItems.items():
+            table = self.tables[table_name]
+            # 키들은 서버에서 병렬로 읽으므로 왕복 지연은 호출당 한 번
+            table._simulate_latency()
+            found = []
+            with table.lock:
+                for key in request['Keys']:
+                    item = table.items.get(table._key(_normalize(key)))
+                    table._charge_read([item] if item else [])
+                    if item:
+                        found.append(dict(item))
+            responses[table_name] = found
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, RequestItems, **kwargs):
+        unprocessed = {}
+        for table_name, requests in RequestItems.items():
+            table = self.tables[table_name]
+            for request in requests:
+                try:
+                    if 'PutRequest' in request:
+                        table.put_item(Item=request['PutRequest']['Item'])
+                    elif 'DeleteRequest' in request:
+                        table.delete_item(Key=request['DeleteRequest']['Key'])
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'ProvisionedThroughputExceededException':
+                        raise
+                    unprocessed.setdefault(table_name, []).append(request)
+        return {'UnprocessedItems': unprocessed}
+
+
+class _Meta:
+    def __init__(self, resource):
+        self.client = resource
+
+
+def create_liveinsight_tables(page_items=DEFAULT_PAGE_ITEMS, **table_options):
+    """main.tf 와 같은 키 구조의 LiveInsight 테이블 세트 생성"""
+    resource = FakeDynamoDBResource()
+    resource.add_table(FakeTable(
+        'LiveInsight-Events', 'event_id', 'timestamp',
+        indexes={
+            'UserIndex': ('user_id', 'timestamp'),
+            'SessionIndex': ('session_id', 'timestamp'),
+            'TimeBucketIndex': ('time_bucket', 'timestamp'),
+        },
+        page_items=page_items, **table_options
+    ))
+    resource.add_table(FakeTable(
+        'LiveInsight-Sessions', 'session_id',
+        indexes={'UserIndex': ('user_id', 'start_time')},
+        page_items=page_items, **table_options
+    ))
+    resource.add_table(FakeTable(
+        'LiveInsight-ActiveSessions', 'session_id',
+        indexes={'ActivityMinuteIndex': ('activity_minute', 'last_activity')},
+        page_items=page_items, **table_options
+    ))
+    resource.add_table(FakeTable(
+        'LiveInsight-Counters', 'counter_id', page_items=page_items, **table_options
+    ))
+    return resource
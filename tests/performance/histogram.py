@@ -0,0 +1,81 @@
+"""
+HDR(High Dynamic Range) 방식 지연 시간 히스토그램
+
+값(마이크로초)을 유효 숫자 기준 로그-선형 버킷에 기록한다.
+메모리는 값의 범위와 무관하게 작고, p99.9 같은 꼬리 백분위수도 상대 오차 내에서 정확하다.
+"""
+
+import math
+
+
+class LatencyHistogram:
+    """마이크로초 단위 값을 기록하는 HDR 히스토그램 (기본 유효 숫자 3자리)"""
+
+    def __init__(self, significant_digits=3):
+        # 2 * 10^digits 이상인 가장 작은 2의 거듭제곱 → 하위 버킷 수
+        self.sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_half_count = self.sub_bucket_count // 2
+        self.sub_bucket_bits = self.sub_bucket_count.bit_length() - 1
+        self.sub_bucket_half_bits = self.sub_bucket_bits - 1
+        self.counts = {}
+        self.total_count = 0
+        self.total_value = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def _index(self, value):
+        bucket_index = max(0, (value | (self.sub_bucket_count - 1)).bit_length() - self.sub_bucket_bits)
+        sub_bucket_index = value >> bucket_index
+        return ((bucket_index + 1) << self.sub_bucket_half_bits) + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def _highest_equivalent(self, index):
+        bucket_index = (index >> self.sub_bucket_half_bits) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        return (sub_bucket_index << bucket_index) + (1 << bucket_index) - 1
+
+    def record(self, value, count=1):
+        """값 기록 (마이크로초, 음수는 0)"""
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_value += value * count
+        self.max_value = max(self.max_value, value)
+        self.min_value = value if self.min_value is None else min(self.min_value, value)
+
+    def record_ms(self, milliseconds):
+        self.record(milliseconds * 1000)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_value += other.total_value
+        self.max_value = max(self.max_value, other.max_value)
+        if other.min_value is not None:
+            self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+
+    def percentile(self, percentile):
+        """백분위수 값 (마이크로초, 버킷의 최댓값 기준)"""
+        if not self.total_count:
+            return 0
+        target = max(1, math.ceil(self.total_count * percentile / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_value)
+        return self.max_value
+
+    def mean(self):
+        return self.total_value / self.total_count if self.total_count else 0
+
+    def summary_ms(self, percentiles=(50, 90, 99, 99.9)):
+        """밀리초 단위 요약 (p50 / p90 / p99 / p99.9 / max)"""
+        summary = {'count': self.total_count, 'mean_ms': self.mean() / 1000, 'max_ms': self.max_value / 1000}
+        for p in percentiles:
+            summary[f'p{p:g}_ms'] = self.percentile(p) / 1000
+        return summary
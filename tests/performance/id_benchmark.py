@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+이벤트 / 세션 ID 생성 벤치마크
+이전 방식 (strftime + uuid4 앞 8자, 타임스탬프 + user_id 앞 8자) 과 ULID 형식 IdGenerator 비교
+
+    python tests/performance/id_benchmark.py            # 기본 1,000,000 개
+    python tests/performance/id_benchmark.py 200000
+"""
+
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from offline_env import load_lambda  # noqa: E402
+
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+
+def legacy_event_id():
+    now = datetime.now()
+    return f"evt_{now.strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+
+
+def legacy_session_id(user_id='user_1700000000000_abcdefghi'):
+    return f"sess_{int(time.time() * 1000)}_{user_id[:8]}"
+
+
+def ulid_timestamp(ulid):
+    value = 0
+    for char in ulid[:10]:
+        value = value * 32 + CROCKFORD_BASE32.index(char)
+    return value
+
+
+def time_it(func, count):
+    """(초당 생성 수, 생성된 ID 목록)"""
+    start = time.perf_counter()
+    result = [func() for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    return count / elapsed, result
+
+
+def collision_probability(count, bits):
+    """생일 문제 근사: count 개 중 하나라도 충돌할 확률"""
+    return -math.expm1(-count * (count - 1) / 2 / 2 ** bits)
+
+
+def run_benchmark(count=1_000_000):
+    module = load_lambda(module_name='lambda_function_ids')
+    generator = module.IdGenerator()
+    other_container = module.IdGenerator()
+
+    print(f"🧪 ID generation benchmark ({count:,} ids)")
+    legacy_rate, legacy_ids = time_it(legacy_event_id, count)
+    session_rate, session_ids = time_it(legacy_session_id, count)
+    ulid_rate, ulids = time_it(generator.new, count)
+    _, other_ulids = time_it(other_container.new, count)
+
+    result = {
+        'count': count,
+        'legacy_event': {
+            'ids_per_second': legacy_rate,
+            'length': len(legacy_ids[0]),
+            'duplicates': count - len(set(legacy_ids)),
+            # 같은 초 안에서는 uuid4 앞 8자(32비트)만으로 구분
+            'collision_probability_per_second_at_10k': collision_probability(10_000, 32),
+            'sorted': legacy_ids == sorted(legacy_ids),
+        },
+        'legacy_session': {
+            'ids_per_second': session_rate,
+            'duplicates': count - len(set(session_ids)),
+        },
+        'ulid': {
+            'ids_per_second': ulid_rate,
+            'length': len(ulids[0]),
+            'duplicates': 2 * count - len(set(ulids) | set(other_ulids)),
+            'monotonic': all(a < b for a, b in zip(ulids, ulids[1:])),
+            'collision_probability_per_ms_at_10k': collision_probability(10_000, 80),
+            'first_timestamp_ms': ulid_timestamp(ulids[0]),
+        },
+    }
+
+    legacy, ulid = result['legacy_event'], result['ulid']
+    print(f"   legacy event id : {legacy['ids_per_second']:>12,.0f} ids/s  len {legacy['length']}  "
+          f"duplicates {legacy['duplicates']:,}  sorted {legacy['sorted']}")
+    print(f"   legacy session  : {session_rate:>12,.0f} ids/s  "
+          f"duplicates {result['legacy_session']['duplicates']:,} (same user prefix in the same ms)")
+    print(f"   ULID            : {ulid['ids_per_second']:>12,.0f} ids/s  len {ulid['length']}  "
+          f"duplicates {ulid['duplicates']:,} (2 containers)  monotonic {ulid['monotonic']}  "
+          f"({ulid['ids_per_second'] / legacy['ids_per_second']:.1f}x)")
+    print(f"   collision odds, 10k ids in one window: legacy {legacy['collision_probability_per_second_at_10k']:.2%}"
+          f"  ULID {ulid['collision_probability_per_ms_at_10k']:.1e}")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    result = run_benchmark(count)
+
+    output = os.environ.get('BENCH_OUTPUT')
+    if output:
+        with open(output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+수집 Lambda 단계별 지연 분석기
+
+lambda_handler 가 'Event processed successfully' / 'Event processing failed' 로그에 남기는
+phases(단계별 ms), cold_start, init_ms, retries, throttles, shed, dedup 필드와 Lambda REPORT 줄을 모아
+단계별 분포와 전체 처리 시간 중 비중을 출력한다.
+
+입력: 내보낸 CloudWatch 로그 (filter-log-events JSON 또는 텍스트, .gz 가능) 파일/디렉터리,
+      또는 로컬 하네스 로그 (local_lambda.py --log-file)
+
+    aws logs filter-log-events --log-group-name /aws/lambda/LiveInsight-collector > logs/collector.json
+    python tests/performance/lambda_log_analyzer.py logs/
+    python tests/performance/lambda_log_analyzer.py harness.log --json result.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from event_trace import json_payload, log_messages  # noqa: E402
+from histogram import LatencyHistogram  # noqa: E402
+
+HANDLER_MESSAGES = (
+    'Event processed successfully', 'Event processing failed', 'Event processing throttled', 'Event shed',
+    'Heartbeat processed', 'Duplicate event'
+)
+REPORT_PATTERN = re.compile(
+    r'REPORT RequestId: \S+\s+Duration: (?P<duration>[\d.]+) ms\s+'
+    r'Billed Duration: (?P<billed>[\d.]+) ms.*?(?:Init Duration: (?P<init>[\d.]+) ms)?\s*$'
+)
+
+
+def log_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    yield os.path.join(root, name)
+        else:
+            yield path
+
+
+class PhaseReport:
+    """단계별 / 콜드·웜별 분포 집계"""
+
+    def __init__(self):
+        self.phases = {}
+        self.total = {'cold': LatencyHistogram(), 'warm': LatencyHistogram()}
+        self.init = LatencyHistogram()
+        self.report_duration = LatencyHistogram()
+        self.report_init = LatencyHistogram()
+        self.invocations = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttles = 0
+        self.throttled_invocations = 0
+        self.shed = {}
+        self.heartbeats = {'refreshed': 0, 'coalesced': 0}
+        self.duplicates = {'memory': 0, 'conditional': 0}
+        self.session_writes = {'flushes': 0, 'saved': 0}
+
+    def add_handler_log(self, payload):
+        self.invocations += 1
+        if payload.get('level') == 'ERROR':
+            self.errors += 1
+        for name, ms in (payload.get('phases') or {}).items():
+            self.phases.setdefault(name, LatencyHistogram()).record_ms(ms)
+        kind = 'cold' if payload.get('cold_start') else 'warm'
+        if payload.get('processing_time') is not None:
+            self.total[kind].record_ms(payload['processing_time'] * 1000)
+        if payload.get('init_ms') is not None:
+            self.init.record_ms(payload['init_ms'])
+        self.retries += payload.get('retries', 0)
+        self.throttles += payload.get('throttles', 0)
+        if payload.get('throttles'):
+            self.throttled_invocations += 1
+        if payload.get('message') == 'Heartbeat processed':
+            self.heartbeats['refreshed' if payload.get('refreshed') else 'coalesced'] += 1
+        self.session_writes['flushes'] += payload.get('session_flushes', 0)
+        self.session_writes['saved'] += payload.get('session_writes_saved', 0)
+        if payload.get('dedup') in self.duplicates:
+            self.duplicates[payload['dedup']] += 1
+        if payload.get('shed'):
+            self.shed[payload['shed']] = self.shed.get(payload['shed'], 0) + 1
+
+    def add_report(self, match):
+        self.report_duration.record_ms(float(match.group('duration')))
+        if match.group('init'):
+            self.report_init.record_ms(float(match.group('init')))
+
+    def feed(self, message):
+        if message.startswith('REPORT'):
+            match = REPORT_PATTERN.search(message)
+            if match:
+                self.add_report(match)
+            return
+        if not any(text in message for text in HANDLER_MESSAGES):
+            return
+        payload = json_payload(message)
+        if payload and payload.get('message') in HANDLER_MESSAGES:
+            self.add_handler_log(payload)
+
+    def summary(self):
+        total_us = sum(histogram.total_value for histogram in self.total.values())
+        phases = {}
+        for name, histogram in sorted(self.phases.items(), key=lambda item: -item[1].total_value):
+            phases[name] = dict(
+                histogram.summary_ms(),
+                share=histogram.total_value / total_us if total_us else 0.0,
+            )
+        return {
+            'invocations': self.invocations,
+            'errors': self.errors,
+            'cold_starts': self.total['cold'].total_count,
+            'retries': self.retries,
+            'throttles': self.throttles,
+            'throttled_invocations': self.throttled_invocations,
+            'shed': self.shed,
+            'heartbeats': self.heartbeats,
+            'session_writes': self.session_writes,
+            'duplicates': dict(
+                self.duplicates,
+                rate=sum(self.duplicates.values()) / self.invocations if self.invocations else 0.0,
+            ),
+            'phases': phases,
+            'processing': {kind: histogram.summary_ms() for kind, histogram in self.total.items()},
+            'init': self.init.summary_ms(),
+            'report': {
+                'duration': self.report_duration.summary_ms(),
+                'init_duration': self.report_init.summary_ms(),
+            },
+        }
+
+
+def analyze(paths):
+    report = PhaseReport()
+    for path in log_files(paths):
+        for message in log_messages(path):
+            report.feed(message.strip())
+    return report.summary()
+
+
+def print_summary(result):
+    print(f"📊 {result['invocations']:,} invocations, {result['errors']:,} errors, "
+          f"{result['cold_starts']:,} cold starts")
+    print(f"   retries {result['retries']:,}, throttles {result['throttles']:,} "
+          f"({result['throttled_invocations']:,} invocations)")
+    heartbeats = result['heartbeats']
+    if heartbeats['refreshed'] or heartbeats['coalesced']:
+        print(f"   heartbeats {heartbeats['refreshed']:,} refreshed, {heartbeats['coalesced']:,} coalesced")
+    session_writes = result['session_writes']
+    if session_writes['flushes']:
+        print(f"   session flushes {session_writes['flushes']:,}, {session_writes['saved']:,} session writes saved")
+    duplicates = result['duplicates']
+    if duplicates['memory'] or duplicates['conditional']:
+        print(f"   duplicates {duplicates['memory']:,} in memory + {duplicates['conditional']:,} conditional "
+              f"({duplicates['rate']:.1%} of events, writes saved)")
+    if result['shed']:
+        print(f"   shed {result['shed']}")
+    print()
+    print(f"{'phase':<24}{'count':>9}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'share':>8}")
+    for name, stats in result['phases'].items():
+        print(f"{name:<24}{stats['count']:>9,}{stats['mean_ms']:>9.2f}{stats['p50_ms']:>9.2f}"
+              f"{stats['p90_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.2f}{stats['share']:>8.1%}")
+    print()
+    for kind, stats in result['processing'].items():
+        if stats['count']:
+            print(f"   {kind:<5} total p50 {stats['p50_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms  "
+                  f"max {stats['max_ms']:.2f}ms ({stats['count']:,})")
+    if result['init']['count']:
+        print(f"   init (module) p50 {result['init']['p50_ms']:.2f}ms  max {result['init']['max_ms']:.2f}ms")
+    report = result['report']
+    if report['duration']['count']:
+        print(f"   REPORT duration p50 {report['duration']['p50_ms']:.2f}ms  p99 {report['duration']['p99_ms']:.2f}ms")
+    if report['init_duration']['count']:
+        print(f"   REPORT init duration p50 {report['init_duration']['p50_ms']:.2f}ms  "
+              f"max {report['init_duration']['max_ms']:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight collector Lambda phase timing analyzer')
+    parser.add_argument('logs', nargs='+', help='로그 파일 또는 디렉터리')
+    parser.add_argument('--json', dest='output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    result = analyze(args.logs)
+    if not result['invocations'] and not result['report']['duration']['count']:
+        print("⚠️ No collector handler logs found")
+        return
+    print_summary(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
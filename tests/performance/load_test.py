@@ -2,27 +2,46 @@
 """
 성능 부하 테스트
 동시 사용자 1000명, 초당 100개 이벤트 처리 테스트
+
+모드:
+- closed: 사용자별 순차 요청 (기존 방식)
+- open:   목표 도착률(초당 요청 수) 단계별 개방형 부하, 의도한 전송 시각 기준 지연 시간 기록
+- search: 개방형 부하로 SLO 를 만족하는 최대 처리량 탐색
 """
 
+import argparse
 import asyncio
 import aiohttp
+import os
+import sys
 import time
 import json
 import statistics
 from concurrent.futures import ThreadPoolExecutor
 import random
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+
+# 수집 성공 응답 (동기 저장 200, 큐 / Django 수집 버퍼 202)
+ACCEPTED_STATUSES = (200, 202)
+
 class LoadTester:
-    def __init__(self, api_base_url, lambda_url, concurrent_users=100, events_per_second=10):
+    def __init__(self, api_base_url, lambda_url, concurrent_users=100, events_per_second=10,
+                 max_in_flight=10000, request_timeout=10, harness_stats_url=None):
         self.api_base_url = api_base_url.rstrip('/')
         self.lambda_url = lambda_url
         self.concurrent_users = concurrent_users
         self.events_per_second = events_per_second
+        self.max_in_flight = max_in_flight
+        self.request_timeout = request_timeout
+        # 로컬 Lambda 하네스(local_lambda.py)의 /_stats 주소 (단계별 과금/쓰기 단위 집계)
+        self.harness_stats_url = harness_stats_url
         self.results = []
         
-    async def send_event(self, session, user_id, session_id):
-        """단일 이벤트 전송"""
-        event = {
+    def make_event(self, user_id, session_id):
+        return {
             'user_id': user_id,
             'session_id': session_id,
             'event_type': random.choice(['page_view', 'click', 'heartbeat']),
@@ -31,6 +50,10 @@ class LoadTester:
             'user_agent': 'LoadTest-Agent/1.0'
         }
         
+    async def send_event(self, session, user_id, session_id):
+        """단일 이벤트 전송"""
+        event = self.make_event(user_id, session_id)
+        
         start_time = time.time()
         try:
             async with session.post(self.lambda_url, json=event) as response:
@@ -40,7 +63,7 @@ class LoadTester:
                 return {
                     'status_code': response.status,
                     'response_time': response_time,
-                    'success': response.status == 200
+                    'success': response.status in ACCEPTED_STATUSES
                 }
         except Exception as e:
             end_time = time.time()
@@ -118,9 +141,13 @@ class LoadTester:
         total_requests = len(all_results)
         success_rate = (successful_requests / total_requests) * 100
         
-        response_times = [r['response_time'] for r in all_results if r['success']]
-        avg_response_time = statistics.mean(response_times) if response_times else 0
-        p95_response_time = statistics.quantiles(response_times, n=20)[18] if len(response_times) > 20 else 0
+        histogram = LatencyHistogram()
+        for r in all_results:
+            if r['success']:
+                histogram.record_ms(r['response_time'])
+        latency = histogram.summary_ms(percentiles=(50, 95, 99, 99.9))
+        avg_response_time = latency['mean_ms']
+        p95_response_time = latency['p95_ms']
         
         print(f"✅ Concurrent users test completed:")
         print(f"   Total time: {total_time:.2f}s")
@@ -129,14 +156,203 @@ class LoadTester:
         print(f"   Success rate: {success_rate:.2f}%")
         print(f"   Average response time: {avg_response_time:.2f}ms")
         print(f"   95th percentile: {p95_response_time:.2f}ms")
+        print(f"   99th / 99.9th percentile: {latency['p99_ms']:.2f}ms / {latency['p99.9_ms']:.2f}ms")
         
         return {
             'total_time': total_time,
             'total_requests': total_requests,
             'success_rate': success_rate,
             'avg_response_time': avg_response_time,
-            'p95_response_time': p95_response_time
+            'p95_response_time': p95_response_time,
+            'latency': latency
+        }
+    
+    async def run_open_loop(self, rate, duration):
+        """목표 도착률로 duration 초 동안 개방형 부하 전송
+
+        응답을 기다리지 않고 i / rate 초 시점마다 요청을 보내고,
+        지연 시간은 실제 전송 시각이 아니라 의도한 전송 시각부터 측정한다
+        (서버가 밀려 클라이언트 전송이 늦어진 대기 시간까지 포함 → coordinated omission 방지).
+        """
+        histogram = LatencyHistogram()
+        # 하네스가 X-Lambda-Cold-Start 헤더를 주는 경우 콜드/웜 분리 기록
+        cold_histogram = LatencyHistogram()
+        warm_histogram = LatencyHistogram()
+        statuses = {}
+        counters = {'success': 0, 'failed': 0, 'dropped': 0}
+        total = max(1, int(rate * duration))
+        interval = 1.0 / rate
+        run_id = int(time.time())
+        
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            loop = asyncio.get_running_loop()
+            pending = set()
+            harness_before = await self.fetch_harness_stats(session)
+            
+            async def fire(intended, user_index):
+                event = self.make_event(
+                    f'load_test_user_{user_index}', f'load_test_session_{user_index}_{run_id}'
+                )
+                cold = None
+                try:
+                    async with session.post(self.lambda_url, json=event) as response:
+                        await response.read()
+                        status = response.status
+                        cold = response.headers.get('X-Lambda-Cold-Start')
+                except Exception as e:
+                    status = type(e).__name__
+                latency_us = (loop.time() - intended) * 1_000_000
+                histogram.record(latency_us)
+                if cold is not None:
+                    (cold_histogram if cold == 'true' else warm_histogram).record(latency_us)
+                statuses[status] = statuses.get(status, 0) + 1
+                counters['success' if status in ACCEPTED_STATUSES else 'failed'] += 1
+            
+            start = loop.time() + 0.05
+            for i in range(total):
+                intended = start + i * interval
+                delay = intended - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(pending) >= self.max_in_flight:
+                    # 클라이언트 한도 초과 → 보내지 못한 요청은 실패로 집계
+                    counters['dropped'] += 1
+                    continue
+                task = asyncio.create_task(fire(intended, i % self.concurrent_users))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            send_window = loop.time() - start
+            if pending:
+                await asyncio.wait(pending)
+            elapsed = loop.time() - start
+            harness_after = await self.fetch_harness_stats(session)
+        
+        completed = counters['success'] + counters['failed']
+        attempted = completed + counters['dropped']
+        latency = histogram.summary_ms()
+        result = {
+            'target_rate': rate,
+            'duration': duration,
+            'sent_rate': (attempted - counters['dropped']) / send_window if send_window > 0 else 0.0,
+            'throughput': counters['success'] / elapsed if elapsed > 0 else 0.0,
+            'requests': attempted,
+            'success': counters['success'],
+            'failed': counters['failed'],
+            'dropped': counters['dropped'],
+            'error_rate': (counters['failed'] + counters['dropped']) / attempted if attempted else 0.0,
+            'statuses': {str(k): v for k, v in statuses.items()},
+            'latency': latency
         }
+        if cold_histogram.total_count or warm_histogram.total_count:
+            result['cold_starts'] = cold_histogram.total_count
+            result['cold_latency'] = cold_histogram.summary_ms()
+            result['warm_latency'] = warm_histogram.summary_ms()
+        if harness_before and harness_after:
+            result['harness'] = self.harness_delta(harness_before, harness_after)
+        return result
+    
+    async def fetch_harness_stats(self, session):
+        if not self.harness_stats_url:
+            return None
+        try:
+            async with session.get(self.harness_stats_url) as response:
+                return await response.json()
+        except Exception as e:
+            print(f"⚠️ Harness stats unavailable: {str(e)}")
+            return None
+    
+    @staticmethod
+    def harness_delta(before, after):
+        """단계 동안의 하네스 통계 차이 → 이벤트당 비용"""
+        invocations = after['invocations'] - before['invocations']
+        write_units = sum(
+            table['write_units'] - before['tables'].get(name, {}).get('write_units', 0)
+            for name, table in after['tables'].items()
+        )
+        billed_ms = after['billed_ms'] - before['billed_ms']
+        return {
+            'invocations': invocations,
+            'cold_starts': after['cold_starts'] - before['cold_starts'],
+            'throttles': after['throttles'] - before['throttles'],
+            'billed_ms_per_event': billed_ms / invocations if invocations else 0.0,
+            'write_units_per_event': write_units / invocations if invocations else 0.0,
+        }
+    
+    @staticmethod
+    def print_step(result):
+        latency = result['latency']
+        print(f"   {result['target_rate']:>8.1f}/s → {result['throughput']:>8.1f}/s ok  "
+              f"err {result['error_rate'] * 100:5.2f}%  "
+              f"p50 {latency['p50_ms']:8.2f}ms  p99 {latency['p99_ms']:8.2f}ms  "
+              f"p99.9 {latency['p99.9_ms']:8.2f}ms  max {latency['max_ms']:8.2f}ms")
+        if result.get('cold_starts'):
+            print(f"             cold {result['cold_starts']} req  p50 {result['cold_latency']['p50_ms']:8.2f}ms  "
+                  f"warm p50 {result['warm_latency']['p50_ms']:8.2f}ms  p99 {result['warm_latency']['p99_ms']:8.2f}ms")
+        if result.get('harness'):
+            harness = result['harness']
+            print(f"             {harness['billed_ms_per_event']:.2f} billed ms / event  "
+                  f"{harness['write_units_per_event']:.2f} WCU / event  {harness['throttles']} throttled")
+    
+    async def test_rate_steps(self, rates, step_duration, cooldown=2):
+        """도착률 단계별 개방형 부하 테스트"""
+        print(f"🧪 Open-loop test: {', '.join(f'{r:g}' for r in rates)} req/s, {step_duration}s each...")
+        results = []
+        for rate in rates:
+            result = await self.run_open_loop(rate, step_duration)
+            self.print_step(result)
+            results.append(result)
+            await asyncio.sleep(cooldown)
+        return results
+    
+    @staticmethod
+    def meets_slo(result, slo_p99_ms, max_error_rate):
+        """SLO 만족 여부: 오류율, p99, 목표 대비 처리량 95% 이상"""
+        return (
+            result['error_rate'] <= max_error_rate
+            and result['latency']['p99_ms'] <= slo_p99_ms
+            and result['throughput'] >= result['target_rate'] * 0.95
+        )
+    
+    async def find_max_throughput(self, start_rate, max_rate, step_duration, slo_p99_ms=500,
+                                  max_error_rate=0.01, iterations=4, cooldown=2):
+        """SLO 를 만족하는 최대 지속 가능 처리량 탐색 (2배씩 증가 후 이분 탐색)"""
+        print(f"🔎 Searching max sustainable throughput (p99 ≤ {slo_p99_ms}ms, errors ≤ {max_error_rate * 100:g}%)...")
+        steps = []
+        good, bad = None, None
+        
+        async def attempt(rate):
+            result = await self.run_open_loop(rate, step_duration)
+            result['meets_slo'] = self.meets_slo(result, slo_p99_ms, max_error_rate)
+            self.print_step(result)
+            steps.append(result)
+            await asyncio.sleep(cooldown)
+            return result['meets_slo']
+        
+        rate = start_rate
+        while rate <= max_rate:
+            if await attempt(rate):
+                good = rate
+                rate *= 2
+            else:
+                bad = rate
+                break
+        
+        if good is not None and bad is not None:
+            for _ in range(iterations):
+                middle = (good + bad) / 2
+                if await attempt(middle):
+                    good = middle
+                else:
+                    bad = middle
+        
+        if good is None:
+            print(f"❌ SLO not met even at {start_rate:g} req/s")
+        else:
+            print(f"✅ Max sustainable throughput: ~{good:.1f} req/s"
+                  + (f" (saturates below {bad:.1f} req/s)" if bad is not None else f" (max_rate {max_rate:g} reached)"))
+        return {'max_sustainable_rate': good, 'first_failing_rate': bad, 'steps': steps}
     
     async def test_api_performance(self):
         """API 성능 테스트"""
@@ -179,18 +395,45 @@ class LoadTester:
         return endpoint_stats
 
 def main():
-    import sys
+    parser = argparse.ArgumentParser(description='LiveInsight load test')
+    parser.add_argument('api_base_url')
+    parser.add_argument('lambda_url')
+    parser.add_argument('concurrent_users', nargs='?', type=int, default=100)
+    parser.add_argument('events_per_second', nargs='?', type=float, default=10)
+    parser.add_argument('--mode', choices=['closed', 'open', 'search'], default='closed')
+    parser.add_argument('--rates', type=float, nargs='+', help='open 모드 도착률 단계 (기본: events_per_second)')
+    parser.add_argument('--step-duration', type=float, default=30, help='단계별 부하 시간 (초)')
+    parser.add_argument('--max-rate', type=float, default=5000, help='search 모드 최대 도착률')
+    parser.add_argument('--slo-p99-ms', type=float, default=500)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--search-iterations', type=int, default=4)
+    parser.add_argument('--max-in-flight', type=int, default=10000)
+    parser.add_argument('--harness-stats', help='로컬 Lambda 하네스 /_stats URL (이벤트당 비용 집계)')
+    parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+    
+    tester = LoadTester(
+        args.api_base_url, args.lambda_url, args.concurrent_users, args.events_per_second,
+        max_in_flight=args.max_in_flight, harness_stats_url=args.harness_stats
+    )
     
-    if len(sys.argv) < 3:
-        print("Usage: python load_test.py <api_base_url> <lambda_url> [concurrent_users] [events_per_second]")
-        sys.exit(1)
+    def save(results):
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"💾 Results saved to {args.output}")
     
-    api_base_url = sys.argv[1]
-    lambda_url = sys.argv[2]
-    concurrent_users = int(sys.argv[3]) if len(sys.argv) > 3 else 100
-    events_per_second = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+    async def run_open():
+        results = await tester.test_rate_steps(args.rates or [args.events_per_second], args.step_duration)
+        save({'mode': 'open', 'steps': results})
     
-    tester = LoadTester(api_base_url, lambda_url, concurrent_users, events_per_second)
+    async def run_search():
+        results = await tester.find_max_throughput(
+            args.events_per_second, args.max_rate, args.step_duration,
+            slo_p99_ms=args.slo_p99_ms, max_error_rate=args.max_error_rate,
+            iterations=args.search_iterations
+        )
+        save({'mode': 'search', **results})
     
     async def run_tests():
         try:
@@ -217,13 +460,15 @@ def main():
             else:
                 print(f"❌ Success rate goal not met ({user_results['success_rate']:.2f}% < 99%)")
             
+            save({'mode': 'closed', 'users': user_results})
             print("🎉 Load tests completed!")
             
         except Exception as e:
             print(f"❌ Load test failed: {str(e)}")
             sys.exit(1)
     
-    asyncio.run(run_tests())
+    runner = {'closed': run_tests, 'open': run_open, 'search': run_search}[args.mode]
+    asyncio.run(runner())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+수집 Lambda 로컬 HTTP 하네스
+
+infrastructure/lambda_function.lambda_handler 를 API Gateway 프록시 이벤트 형태로 감싸
+로컬 HTTP 서버로 띄운다. 저장소는 인프로세스 fake DynamoDB 를 사용한다.
+
+- 컨테이너: 요청 하나를 처리하는 동안 점유되는 모듈 인스턴스 (동시 실행 수 = 컨테이너 수)
+- 콜드 스타트: 새 컨테이너는 lambda_function 모듈을 새로 로드해 전역 초기화를 다시 수행
+- 동시 실행 한도 초과 시 Lambda 처럼 429 반환
+- 유휴 시간이 지난 컨테이너는 회수되어 다음 요청에서 다시 콜드 스타트
+
+사용법:
+    python tests/performance/local_lambda.py --port 9000 --concurrency 10 --prewarm 2
+    python tests/performance/load_test.py http://127.0.0.1:8000 http://127.0.0.1:9000/events 100 200 \\
+        --mode open --harness-stats http://127.0.0.1:9000/_stats
+
+--log-file 을 주면 Lambda 로그를 CloudWatch 형식 텍스트로 남긴다 (lambda_log_analyzer.py 입력).
+
+GET /_stats 로 호출 수, 콜드 스타트, 실행 시간 분포, 과금 시간, 테이블 쓰기 단위를 확인할 수 있다.
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import logging
+import math
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from histogram import LatencyHistogram  # noqa: E402
+from offline_env import FakeCloudWatch, FakeContext, api_gateway_event, create_liveinsight_tables, load_lambda  # noqa: E402
+
+# us-east-1 x86 기준 (추정치 계산용)
+LAMBDA_PRICE_PER_GB_SECOND = 0.0000166667
+LAMBDA_PRICE_PER_REQUEST = 0.20 / 1_000_000
+DYNAMODB_PRICE_PER_WRITE_UNIT = 1.25 / 1_000_000
+
+
+class Container:
+    """웜 상태로 재사용되는 Lambda 실행 환경 하나"""
+
+    def __init__(self, container_id, module, init_ms):
+        self.container_id = container_id
+        self.module = module
+        self.init_ms = init_ms
+        self.invocations = 0
+        self.last_used = time.monotonic()
+
+
+class ContainerPool:
+    """동시 실행 한도와 유휴 회수를 흉내 내는 컨테이너 풀"""
+
+    def __init__(self, resource, concurrency=10, idle_timeout=300, init_delay_ms=0, memory_mb=256):
+        self.resource = resource
+        self.cloudwatch = FakeCloudWatch()
+        self.concurrency = concurrency
+        self.idle_timeout = idle_timeout
+        self.init_delay_ms = init_delay_ms
+        self.memory_mb = memory_mb
+        self.idle = []
+        self.busy = 0
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.stats = {'invocations': 0, 'cold_starts': 0, 'throttles': 0, 'reclaimed': 0, 'billed_ms': 0}
+        self.init_histogram = LatencyHistogram()
+        self.cold_histogram = LatencyHistogram()
+        self.warm_histogram = LatencyHistogram()
+
+    def _create(self):
+        started = time.perf_counter()
+        if self.init_delay_ms:
+            # 런타임 부팅 등 모듈 로드 외 초기화 시간
+            time.sleep(self.init_delay_ms / 1000)
+        container_id = next(self.ids)
+        module = load_lambda(self.resource, self.cloudwatch, module_name=f'lambda_function_{container_id}')
+        init_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.init_histogram.record_ms(init_ms)
+        return Container(container_id, module, init_ms)
+
+    def prewarm(self, count):
+        for _ in range(min(count, self.concurrency)):
+            self.idle.append(self._create())
+
+    def _reclaim(self, now):
+        """오래 쉰 컨테이너 회수 (가장 최근에 쓴 컨테이너가 리스트 끝) → 회수한 컨테이너"""
+        reclaimed = []
+        while self.idle and now - self.idle[0].last_used > self.idle_timeout:
+            reclaimed.append(self.idle.pop(0))
+            self.stats['reclaimed'] += 1
+        return reclaimed
+
+    @staticmethod
+    def _shutdown(containers):
+        # Lambda 가 종료 전 보내는 SIGTERM 처럼 모듈의 shutdown 훅 호출
+        for container in containers:
+            hook = getattr(container.module, 'shutdown', None)
+            if hook is not None:
+                hook()
+
+    def close(self):
+        """남은 컨테이너 모두 종료"""
+        with self.lock:
+            containers, self.idle = self.idle, []
+        self._shutdown(containers)
+
+    def acquire(self):
+        """(컨테이너, 콜드 스타트 여부) 또는 한도 초과 시 (None, False)"""
+        with self.lock:
+            reclaimed = self._reclaim(time.monotonic())
+            if self.idle:
+                self.busy += 1
+                container = self.idle.pop()
+            elif self.busy >= self.concurrency:
+                self.stats['throttles'] += 1
+                container = None
+            else:
+                self.busy += 1
+                self.stats['cold_starts'] += 1
+                container = False
+        self._shutdown(reclaimed)
+        if container is not False:
+            return container, False
+        try:
+            return self._create(), True
+        except Exception:
+            with self.lock:
+                self.busy -= 1
+            raise
+
+    def release(self, container, duration_ms, cold):
+        with self.lock:
+            container.invocations += 1
+            container.last_used = time.monotonic()
+            self.idle.append(container)
+            self.busy -= 1
+            self.stats['invocations'] += 1
+            self.stats['billed_ms'] += math.ceil(duration_ms)
+            (self.cold_histogram if cold else self.warm_histogram).record_ms(duration_ms)
+
+    def invoke(self, event):
+        """(Lambda 응답, 메타데이터) 또는 한도 초과 시 (None, None)"""
+        container, cold = self.acquire()
+        if container is None:
+            return None, None
+        started = time.perf_counter()
+        try:
+            response = container.module.lambda_handler(event, FakeContext())
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.release(container, duration_ms, cold)
+        return response, {
+            'container': container.container_id,
+            'cold': cold,
+            'init_ms': container.init_ms if cold else 0.0,
+            'duration_ms': duration_ms,
+        }
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({
+                'concurrency': self.concurrency,
+                'warm_containers': len(self.idle),
+                'busy_containers': self.busy,
+                'init': self.init_histogram.summary_ms(),
+                'cold_duration': self.cold_histogram.summary_ms(),
+                'warm_duration': self.warm_histogram.summary_ms(),
+            })
+        stats['gb_seconds'] = stats['billed_ms'] / 1000 * self.memory_mb / 1024
+        stats['tables'] = {
+            name: dict(table.stats, items=table.item_count())
+            for name, table in self.resource.tables.items()
+        }
+        write_units = sum(table['write_units'] for table in stats['tables'].values())
+        invocations = stats['invocations'] or 1
+        stats['per_event'] = {
+            'billed_ms': stats['billed_ms'] / invocations,
+            'write_units': write_units / invocations,
+            'estimated_cost_usd': (
+                stats['gb_seconds'] * LAMBDA_PRICE_PER_GB_SECOND
+                + stats['invocations'] * LAMBDA_PRICE_PER_REQUEST
+                + write_units * DYNAMODB_PRICE_PER_WRITE_UNIT
+            ) / invocations,
+        }
+        return stats
+
+
+class LambdaRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # keep-alive 연결에서 헤더/본문 분리 전송 시 지연 ACK 로 40ms 가 붙지 않도록
+    disable_nagle_algorithm = True
+    pool = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.send_header('Content-Length', str(len(body)))
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except ConnectionError:
+            # 클라이언트 타임아웃으로 먼저 끊긴 연결
+            self.close_connection = True
+
+    def _invoke(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length) if length else b''
+        headers = dict(self.headers.items())
+        # main.tf 의 binary_media_types = ["*/*"] 처럼 본문은 base64 로 전달 (gzip 배치 포함)
+        event = api_gateway_event(
+            method=self.command,
+            headers=headers,
+            source_ip=self.client_address[0],
+            raw_body=base64.b64encode(raw_body).decode('ascii') if raw_body else None,
+        )
+        event['isBase64Encoded'] = bool(raw_body)
+        event['path'] = self.path.split('?', 1)[0]
+
+        response, meta = self.pool.invoke(event)
+        if response is None:
+            self._send(429, json.dumps({'message': 'Rate Exceeded.'}), {'Content-Type': 'application/json'})
+            return
+
+        body = response.get('body') or ''
+        body = base64.b64decode(body) if response.get('isBase64Encoded') else body.encode('utf-8')
+        headers = dict(response.get('headers') or {})
+        headers.setdefault('Content-Type', 'application/json')
+        headers.update({
+            'X-Lambda-Container': meta['container'],
+            'X-Lambda-Cold-Start': 'true' if meta['cold'] else 'false',
+            'X-Lambda-Init-Ms': f"{meta['init_ms']:.3f}",
+            'X-Lambda-Duration-Ms': f"{meta['duration_ms']:.3f}",
+        })
+        self._send(response.get('statusCode', 200), body, headers)
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] == '/_stats':
+            self._send(200, json.dumps(self.pool.snapshot(), indent=2), {'Content-Type': 'application/json'})
+        else:
+            self._invoke()
+
+    do_POST = _invoke
+    do_OPTIONS = _invoke
+
+
+def serve(port=9000, host='127.0.0.1', concurrency=10, prewarm=0, idle_timeout=300, init_delay_ms=0,
+          memory_mb=256, table_latency_ms=0.0, write_capacity=None):
+    """하네스 HTTP 서버 생성 (serve_forever 는 호출하는 쪽에서)"""
+    table_options = {}
+    if table_latency_ms:
+        table_options['latency'] = table_latency_ms / 1000
+    if write_capacity:
+        table_options['write_capacity'] = write_capacity
+    pool = ContainerPool(
+        create_liveinsight_tables(**table_options), concurrency=concurrency,
+        idle_timeout=idle_timeout, init_delay_ms=init_delay_ms, memory_mb=memory_mb
+    )
+    pool.prewarm(prewarm)
+    handler = type('BoundLambdaRequestHandler', (LambdaRequestHandler,), {'pool': pool})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    return server, pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight collector Lambda local harness')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--concurrency', type=int, default=10, help='최대 동시 실행 컨테이너 수')
+    parser.add_argument('--prewarm', type=int, default=0, help='미리 초기화해 둘 컨테이너 수')
+    parser.add_argument('--idle-timeout', type=float, default=300, help='유휴 컨테이너 회수 시간 (초)')
+    parser.add_argument('--init-delay-ms', type=float, default=0, help='콜드 스타트 시 추가 초기화 지연')
+    parser.add_argument('--memory-mb', type=int, default=256, help='과금 추정용 메모리 크기')
+    parser.add_argument('--table-latency-ms', type=float, default=0, help='DynamoDB 호출당 지연')
+    parser.add_argument('--write-capacity', type=float, help='테이블별 초당 쓰기 용량 (초과 시 스로틀링)')
+    parser.add_argument('--log-file', help='Lambda 로그 저장 파일 (lambda_log_analyzer.py 로 분석)')
+    args = parser.parse_args()
+
+    if args.log_file:
+        handler = logging.FileHandler(args.log_file)
+        handler.setFormatter(logging.Formatter('[%(levelname)s]\t%(asctime)s\t%(message)s'))
+        logging.getLogger().addHandler(handler)
+        logging.getLogger().setLevel(logging.INFO)
+
+    server, pool = serve(
+        args.port, args.host, args.concurrency, args.prewarm, args.idle_timeout,
+        args.init_delay_ms, args.memory_mb, args.table_latency_ms, args.write_capacity
+    )
+    print(f"🚀 Lambda harness on http://{args.host}:{args.port} "
+          f"(concurrency {args.concurrency}, {len(pool.idle)} warm)")
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+        stats = pool.snapshot()
+        print(f"\n📊 {stats['invocations']} invocations, {stats['cold_starts']} cold starts, "
+              f"{stats['throttles']} throttled")
+        print(f"   warm p50 {stats['warm_duration']['p50_ms']:.2f}ms  p99 {stats['warm_duration']['p99_ms']:.2f}ms  "
+              f"cold p50 {stats['cold_duration']['p50_ms']:.2f}ms  init p50 {stats['init']['p50_ms']:.2f}ms")
+        print(f"   per event: {stats['per_event']['billed_ms']:.2f} billed ms, "
+              f"{stats['per_event']['write_units']:.2f} WCU, ${stats['per_event']['estimated_cost_usd'] * 1e6:.2f} / 1M events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+오프라인 벤치마크 스위트
+배포된 API 없이 lambda_handler 와 Django 뷰를 인프로세스 fake DynamoDB(또는 SQLite 백엔드)에 연결해
+수집 / 시간대별 통계 / 페이지·유입경로 통계 / 상세 API 의 처리량과 지연 시간을 측정한다.
+
+사용법:
+    python tests/performance/offline_benchmark.py --sizes 10000 100000 --output bench.json
+    python tests/performance/offline_benchmark.py --backend sqlite --sizes 1000000 10000000
+    python tests/performance/offline_benchmark.py --compare bench.json   # 이전 결과와 비교
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from offline_env import (  # noqa: E402
+    ROOT, FakeContext, api_gateway_event, create_liveinsight_tables, load_lambda, setup_django,
+)
+
+PAGES = [f'https://shop.example.com/page-{i}' for i in range(200)]
+REFERRERS = ['', 'https://www.google.com/search?q=shop', 'https://facebook.com/', 'https://twitter.com/', 'https://blog.example.org/']
+EVENT_TYPES = ['page_view'] * 6 + ['click'] * 3 + ['heartbeat'] * 4 + ['conversion']
+
+
+def make_events(count, seed=42, span_hours=24):
+    """최근 span_hours 시간에 고르게 퍼진 합성 이벤트 (페이지 인기도는 대략 Zipf)"""
+    rng = random.Random(seed)
+    now = int(time.time() * 1000)
+    span = span_hours * 3600 * 1000
+    page_weights = [1 / (rank + 1) for rank in range(len(PAGES))]
+    sessions = max(1, count // 20)
+    for i in range(count):
+        session = rng.randrange(sessions)
+        timestamp = now - rng.randrange(span)
+        yield {
+            'event_id': f'evt_bench_{i:09d}',
+            'timestamp': timestamp,
+            'user_id': f'user_{session % max(1, sessions // 2):07d}',
+            'session_id': f'sess_{session:08d}',
+            'event_type': rng.choice(EVENT_TYPES),
+            'page_url': rng.choices(PAGES, weights=page_weights)[0],
+            'referrer': rng.choice(REFERRERS),
+            'user_agent': 'Mozilla/5.0 (OfflineBenchmark)',
+            'ip_address': '203.0.113.10',
+            'time_bucket': datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc).strftime('%Y%m%d%H'),
+        }
+
+
+def load_dataset(backend_name, size, seed):
+    """데이터셋 적재 → (resource 또는 None, 백엔드, 적재 시간)"""
+    started = time.perf_counter()
+    if backend_name == 'sqlite':
+        from analytics.sqlite_backend import SQLiteBackend
+        path = os.path.join(tempfile.mkdtemp(prefix='liveinsight-bench-'), 'events.sqlite3')
+        backend = SQLiteBackend(path)
+        chunk = []
+        for event in make_events(size, seed):
+            chunk.append(event)
+            if len(chunk) == 50000:
+                backend.put_events(chunk)
+                chunk = []
+        if chunk:
+            backend.put_events(chunk)
+        return None, backend, time.perf_counter() - started
+
+    resource = create_liveinsight_tables()
+    table = resource.Table('LiveInsight-Events')
+    with table.batch_writer() as batch:
+        for event in make_events(size, seed):
+            batch.put_item(Item=event)
+    return resource, None, time.perf_counter() - started
+
+
+def measure(name, func, iterations, size, warmup=1):
+    """func() 를 반복 실행해 지연 시간 분포와 처리량 계산"""
+    for _ in range(warmup):
+        func()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    result = {
+        'benchmark': name,
+        'dataset': size,
+        'iterations': iterations,
+        'ops_per_sec': iterations / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.mean(latencies),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1],
+    }
+    print(f"   {name:<28} {result['ops_per_sec']:>10.1f} ops/s  "
+          f"p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  p99 {result['p99_ms']:8.2f}ms")
+    return result
+
+
+def bench_ingestion(resource, size, iterations, seed):
+    """lambda_handler 로 이벤트 수집 (세션 조회/갱신 + 저장 포함)"""
+    module = load_lambda(resource or create_liveinsight_tables())
+    rng = random.Random(seed)
+    sessions = [None] * 10
+
+    def ingest():
+        slot = rng.randrange(len(sessions))
+        body = {
+            'user_id': f'user_ingest_{slot}',
+            'session_id': sessions[slot],
+            'event_type': rng.choice(EVENT_TYPES),
+            'page_url': rng.choice(PAGES),
+            'referrer': rng.choice(REFERRERS),
+        }
+        response = module.lambda_handler(api_gateway_event(body), FakeContext())
+        if response['statusCode'] != 200:
+            raise RuntimeError(response['body'])
+        sessions[slot] = json.loads(response['body'])['session_id']
+
+    return measure('ingest.lambda_handler', ingest, iterations, size)
+
+
+def bench_views(size, iterations):
+    """Django 통계/상세 API"""
+    from django.core.cache import cache
+    from django.test import Client
+    from analytics.storage import db_client
+    from analytics.user_journey import journey_cache
+    from analytics.views import aggregate_by_hour
+
+    # 이전 데이터셋의 캐시 결과가 섞이지 않도록 초기화
+    cache.clear()
+    journey_cache.clear()
+    client = Client()
+    sample = db_client.get_hourly_stats(1)
+    session_id = sample[0]['session_id'] if sample else 'sess_00000000'
+    user_id = sample[0]['user_id'] if sample else 'user_0000000'
+    hour = datetime.now().strftime('%H:%M')
+
+    def get(url):
+        def call():
+            response = client.get(url)
+            if response.status_code >= 500:
+                raise RuntimeError(f'{url} → {response.status_code}')
+        return call
+
+    results = [
+        measure('stats.hourly_aggregate', lambda: aggregate_by_hour(db_client.get_hourly_stats(24)), iterations, size),
+    ]
+    endpoints = [
+        ('api.statistics.hourly', '/api/statistics/hourly/'),
+        ('api.statistics.pages', '/api/statistics/pages/'),
+        ('api.statistics.referrers', '/api/statistics/referrers/'),
+        ('api.statistics.summary', '/api/statistics/summary/'),
+        ('api.hourly_details', f'/api/hourly-details/?hour={hour}'),
+        ('api.page_details', f'/api/page-details/?page={PAGES[0]}'),
+        ('api.referrer_details', '/api/referrer-details/?referrer=google'),
+        ('api.session_events', f'/api/sessions/{session_id}/events/'),
+        ('api.user_events', f'/api/events/?user_id={user_id}&limit=50'),
+        ('api.user_timeline', f'/api/users/{user_id}/timeline/?limit=50'),
+    ]
+    for name, url in endpoints:
+        results.append(measure(name, get(url), iterations, size))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous_path, results, threshold):
+    """이전 결과와 p50 / 처리량 비교 (threshold 비율 이상 느려지면 표시)"""
+    with open(previous_path) as f:
+        previous = {(r['benchmark'], r['dataset']): r for r in json.load(f)['results']}
+    regressions = []
+    print(f"\n📈 Compared with {previous_path}")
+    for result in results:
+        before = previous.get((result['benchmark'], result['dataset']))
+        if not before:
+            continue
+        change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] if before['p50_ms'] else 0.0
+        marker = '❌' if change > threshold else '✅'
+        print(f"   {marker} {result['benchmark']:<28} {result['dataset']:>10,}  "
+              f"p50 {before['p50_ms']:8.2f} → {result['p50_ms']:8.2f}ms ({change * 100:+.1f}%)")
+        if change > threshold:
+            regressions.append(result['benchmark'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight offline benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--backend', choices=['fake', 'sqlite'], default='fake',
+                        help='fake: 인프로세스 DynamoDB (메모리, ~1M 까지), sqlite: SQLite 백엔드 (10M 이상)')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--ingest-iterations', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.environ.get('BENCH_OUTPUT'))
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=0.2, help='회귀로 볼 p50 증가 비율')
+    args = parser.parse_args()
+
+    print(f"🧪 LiveInsight offline benchmark (backend: {args.backend})")
+    setup_django()
+    results = []
+    datasets = []
+    for size in args.sizes:
+        resource, backend, load_seconds = load_dataset(args.backend, size, args.seed)
+        setup_django(resource=resource, backend=backend)
+        datasets.append({'size': size, 'load_seconds': load_seconds})
+        print(f"\n📊 {size:,} events (loaded in {load_seconds:.1f}s)")
+
+        results.append(bench_ingestion(resource, size, args.ingest_iterations, args.seed))
+        results.extend(bench_views(size, args.iterations))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'backend': args.backend,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'created_at': datetime.now().isoformat(),
+            'datasets': datasets,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
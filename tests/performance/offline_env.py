@@ -0,0 +1,109 @@
+"""
+오프라인 실행 환경
+
+lambda_function.py 와 Django 앱을 실제 AWS 대신 인프로세스 fake DynamoDB 에 연결한다.
+오프라인 벤치마크와 로컬 하네스가 공통으로 사용한다.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+import uuid
+from unittest import mock
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SRC_DIR = os.path.join(ROOT, 'src')
+LAMBDA_PATH = os.path.join(ROOT, 'infrastructure', 'lambda_function.py')
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_dynamodb import create_liveinsight_tables  # noqa: E402
+
+TABLE_ENV = {
+    'EVENTS_TABLE': 'LiveInsight-Events',
+    'SESSIONS_TABLE': 'LiveInsight-Sessions',
+    'ACTIVE_SESSIONS_TABLE': 'LiveInsight-ActiveSessions',
+    'COUNTERS_TABLE': 'LiveInsight-Counters',
+}
+
+# mock.patch 는 프로세스 전역이므로 동시에 여러 컨테이너를 로드할 때 직렬화
+_load_lock = threading.Lock()
+
+
+class FakeCloudWatch:
+    """cloudwatch 클라이언트 대역 (전송된 메트릭을 메모리에 보관)"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def put_metric_data(self, Namespace, MetricData):
+        self.metrics.extend(MetricData)
+
+
+class FakeContext:
+    """Lambda context 대역"""
+
+    function_name = 'liveinsight-event-collector'
+    memory_limit_in_mb = 256
+
+    def __init__(self, timeout_ms=30000):
+        self.aws_request_id = str(uuid.uuid4())
+        self._timeout_ms = timeout_ms
+
+    def get_remaining_time_in_millis(self):
+        return self._timeout_ms
+
+
+def api_gateway_event(body=None, method='POST', headers=None, source_ip='127.0.0.1', raw_body=None):
+    """API Gateway 프록시 통합 이벤트 생성"""
+    return {
+        'httpMethod': method,
+        'path': '/events',
+        'headers': headers or {'Content-Type': 'application/json'},
+        'body': raw_body if raw_body is not None else (json.dumps(body) if body is not None else None),
+        'isBase64Encoded': False,
+        'requestContext': {'identity': {'sourceIp': source_ip}},
+    }
+
+
+def _environment():
+    env = dict(TABLE_ENV)
+    env.setdefault('AWS_DEFAULT_REGION', os.environ.get('AWS_DEFAULT_REGION', 'us-east-1'))
+    return env
+
+
+def load_lambda(resource=None, cloudwatch=None, module_name='lambda_function'):
+    """fake 리소스에 연결된 lambda_function 모듈을 새로 로드 (콜드 스타트 1회에 해당)"""
+    resource = resource or create_liveinsight_tables()
+    cloudwatch = cloudwatch or FakeCloudWatch()
+    os.environ.update(_environment())
+    spec = importlib.util.spec_from_file_location(module_name, LAMBDA_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with _load_lock, mock.patch('boto3.resource', return_value=resource), \
+            mock.patch('boto3.client', return_value=cloudwatch):
+        spec.loader.exec_module(module)
+    return module
+
+
+def setup_django(resource=None, backend=None):
+    """Django 를 설정하고 db_client 를 fake DynamoDB 또는 지정한 백엔드에 연결"""
+    os.environ.update(_environment())
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'liveinsight.settings')
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+
+    import django
+    django.setup()
+
+    from analytics.storage import db_client
+    if backend is not None:
+        db_client._wrapped = backend
+    else:
+        from analytics.dynamodb_client import DynamoDBClient
+        resource = resource or create_liveinsight_tables()
+        with mock.patch('boto3.resource', return_value=resource):
+            client = DynamoDBClient()
+        db_client._wrapped = client
+    return db_client
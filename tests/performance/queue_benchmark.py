@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+큐 버퍼 수집 벤치마크
+동기 저장 (lambda_handler 가 DynamoDB 쓰기까지 기다림) 과 큐 경로 (수집기는 큐에 넣고 202,
+consume_handler 가 배치로 저장) 의 수집기 응답 지연, 처리량, 큐 깊이, 종단 지연 비교
+
+fake DynamoDB 테이블에 쓰기 지연 (--table-latency-ms) 을 주고 인프로세스 큐 (LocalQueue) 로
+SQS 이벤트 소스 매핑을 흉내 낸다 (최대 --batch-size 개, --batch-window-ms 만큼 모아서 전달).
+
+    python tests/performance/queue_benchmark.py
+    python tests/performance/queue_benchmark.py --events 5000 --table-latency-ms 5 --output queue.json
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_dynamodb import create_liveinsight_tables  # noqa: E402
+from histogram import LatencyHistogram  # noqa: E402
+from offline_env import FakeContext, api_gateway_event, load_lambda  # noqa: E402
+
+EVENT_TYPES = ('page_view', 'page_view', 'page_view', 'click', 'scroll', 'add_to_cart', 'purchase')
+PAGES = ('/', '/products', '/products/1', '/products/2', '/cart', '/checkout', '/about')
+
+
+class LocalQueue:
+    """SQS 대역 (스레드 안전, send 는 수집기 ingest_queue 인터페이스)"""
+
+    def __init__(self):
+        self.messages = collections.deque()
+        self.condition = threading.Condition()
+        self.sent = 0
+
+    def send(self, body):
+        with self.condition:
+            self.messages.append({'messageId': str(uuid.uuid4()), 'body': body})
+            self.sent += 1
+            self.condition.notify()
+
+    def receive(self, max_messages, wait_seconds):
+        """첫 메시지부터 wait_seconds 동안 모아 최대 max_messages 개 (배치 윈도우)"""
+        deadline = time.monotonic() + wait_seconds
+        with self.condition:
+            while len(self.messages) < max_messages:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+            return [self.messages.popleft() for _ in range(min(max_messages, len(self.messages)))]
+
+    def depth(self):
+        return len(self.messages)
+
+
+def make_bodies(count, sessions, seed):
+    rng = random.Random(seed)
+    users = [f"user_bench_{index}" for index in range(sessions)]
+    bodies = []
+    for index in range(count):
+        user = rng.randrange(sessions)
+        bodies.append({
+            'user_id': users[user],
+            'session_id': f"sess_bench_{seed}_{user}",
+            'event_type': rng.choice(EVENT_TYPES),
+            'page_url': rng.choice(PAGES),
+            'referrer': '',
+            'user_agent': 'queue-benchmark',
+            'event_id': f"qb{seed}.{index}",
+        })
+    return bodies
+
+
+def drive_collector(module, bodies):
+    """수집기 호출 지연 히스토그램, 상태 코드별 수, 경과 시간"""
+    latency = LatencyHistogram()
+    statuses = {}
+    started = time.perf_counter()
+    for body in bodies:
+        call_started = time.perf_counter()
+        response = module.lambda_handler(api_gateway_event(body), FakeContext())
+        latency.record((time.perf_counter() - call_started) * 1_000_000)
+        statuses[response['statusCode']] = statuses.get(response['statusCode'], 0) + 1
+    return latency, statuses, time.perf_counter() - started
+
+
+def consume(consumer, queue, batch_size, batch_window, done, result):
+    """이벤트 소스 매핑 흉내: 모아서 consume_handler 호출, 깊이 / 종단 지연 기록"""
+    while True:
+        records = queue.receive(batch_size, batch_window)
+        result['depth'].append(queue.depth() + len(records))
+        if not records:
+            if done.is_set() and not queue.depth():
+                return
+            continue
+        received = [json.loads(record['body'])['received_at'] for record in records]
+        consumer.consume_handler({'Records': records}, FakeContext())
+        now_ms = time.time() * 1000
+        for received_at in received:
+            result['lag'].record(max(0.0, now_ms - received_at) * 1000)
+        result['batches'] += 1
+        result['messages'] += len(records)
+
+
+def run_benchmark(count, sessions, table_latency_ms, batch_size, batch_window_ms, seed):
+    bodies = make_bodies(count, sessions, seed)
+    table_latency = table_latency_ms / 1000
+
+    print(f"🧪 Queue-buffered ingestion benchmark ({count:,} events, {sessions:,} sessions, "
+          f"table latency {table_latency_ms:g}ms)")
+
+    # 동기 저장
+    sync_resource = create_liveinsight_tables(latency=table_latency)
+    sync_collector = load_lambda(sync_resource, module_name='lambda_function_sync')
+    sync_latency, sync_statuses, sync_elapsed = drive_collector(sync_collector, bodies)
+    sync_collector.shutdown()
+
+    # 큐 경로: 수집기와 소비자는 같은 테이블을 쓰는 별도 컨테이너
+    queue_resource = create_liveinsight_tables(latency=table_latency)
+    queue = LocalQueue()
+    collector = load_lambda(queue_resource, module_name='lambda_function_queued')
+    collector.ingest_queue = queue
+    consumer = load_lambda(queue_resource, module_name='lambda_function_consumer')
+
+    done = threading.Event()
+    consumed = {'depth': [], 'lag': LatencyHistogram(), 'batches': 0, 'messages': 0}
+    worker = threading.Thread(
+        target=consume, args=(consumer, queue, batch_size, batch_window_ms / 1000, done, consumed), daemon=True
+    )
+    started = time.perf_counter()
+    worker.start()
+    queue_latency, queue_statuses, queue_elapsed = drive_collector(collector, bodies)
+    done.set()
+    worker.join()
+    drained = time.perf_counter() - started
+    consumer.shutdown()
+
+    def table_stats(resource):
+        return {name: dict(table.stats) for name, table in resource.tables.items()}
+
+    stored = len(queue_resource.Table('LiveInsight-Events').items)
+    depth = consumed['depth'] or [0]
+    result = {
+        'events': count,
+        'sessions': sessions,
+        'table_latency_ms': table_latency_ms,
+        'sync': {
+            'statuses': sync_statuses,
+            'collector_latency': sync_latency.summary_ms(),
+            'throughput': count / sync_elapsed,
+            'stored_events': len(sync_resource.Table('LiveInsight-Events').items),
+            'tables': table_stats(sync_resource),
+        },
+        'queue': {
+            'statuses': queue_statuses,
+            'collector_latency': queue_latency.summary_ms(),
+            'collector_throughput': count / queue_elapsed,
+            'end_to_end_throughput': count / drained,
+            'drain_seconds': drained - queue_elapsed,
+            'batches': consumed['batches'],
+            'messages': consumed['messages'],
+            'mean_batch_size': consumed['messages'] / consumed['batches'] if consumed['batches'] else 0.0,
+            'max_depth': max(depth),
+            'mean_depth': sum(depth) / len(depth),
+            'end_to_end_lag': consumed['lag'].summary_ms(),
+            'stored_events': stored,
+            'tables': table_stats(queue_resource),
+        },
+    }
+
+    sync, queued = result['sync'], result['queue']
+    print(f"   sync   collector p50 {sync['collector_latency']['p50_ms']:.2f}ms  "
+          f"p99 {sync['collector_latency']['p99_ms']:.2f}ms  {sync['throughput']:,.0f} events/s  "
+          f"statuses {sync['statuses']}  stored {sync['stored_events']:,}")
+    print(f"   queue  collector p50 {queued['collector_latency']['p50_ms']:.2f}ms  "
+          f"p99 {queued['collector_latency']['p99_ms']:.2f}ms  {queued['collector_throughput']:,.0f} events/s  "
+          f"statuses {queued['statuses']}  stored {queued['stored_events']:,}")
+    print(f"          end-to-end {queued['end_to_end_throughput']:,.0f} events/s, "
+          f"drained {queued['drain_seconds']:.2f}s after last request")
+    print(f"          {queued['batches']:,} consumer batches (mean {queued['mean_batch_size']:.1f} messages), "
+          f"depth max {queued['max_depth']:,} mean {queued['mean_depth']:.1f}")
+    print(f"          lag p50 {queued['end_to_end_lag']['p50_ms']:.1f}ms  p99 {queued['end_to_end_lag']['p99_ms']:.1f}ms"
+          f"  max {queued['end_to_end_lag']['max_ms']:.1f}ms")
+    sync_writes = sum(stats['writes'] for stats in sync['tables'].values())
+    queue_writes = sum(stats['writes'] for stats in queued['tables'].values())
+    print(f"   table writes: sync {sync_writes:,}  queue {queue_writes:,}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight queue-buffered ingestion benchmark')
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--table-latency-ms', type=float, default=2.0, help='fake DynamoDB 호출당 지연')
+    parser.add_argument('--batch-size', type=int, default=100, help='소비자 호출당 최대 메시지 수')
+    parser.add_argument('--batch-window-ms', type=float, default=200, help='배치 윈도우')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.events, args.sessions, args.table_latency_ms, args.batch_size, args.batch_window_ms, args.seed
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
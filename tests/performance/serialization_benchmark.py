@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+JSON 직렬화 / 응답 압축 벤치마크
+세션 이벤트 응답(DynamoDB Decimal 포함) 기준으로 직렬화 시간과 전송 바이트를 비교
+"""
+
+import json
+import os
+import sys
+import time
+import random
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from analytics.serialization import dumps, compress, orjson, brotli
+
+
+def make_session_events(count):
+    """DynamoDB 에서 읽은 형태의 세션 이벤트 생성"""
+    base_ts = 1_700_000_000_000
+    events = []
+    for i in range(count):
+        events.append({
+            'event_id': f'evt_20250101_120000_{i:08x}',
+            'timestamp': Decimal(base_ts + i * 1500),
+            'user_id': 'user_1700000000000_abcdefghi',
+            'session_id': 'sess_1700000000000_defghi',
+            'event_type': random.choice(['page_view', 'click', 'heartbeat']),
+            'page_url': f'https://shop.example.com/products/{random.randint(1, 500)}',
+            'referrer': random.choice(['', 'https://www.google.com/', 'https://facebook.com/']),
+            'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'ip_address': '203.0.113.10'
+        })
+    return events
+
+
+def time_it(func, repeat):
+    """평균 실행 시간 (밀리초)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, result
+
+
+def run_benchmark(sizes=(100, 1000, 10000), repeat=20):
+    print("🧪 JSON serialization benchmark")
+    print(f"   orjson: {'yes' if orjson else 'no'}, brotli: {'yes' if brotli else 'no'}")
+
+    results = []
+    for size in sizes:
+        events = make_session_events(size)
+
+        baseline_ms, baseline = time_it(
+            lambda: json.dumps(events, cls=DjangoJSONEncoder).encode('utf-8'), repeat
+        )
+        stdlib_ms, _ = time_it(lambda: dumps(events, fast=False), repeat)
+        fast_ms, fast = time_it(lambda: dumps(events), repeat)
+
+        gzip_ms, gzipped = time_it(lambda: compress(fast, 'gzip'), repeat)
+        row = {
+            'events': size,
+            'baseline_ms': baseline_ms,
+            'stdlib_compact_ms': stdlib_ms,
+            'fast_ms': fast_ms,
+            'baseline_bytes': len(baseline),
+            'fast_bytes': len(fast),
+            'gzip_bytes': len(gzipped),
+            'gzip_ms': gzip_ms,
+        }
+        if brotli is not None:
+            br_ms, brotlied = time_it(lambda: compress(fast, 'br'), repeat)
+            row['br_bytes'] = len(brotlied)
+            row['br_ms'] = br_ms
+        results.append(row)
+
+        print(f"\n📊 {size:,} events")
+        print(f"   JsonResponse (DjangoJSONEncoder): {baseline_ms:8.2f}ms  {len(baseline):>10,} bytes")
+        print(f"   stdlib compact:                   {stdlib_ms:8.2f}ms")
+        print(f"   fast path:                        {fast_ms:8.2f}ms  {len(fast):>10,} bytes "
+              f"({baseline_ms / max(fast_ms, 1e-9):.1f}x)")
+        print(f"   + gzip:                           {gzip_ms:8.2f}ms  {len(gzipped):>10,} bytes "
+              f"({len(gzipped) / len(baseline) * 100:.1f}% of baseline)")
+        if 'br_bytes' in row:
+            print(f"   + brotli:                         {row['br_ms']:8.2f}ms  {row['br_bytes']:>10,} bytes "
+                  f"({row['br_bytes'] / len(baseline) * 100:.1f}% of baseline)")
+
+    return results
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+    results = run_benchmark(sizes)
+
+    output = os.environ.get('BENCH_OUTPUT')
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+합성 e-commerce 트래픽 생성기
+
+실서비스와 비슷한 분포의 이벤트/세션을 대량으로 만든다.
+- 상품/카테고리 인기도: Zipf
+- 유입 경로: 검색 / SNS / 이메일 / 직접 유입 비율, 유입 경로별 랜딩 페이지
+- 세션 길이: 페이지 체류 시간 로그정규, 이탈 확률
+- heartbeat: 페이지에 머무는 동안 30초마다
+- 구매 퍼널: 상품 → 장바구니 → 결제 → 주문 완료(conversion)
+- 일중 트래픽 변화: 시간대별 세션 시작 비율 (기본 21시 최고, KST)
+
+시드가 같으면 워커 수와 관계없이 같은 데이터가 만들어진다 (청크마다 독립 시드).
+NDJSON(.gz) 파일로 쓰거나 저장소 백엔드(put_events / put_sessions)에 바로 적재한다.
+
+사용법:
+    python tests/performance/traffic_generator.py --events 1000000 --output events.ndjson.gz
+    python tests/performance/traffic_generator.py --events 10000000 --workers 8 \\
+        --backend sqlite --sqlite-path /tmp/liveinsight.sqlite3
+"""
+
+import argparse
+import bisect
+import gzip
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import orjson  # 선택 의존성 (대량 NDJSON 직렬화 가속)
+except ImportError:
+    orjson = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SRC_DIR = os.path.join(ROOT, 'src')
+
+SITE = 'https://shop.example.com'
+
+# (유입 경로, 비율, 랜딩 페이지 종류)
+REFERRER_MIX = [
+    ('', 0.30, 'home'),
+    ('https://www.google.com/search?q=shop', 0.25, 'product'),
+    ('https://search.naver.com/search.naver?query=shop', 0.12, 'product'),
+    ('https://facebook.com/', 0.08, 'product'),
+    ('https://www.instagram.com/', 0.08, 'product'),
+    ('https://twitter.com/', 0.03, 'category'),
+    ('https://mail.example.com/promo', 0.07, 'category'),
+    ('https://blog.example.org/review', 0.07, 'product'),
+]
+
+USER_AGENTS = [
+    ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148', 0.45),
+    ('Mozilla/5.0 (Linux; Android 14; SM-S918N) AppleWebKit/537.36 Chrome/120.0 Mobile Safari/537.36', 0.25),
+    ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36', 0.20),
+    ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 Version/17.0 Safari/605.1.15', 0.10),
+]
+
+
+def _cumulative(weights):
+    total = 0.0
+    cumulative = []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+
+def _zipf_cumulative(count, exponent):
+    return _cumulative(1 / (rank + 1) ** exponent for rank in range(count))
+
+
+class TrafficModel:
+    """트래픽 분포 파라미터"""
+
+    def __init__(self, products=500, categories=20, zipf_exponent=1.1, mean_dwell_seconds=40,
+                 exit_probability=0.18, click_probability=0.5, heartbeat_interval=30,
+                 add_to_cart=0.10, checkout=0.55, purchase=0.65, returning_users=0.4,
+                 peak_hour=21, diurnal_amplitude=0.6, utc_offset_hours=9, session_timeout=1800):
+        self.products = products
+        self.categories = categories
+        self.zipf_exponent = zipf_exponent
+        self.mean_dwell_seconds = mean_dwell_seconds
+        self.exit_probability = exit_probability
+        self.click_probability = click_probability
+        self.heartbeat_interval = heartbeat_interval
+        self.add_to_cart = add_to_cart
+        self.checkout = checkout
+        self.purchase = purchase
+        self.returning_users = returning_users
+        self.peak_hour = peak_hour
+        self.diurnal_amplitude = diurnal_amplitude
+        self.utc_offset_hours = utc_offset_hours
+        self.session_timeout = session_timeout
+
+        self.product_cumulative = _zipf_cumulative(products, zipf_exponent)
+        self.category_cumulative = _zipf_cumulative(categories, zipf_exponent)
+        self.referrer_cumulative = _cumulative(weight for _, weight, _ in REFERRER_MIX)
+        self.agent_cumulative = _cumulative(weight for _, weight in USER_AGENTS)
+        # 로그정규 체류 시간 (sigma 1.0, 평균이 mean_dwell_seconds 가 되도록)
+        self.dwell_sigma = 1.0
+        self.dwell_mu = math.log(mean_dwell_seconds) - self.dwell_sigma ** 2 / 2
+
+    def diurnal_weight(self, timestamp_ms):
+        """현지 시각 기준 상대 트래픽 (0 ~ 1)"""
+        hour = (timestamp_ms / 3_600_000 + self.utc_offset_hours) % 24
+        return (1 + self.diurnal_amplitude * math.cos(2 * math.pi * (hour - self.peak_hour) / 24)) \
+            / (1 + self.diurnal_amplitude)
+
+    # 페이지
+
+    def product_page(self, rng):
+        return f'{SITE}/products/{bisect.bisect(self.product_cumulative, rng.random() * self.product_cumulative[-1])}'
+
+    def category_page(self, rng):
+        return f'{SITE}/category/{bisect.bisect(self.category_cumulative, rng.random() * self.category_cumulative[-1])}'
+
+    def landing(self, rng, kind):
+        if kind == 'product':
+            return 'product', self.product_page(rng)
+        if kind == 'category':
+            return 'category', self.category_page(rng)
+        return 'home', f'{SITE}/'
+
+    def next_page(self, rng, kind):
+        """현재 페이지 종류에서 다음 페이지 (종류, URL), 퍼널 이탈 없이 진행"""
+        roll = rng.random()
+        if kind == 'product':
+            if roll < self.add_to_cart:
+                return 'cart', f'{SITE}/cart'
+            if roll < 0.7:
+                return 'product', self.product_page(rng)
+            return 'category', self.category_page(rng)
+        if kind == 'cart':
+            if roll < self.checkout:
+                return 'checkout', f'{SITE}/checkout'
+            return 'product', self.product_page(rng)
+        if kind == 'checkout':
+            if roll < self.purchase:
+                return 'complete', f'{SITE}/order/complete'
+            return 'cart', f'{SITE}/cart'
+        if kind == 'home' and roll < 0.5:
+            return 'category', self.category_page(rng)
+        return 'product', self.product_page(rng)
+
+    def dwell_ms(self, rng):
+        return int(min(rng.lognormvariate(self.dwell_mu, self.dwell_sigma), 1200) * 1000) + 500
+
+
+class ChunkWriter:
+    """청크 하나의 이벤트/세션 생성 상태 (문자열 포맷 캐시 포함)"""
+
+    def __init__(self, model, rng, end_ms):
+        self.model = model
+        self.rng = rng
+        self.end_ms = end_ms
+        self.events = []
+        self.sessions = []
+        self._hour_prefix = {}
+
+    def _prefix(self, timestamp_ms):
+        hour = timestamp_ms // 3_600_000
+        prefix = self._hour_prefix.get(hour)
+        if prefix is None:
+            moment = datetime.fromtimestamp(hour * 3600, tz=timezone.utc)
+            prefix = self._hour_prefix[hour] = (moment.strftime('%Y%m%d_%H'), moment.strftime('%Y%m%d%H'))
+        return prefix
+
+    def event(self, session, timestamp, event_type, page_url):
+        """이벤트 추가 (구간 끝을 넘으면 추가하지 않고 False)"""
+        if timestamp > self.end_ms:
+            return False
+        id_prefix, bucket = self._prefix(timestamp)
+        seconds = (timestamp // 1000) % 3600
+        self.events.append({
+            'event_id': f'evt_{id_prefix}{seconds // 60:02d}{seconds % 60:02d}_{self.rng.getrandbits(32):08x}',
+            'timestamp': timestamp,
+            'user_id': session['user_id'],
+            'session_id': session['session_id'],
+            'event_type': event_type,
+            'page_url': page_url,
+            'referrer': session['referrer'],
+            'user_agent': session['user_agent'],
+            'ip_address': session['ip_address'],
+            'time_bucket': bucket,
+        })
+        return True
+
+
+def generate_session(model, writer, start_ms, user_index, quota, now_ms):
+    """세션 하나의 이벤트 생성 (quota 개를 넘지 않음) → 생성한 이벤트 수"""
+    rng = writer.rng
+    referrer_index = bisect.bisect(model.referrer_cumulative, rng.random() * model.referrer_cumulative[-1])
+    referrer, _, landing_kind = REFERRER_MIX[min(referrer_index, len(REFERRER_MIX) - 1)]
+    agent_index = bisect.bisect(model.agent_cumulative, rng.random() * model.agent_cumulative[-1])
+    user_id = f'user_{user_index:010x}'
+    session = {
+        'session_id': f'sess_{start_ms}_{rng.getrandbits(32):08x}',
+        'user_id': user_id,
+        'referrer': referrer,
+        'user_agent': USER_AGENTS[min(agent_index, len(USER_AGENTS) - 1)][0],
+        'ip_address': f'198.51.{(user_index >> 8) % 256}.{user_index % 256}',
+    }
+
+    emitted = 0
+    timestamp = start_ms
+    kind, page = model.landing(rng, landing_kind)
+    entry_page = page
+    while emitted < quota and writer.event(session, timestamp, 'page_view', page):
+        emitted += 1
+        if kind == 'complete':
+            if emitted < quota and writer.event(session, timestamp + 200, 'conversion', page):
+                emitted += 1
+            break
+
+        dwell = model.dwell_ms(rng)
+        click_at = timestamp + int(dwell * rng.random())
+        clicked = rng.random() < model.click_probability
+        # 페이지에 머무는 동안 주기적 heartbeat (클릭은 시각 순서에 맞춰 끼워 넣음)
+        beat = model.heartbeat_interval * 1000
+        while beat < dwell and emitted < quota:
+            if clicked and click_at <= timestamp + beat:
+                clicked = False
+                if not writer.event(session, click_at, 'click', page):
+                    break
+                emitted += 1
+                continue
+            if not writer.event(session, timestamp + beat, 'heartbeat', page):
+                break
+            emitted += 1
+            beat += model.heartbeat_interval * 1000
+        if clicked and emitted < quota and writer.event(session, click_at, 'click', page):
+            emitted += 1
+        timestamp += dwell
+        if rng.random() < model.exit_probability:
+            break
+        kind, page = model.next_page(rng, kind)
+
+    last_activity = writer.events[-1]['timestamp']
+    writer.sessions.append({
+        'session_id': session['session_id'],
+        'user_id': user_id,
+        'start_time': start_ms,
+        'last_activity': last_activity,
+        'is_active': now_ms - last_activity < model.session_timeout * 1000,
+        'entry_page': entry_page,
+        'exit_page': page,
+        'referrer': referrer,
+        'total_events': emitted,
+        'session_duration': last_activity - start_ms,
+        'ip_address': session['ip_address'],
+    })
+    return emitted
+
+
+def generate_chunk(model, chunk_index, events, seed, start_ms, end_ms, now_ms=None):
+    """청크 하나 (이벤트 events 개) → (이벤트 목록, 세션 목록)
+
+    시드는 (seed, chunk_index) 로만 정해지므로 어느 워커에서 만들어도 결과가 같다.
+    """
+    rng = random.Random(seed * 1_000_003 + chunk_index)
+    writer = ChunkWriter(model, rng, end_ms)
+    now_ms = now_ms or end_ms
+    span = end_ms - start_ms
+    # 재방문 사용자 풀 (청크 사이에도 겹치도록 청크와 무관한 범위)
+    user_pool = max(1, int(events / 8 / max(model.returning_users, 0.01)))
+    new_users = 1 << 36
+
+    produced = 0
+    while produced < events:
+        # 일중 트래픽 곡선으로 세션 시작 시각을 thinning 샘플링
+        while True:
+            session_start = start_ms + int(rng.random() * span)
+            if rng.random() < model.diurnal_weight(session_start):
+                break
+        if rng.random() < model.returning_users:
+            user_index = rng.randrange(user_pool)
+        else:
+            user_index = new_users + (chunk_index << 24) + len(writer.sessions)
+        produced += generate_session(model, writer, session_start, user_index, events - produced, now_ms)
+    return writer.events, writer.sessions
+
+
+def active_sessions(sessions, now_ms, timeout_seconds=1800):
+    """세션 중 아직 활성 상태인 것 → ActiveSessions 아이템"""
+    return [
+        {
+            'session_id': session['session_id'],
+            'user_id': session['user_id'],
+            'last_activity': session['last_activity'],
+            'current_page': session['exit_page'],
+            'expires_at': session['last_activity'] // 1000 + timeout_seconds,
+        }
+        for session in sessions
+        if session['is_active'] and session['last_activity'] <= now_ms
+    ]
+
+
+def encode_ndjson(items):
+    if orjson is not None:
+        return b''.join(orjson.dumps(item) + b'\n' for item in items)
+    return ''.join(json.dumps(item, separators=(',', ':')) + '\n' for item in items).encode('utf-8')
+
+
+# 워커 (multiprocessing)
+
+_worker_state = {}
+
+
+def _open_backend(name, sqlite_path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'liveinsight.settings')
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    import django
+    django.setup()
+    if name == 'sqlite':
+        from analytics.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(sqlite_path)
+    from analytics.storage import get_backend
+    return get_backend()
+
+
+def _init_worker(model, options):
+    _worker_state['model'] = model
+    _worker_state['options'] = options
+    if options['backend']:
+        _worker_state['backend'] = _open_backend(options['backend'], options['sqlite_path'])
+
+
+def _run_chunk(task):
+    chunk_index, events = task
+    options = _worker_state['options']
+    items, sessions = generate_chunk(
+        _worker_state['model'], chunk_index, events, options['seed'],
+        options['start_ms'], options['end_ms'], options['now_ms']
+    )
+    backend = _worker_state.get('backend')
+    if backend is not None:
+        # 청크 단위 대량 쓰기 (DynamoDB: BatchWriteItem 25개씩, SQLite: executemany)
+        backend.put_events(items)
+        backend.put_sessions(sessions)
+        active = active_sessions(sessions, options['now_ms'], _worker_state['model'].session_timeout)
+        if active:
+            backend.put_active_sessions(active)
+        return len(items), len(sessions), None, None
+    if not options['write_ndjson']:
+        return len(items), len(sessions), None, None
+    return len(items), len(sessions), encode_ndjson(items), encode_ndjson(sessions) if options['sessions'] else None
+
+
+def chunk_plan(total_events, chunk_events):
+    """[(청크 번호, 이벤트 수)] (마지막 청크만 작을 수 있음)"""
+    return [
+        (index, min(chunk_events, total_events - index * chunk_events))
+        for index in range(math.ceil(total_events / chunk_events))
+    ]
+
+
+def _open_output(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'wb', compresslevel=3)
+    return open(path, 'wb')
+
+
+def run(total_events, model=None, seed=42, days=7, end_ms=None, workers=None, chunk_events=50000,
+        output=None, sessions_output=None, backend=None, sqlite_path=None):
+    """생성 실행 → {'events', 'sessions', 'seconds'}"""
+    model = model or TrafficModel()
+    now_ms = int(time.time() * 1000)
+    end_ms = end_ms or now_ms
+    options = {
+        'seed': seed,
+        'start_ms': end_ms - int(days * 86_400_000),
+        'end_ms': end_ms,
+        'now_ms': now_ms,
+        'backend': backend,
+        'sqlite_path': sqlite_path,
+        'write_ndjson': bool(output),
+        'sessions': bool(sessions_output),
+    }
+    if backend == 'sqlite':
+        # 스키마를 먼저 만들어 두어 워커들의 동시 생성 경합을 피함
+        _open_backend(backend, sqlite_path).ping()
+
+    plan = chunk_plan(total_events, chunk_events)
+    workers = workers or os.cpu_count() or 1
+    event_file = _open_output(output) if output else None
+    session_file = _open_output(sessions_output) if sessions_output else None
+    totals = {'events': 0, 'sessions': 0}
+    started = time.perf_counter()
+    try:
+        if workers == 1:
+            _init_worker(model, options)
+            results = map(_run_chunk, plan)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(model, options))
+            # imap 은 청크 순서를 유지하므로 출력 파일도 시드별로 결정적
+            results = pool.imap(_run_chunk, plan)
+        for event_count, session_count, event_lines, session_lines in results:
+            totals['events'] += event_count
+            totals['sessions'] += session_count
+            if event_file and event_lines:
+                event_file.write(event_lines)
+            if session_file and session_lines:
+                session_file.write(session_lines)
+            print(f"\r   {totals['events']:,} / {total_events:,} events", end='', flush=True)
+        if pool is not None:
+            pool.close()
+            pool.join()
+    finally:
+        for handle in (event_file, session_file):
+            if handle:
+                handle.close()
+    print()
+    totals['seconds'] = time.perf_counter() - started
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight synthetic e-commerce traffic generator')
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--days', type=float, default=7, help='생성 구간 (현재 시각까지 최근 N일)')
+    parser.add_argument('--end', type=int, help='구간 끝 (epoch ms, 재현용으로 고정)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-events', type=int, default=50000)
+    parser.add_argument('--output', help='이벤트 NDJSON 파일 (.gz 이면 gzip)')
+    parser.add_argument('--sessions-output', help='세션 NDJSON 파일 (.gz 이면 gzip)')
+    parser.add_argument('--backend', choices=['sqlite', 'settings'],
+                        help='sqlite: SQLiteBackend, settings: settings.STORAGE_BACKEND (DynamoDB 등)')
+    parser.add_argument('--sqlite-path', default=os.path.join(ROOT, 'liveinsight-traffic.sqlite3'))
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--zipf', type=float, default=1.1, help='페이지 인기도 Zipf 지수')
+    parser.add_argument('--add-to-cart', type=float, default=0.10)
+    parser.add_argument('--checkout', type=float, default=0.55)
+    parser.add_argument('--purchase', type=float, default=0.65)
+    parser.add_argument('--peak-hour', type=int, default=21, help='트래픽 최고 시각 (현지)')
+    parser.add_argument('--utc-offset', type=int, default=9, help='현지 시간대 (시간)')
+    args = parser.parse_args()
+
+    if not args.output and not args.backend:
+        parser.error('--output 또는 --backend 중 하나는 필요합니다')
+
+    model = TrafficModel(
+        products=args.products, categories=args.categories, zipf_exponent=args.zipf,
+        add_to_cart=args.add_to_cart, checkout=args.checkout, purchase=args.purchase,
+        peak_hour=args.peak_hour, utc_offset_hours=args.utc_offset
+    )
+    print(f"🏭 Generating {args.events:,} events over {args.days:g} days "
+          f"(seed {args.seed}, {args.workers} workers)")
+    totals = run(
+        args.events, model, seed=args.seed, days=args.days, end_ms=args.end, workers=args.workers,
+        chunk_events=args.chunk_events, output=args.output, sessions_output=args.sessions_output,
+        backend=args.backend, sqlite_path=args.sqlite_path
+    )
+    rate = totals['events'] / totals['seconds'] if totals['seconds'] else 0
+    print(f"✅ {totals['events']:,} events / {totals['sessions']:,} sessions "
+          f"in {totals['seconds']:.1f}s ({rate:,.0f} events/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+수집 버퍼 WAL 벤치마크
+요청 스레드 수별로 그룹 커밋 (analytics.wal) 과 이벤트마다 fsync 하는 방식의 처리량 / 커밋 지연을 비교하고,
+mmap 재생 속도를 측정한다. 디스크 특성에 따라 결과가 크게 다르므로 실제 배포 볼륨 위의 디렉터리로 실행한다.
+
+    python tests/performance/wal_benchmark.py
+    python tests/performance/wal_benchmark.py --dir /var/lib/liveinsight/wal-bench --threads 1 8 64 --seconds 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from histogram import LatencyHistogram  # noqa: E402
+
+from analytics.wal import WriteAheadLog  # noqa: E402
+
+
+def make_payload(index):
+    return json.dumps({
+        'event_id': f'evt_{index:032x}',
+        'timestamp': 1_700_000_000_000 + index,
+        'user_id': 'user_1700000000000_abcdefghi',
+        'session_id': 'sess_1700000000000_defghi',
+        'event_type': 'page_view',
+        'page_url': f'https://shop.example.com/products/{index % 500}',
+        'referrer': '',
+        'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+        'ip_address': '203.0.113.10',
+        'time_bucket': '2023111422',
+    }, separators=(',', ':')).encode('utf-8')
+
+
+class PerEventSync:
+    """비교 기준: 이벤트마다 write + fdatasync (잠금으로 직렬화)"""
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self._fd = os.open(os.path.join(path, 'log'), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._lock = threading.Lock()
+        self.stats = {'syncs': 0}
+
+    def write(self, payload):
+        with self._lock:
+            os.write(self._fd, payload)
+            if hasattr(os, 'fdatasync'):
+                os.fdatasync(self._fd)
+            else:
+                os.fsync(self._fd)
+            self.stats['syncs'] += 1
+
+    def close(self):
+        os.close(self._fd)
+
+
+def run_threads(threads, seconds, write):
+    """threads 개 스레드가 seconds 초 동안 write(payload) → (이벤트 수, 커밋 지연 히스토그램, 경과 시간)"""
+    latency = LatencyHistogram()
+    counts = [0] * threads
+    stop = time.perf_counter() + seconds
+    payloads = [make_payload(index) for index in range(1000)]
+
+    def worker(slot):
+        histogram = LatencyHistogram()
+        index = 0
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            write(payloads[index % len(payloads)])
+            histogram.record((time.perf_counter() - started) * 1_000_000)
+            index += 1
+        counts[slot] = index
+        with lock:
+            latency.merge(histogram)
+
+    lock = threading.Lock()
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(counts), latency, time.perf_counter() - started
+
+
+def bench_commit(directory, threads, seconds, segment_bytes):
+    results = []
+    for count in threads:
+        path = os.path.join(directory, f'group-{count}')
+        wal = WriteAheadLog(path, segment_bytes=segment_bytes)
+        events, latency, elapsed = run_threads(count, seconds, lambda payload: wal.commit(wal.append(payload)))
+        wal.close()
+        group = {
+            'events_per_second': events / elapsed,
+            'syncs': wal.stats['syncs'],
+            'events_per_sync': events / wal.stats['syncs'] if wal.stats['syncs'] else 0.0,
+            'segments': wal.stats['segments'],
+            'commit_latency': latency.summary_ms(),
+        }
+
+        baseline_log = PerEventSync(os.path.join(directory, f'baseline-{count}'))
+        events, latency, elapsed = run_threads(count, seconds, baseline_log.write)
+        baseline_log.close()
+        baseline = {'events_per_second': events / elapsed, 'commit_latency': latency.summary_ms()}
+
+        print(f"   {count:>3} threads  group commit {group['events_per_second']:>10,.0f} events/s "
+              f"({group['events_per_sync']:.1f} events/sync, p99 {group['commit_latency']['p99_ms']:.2f}ms)"
+              f"  per-event fsync {baseline['events_per_second']:>9,.0f} events/s "
+              f"(p99 {baseline['commit_latency']['p99_ms']:.2f}ms)")
+        results.append({'threads': count, 'group_commit': group, 'per_event_fsync': baseline})
+    return results
+
+
+def bench_replay(directory, records, segment_bytes):
+    path = os.path.join(directory, 'replay')
+    wal = WriteAheadLog(path, segment_bytes=segment_bytes)
+    for index in range(records):
+        wal.append(make_payload(index))
+    wal.close()
+    written = wal.stats['bytes']
+
+    started = time.perf_counter()
+    wal = WriteAheadLog(path, segment_bytes=segment_bytes)
+    replayed = sum(1 for _ in wal.replay())
+    elapsed = time.perf_counter() - started
+    wal.close()
+    result = {
+        'records': replayed,
+        'seconds': elapsed,
+        'records_per_second': replayed / elapsed if elapsed else 0.0,
+        'megabytes': written / 1024 / 1024,
+    }
+    print(f"   replay {replayed:,} records ({result['megabytes']:.1f}MB) in {elapsed * 1000:.1f}ms "
+          f"({result['records_per_second']:,.0f} records/s, open + mmap scan)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LiveInsight ingest WAL benchmark')
+    parser.add_argument('--dir', help='WAL 디렉터리 (기본: 임시 디렉터리, 실행 후 삭제)')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--segment-mb', type=int, default=64)
+    parser.add_argument('--replay-records', type=int, default=200_000)
+    parser.add_argument('--output', help='결과 JSON 파일')
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix='liveinsight-wal-')
+    os.makedirs(directory, exist_ok=True)
+    segment_bytes = args.segment_mb * 1024 * 1024
+    try:
+        print(f"🧪 Ingest WAL benchmark ({directory})")
+        result = {
+            'commit': bench_commit(directory, args.threads, args.seconds, segment_bytes),
+            'replay': bench_replay(directory, args.replay_records, segment_bytes),
+        }
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
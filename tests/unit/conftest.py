@@ -0,0 +1,62 @@
+"""
+pytest 설정 파일
+AWS 나 서버 없이 실행하는 수집 경로 단위 테스트 (fake DynamoDB, SQLite, 임시 디렉터리)
+
+    python -m pytest tests/unit -q
+"""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'performance'))
+
+from fake_dynamodb import create_liveinsight_tables  # noqa: E402
+from offline_env import load_lambda, setup_django  # noqa: E402
+
+# analytics 모듈을 import 하기 전에 Django 설정 (기본 db_client 는 fake DynamoDB)
+setup_django()
+
+
+def client_error(code, operation='PutItem', status=400):
+    """botocore ClientError 생성"""
+    return ClientError(
+        {'Error': {'Code': code, 'Message': code}, 'ResponseMetadata': {'HTTPStatusCode': status}},
+        operation
+    )
+
+
+@pytest.fixture
+def tables():
+    """main.tf 와 같은 키 구조의 fake DynamoDB 테이블 세트"""
+    return create_liveinsight_tables()
+
+
+@pytest.fixture
+def load_container(tables):
+    """같은 fake 테이블에 연결된 Lambda 컨테이너 (호출할 때마다 콜드 스타트 1회)"""
+    return lambda: load_lambda(tables)
+
+
+@pytest.fixture
+def dynamodb_backend(tables):
+    from analytics.dynamodb_client import DynamoDBClient
+
+    with mock.patch('boto3.resource', return_value=tables):
+        return DynamoDBClient()
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    from analytics.sqlite_backend import SQLiteBackend
+
+    return SQLiteBackend(tmp_path / 'liveinsight.sqlite3')
+
+
+@pytest.fixture(params=['dynamodb', 'sqlite'])
+def backend(request):
+    """두 저장소 백엔드 각각으로 실행"""
+    return request.getfixturevalue(f'{request.param}_backend')
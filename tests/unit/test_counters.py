@@ -0,0 +1,78 @@
+"""
+ShardedCounters: 스로틀 시 샤드 늘리기, 다른 쓰기 주체가 늘린 샤드 읽기, UnprocessedKeys 재요청
+"""
+
+from conftest import client_error
+
+from analytics import counters as counters_module
+from analytics.counters import ShardedCounters
+
+COUNTER = 'events#202610191400'
+
+
+def test_throttled_increment_grows_shards_and_retries(tables):
+    table = tables.Table('LiveInsight-Counters')
+    counters = ShardedCounters(tables, table, max_shards=8)
+    update_item = table.update_item
+    throttled = []
+
+    def throttle_first_add(**kwargs):
+        if kwargs['Key']['counter_id'].endswith('#0') and not throttled:
+            throttled.append(kwargs['Key'])
+            raise client_error('ProvisionedThroughputExceededException', 'UpdateItem')
+        return update_item(**kwargs)
+
+    table.update_item = throttle_first_add
+    assert counters.increment({COUNTER: 3}) == {}
+
+    assert counters.stats == {'writes': 1, 'throttles': 1, 'grown': 1}
+    assert table.get_item(Key={'counter_id': f'{COUNTER}#shards'})['Item']['shards'] == 2
+    assert counters.get([COUNTER]) == {COUNTER: 3}
+
+
+def test_reader_sees_shards_grown_by_another_writer(tables):
+    table = tables.Table('LiveInsight-Counters')
+    writer = ShardedCounters(tables, table, max_shards=8)
+    reader = ShardedCounters(tables, table, max_shards=8)
+    writer.increment({COUNTER: 1})
+    assert reader.get([COUNTER]) == {COUNTER: 1}
+
+    # 읽는 쪽이 샤드 수 1 을 알고 있는 동안 다른 쓰기 주체가 4 로 늘리고 새 샤드에 씀
+    assert writer.grow(COUNTER, 2) == 4
+    for shard in range(4):
+        table.update_item(
+            Key={'counter_id': f'{COUNTER}#{shard}'},
+            UpdateExpression='ADD #count :n',
+            ExpressionAttributeNames={'#count': 'count'},
+            ExpressionAttributeValues={':n': 10}
+        )
+    assert reader.get([COUNTER]) == {COUNTER: 41}
+
+
+def test_unprocessed_keys_are_requested_again_with_backoff(tables, monkeypatch):
+    table = tables.Table('LiveInsight-Counters')
+    counters = ShardedCounters(tables, table)
+    names = [f'pageviews#/page-{index}' for index in range(5)]
+    counters.increment(dict.fromkeys(names, 2))
+
+    batch_get_item = tables.batch_get_item
+    calls = []
+
+    def leave_half_unprocessed(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) > 1:
+            return batch_get_item(RequestItems=RequestItems)
+        request = RequestItems[table.name]
+        keys = request['Keys']
+        response = batch_get_item(RequestItems={table.name: dict(request, Keys=keys[::2])})
+        response['UnprocessedKeys'] = {table.name: dict(request, Keys=keys[1::2])}
+        return response
+
+    sleeps = []
+    monkeypatch.setattr(tables, 'batch_get_item', leave_half_unprocessed)
+    monkeypatch.setattr(counters_module.time, 'sleep', sleeps.append)
+
+    assert counters.get(names) == dict.fromkeys(names, 2)
+    assert len(calls) == 2
+    assert len(sleeps) == 1
+    assert 0 <= sleeps[0] <= counters_module.BATCH_GET_MAX_BACKOFF
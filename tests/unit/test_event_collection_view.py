@@ -0,0 +1,71 @@
+"""
+EventCollectionView (POST /api/events/): 검증 실패 400, 버퍼가 가득 차면 429
+"""
+
+import json
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from analytics import views
+from analytics.ingest import IngestBuffer
+
+VALID_EVENT = {
+    'user_id': 'user-1',
+    'session_id': 'sess-1',
+    'event_type': 'page_view',
+    'timestamp': 1_790_000_000_000,
+    'page_url': '/home',
+}
+
+
+@pytest.fixture
+def buffer(sqlite_backend, monkeypatch):
+    """플러셔가 돌지 않는 작은 버퍼로 교체"""
+    buffer = IngestBuffer(sqlite_backend, batch_size=100, flush_interval=60, max_events=2)
+    monkeypatch.setattr(views, 'ingest_buffer', buffer)
+    yield buffer
+    buffer.close(timeout=0)
+
+
+def post(body, raw=False):
+    request = APIRequestFactory().post(
+        '/api/events/', body if raw else json.dumps(body), content_type='application/json'
+    )
+    return views.EventCollectionView.as_view()(request)
+
+
+def test_valid_event_is_accepted(buffer):
+    response = post(VALID_EVENT)
+    assert response.status_code == 202
+    assert response.data['event_id'].startswith('evt_')
+    assert len(buffer._events) == 1
+
+
+@pytest.mark.parametrize('body, error', [
+    ({key: value for key, value in VALID_EVENT.items() if key != 'session_id'}, 'Missing required field: session_id'),
+    (dict(VALID_EVENT, timestamp='soon'), 'Invalid timestamp'),
+    (dict(VALID_EVENT, page_url={'x': 1.5}), 'Invalid field: page_url'),
+    (dict(VALID_EVENT, referrer=['/a']), 'Invalid field: referrer'),
+    (dict(VALID_EVENT, user_agent=1.5), 'Invalid field: user_agent'),
+    ([VALID_EVENT], 'Invalid event payload'),
+])
+def test_invalid_event_is_rejected_before_buffering(buffer, body, error):
+    response = post(body)
+    assert response.status_code == 400
+    assert response.data == {'error': error}
+    assert len(buffer._events) == 0
+
+
+def test_invalid_json_is_rejected(buffer):
+    response = post('{"user_id": ', raw=True)
+    assert response.status_code == 400
+
+
+def test_full_buffer_returns_429_with_retry_after(buffer):
+    assert post(VALID_EVENT).status_code == 202
+    assert post(VALID_EVENT).status_code == 202
+    response = post(VALID_EVENT)
+    assert response.status_code == 429
+    assert response['Retry-After'] == '1'
+    assert len(buffer._events) == 2
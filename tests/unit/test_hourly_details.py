@@ -0,0 +1,39 @@
+"""
+시간대 상세 API: total_events 는 페이지 크기가 아니라 그 1분의 이벤트 수
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+
+from django.test import RequestFactory
+from django.utils import timezone
+
+from analytics.ingest import build_event
+from analytics.storage import db_client
+from dashboard import views
+
+
+def get(hour, cursor=None):
+    params = {'hour': hour, 'limit': 2}
+    if cursor:
+        params['cursor'] = cursor
+    response = asyncio.run(views.api_hourly_details(RequestFactory().get('/api/hourly-details/', params)))
+    assert response.status_code == 200
+    return json.loads(response.content)
+
+
+def test_total_events_counts_the_whole_minute(backend, monkeypatch):
+    monkeypatch.setattr(db_client, '_wrapped', backend)
+    window = (timezone.now() - timedelta(hours=2)).astimezone(timezone.get_current_timezone())
+    window = window.replace(second=0, microsecond=0)
+    start_ms = int(window.timestamp() * 1000)
+    backend.put_events([build_event({
+        'user_id': 'user-1', 'session_id': 'sess-1', 'event_type': 'click', 'timestamp': timestamp,
+    }) for timestamp in (start_ms - 1, start_ms, start_ms + 1000, start_ms + 2000, start_ms + 59_999, start_ms + 60_000)])
+
+    hour = window.strftime('%H:%M')
+    first = get(hour)
+    assert (first['total_events'], first['page_size'], first['has_more']) == (4, 2, True)
+    second = get(hour, first['next_cursor'])
+    assert (second['total_events'], second['page_size'], second['has_more']) == (4, 2, False)
@@ -0,0 +1,139 @@
+"""
+IngestBuffer: 실패 후 백오프, 저장할 수 없는 이벤트만 데드레터, 세션 변경분 병합
+"""
+
+import json
+import threading
+import time
+
+from botocore.exceptions import EndpointConnectionError
+from conftest import client_error
+
+from analytics.ingest import IngestBuffer, _retryable, build_event
+from analytics.wal import DEAD_LETTER_FILE, WriteAheadLog
+
+
+def make_event(session_id='sess-1', timestamp=1_790_000_000_000, page_url='/', user_id='user-1'):
+    return build_event({
+        'user_id': user_id,
+        'session_id': session_id,
+        'event_type': 'page_view',
+        'timestamp': timestamp,
+        'page_url': page_url,
+    })
+
+
+class FlakyBackend:
+    """put_events 가 처음 failures 번은 error 로 실패하는 백엔드 래퍼"""
+
+    def __init__(self, backend, error, failures):
+        self.backend = backend
+        self.error = error
+        self.failures = failures
+        self.attempts = []
+        self.stored = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def put_events(self, events):
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise self.error
+        self.backend.put_events(events)
+        self.stored.set()
+
+
+def test_failed_flush_backs_off_even_when_buffer_is_full(sqlite_backend):
+    backend = FlakyBackend(sqlite_backend, client_error('ProvisionedThroughputExceededException'), failures=2)
+    buffer = IngestBuffer(backend, batch_size=1, flush_interval=0.05)
+    try:
+        # 버퍼가 batch_size 이상이라 offer 가 계속 플러셔를 깨우지만 실패 뒤에는 백오프만큼 기다려야 함
+        for index in range(5):
+            assert buffer.offer(make_event(timestamp=1_790_000_000_000 + index))
+        assert backend.stored.wait(5)
+    finally:
+        buffer.close()
+
+    gaps = [later - earlier for earlier, later in zip(backend.attempts, backend.attempts[1:])]
+    assert gaps[0] >= 0.1 * 0.9
+    assert gaps[1] >= 0.2 * 0.9
+    assert sqlite_backend.count_events() == 5
+
+
+class RejectingBackend(FlakyBackend):
+    """page_url 이 '/bad' 인 이벤트가 섞인 묶음은 boto3 직렬화처럼 TypeError 로 실패"""
+
+    def __init__(self, backend):
+        super().__init__(backend, None, failures=0)
+
+    def put_events(self, events):
+        self.attempts.append(len(events))
+        if any(event['page_url'] == '/bad' for event in events):
+            raise TypeError('Float types are not supported. Use Decimal types instead.')
+        self.backend.put_events(events)
+
+
+def test_unstorable_event_is_dead_lettered_alone_before_checkpoint(tmp_path, sqlite_backend):
+    backend = RejectingBackend(sqlite_backend)
+    buffer = IngestBuffer(
+        backend, batch_size=100, flush_interval=60,
+        wal_factory=lambda: WriteAheadLog(str(tmp_path / 'wal'))
+    )
+    try:
+        for index, page_url in enumerate(['/a', '/bad', '/b']):
+            buffer.offer(make_event(timestamp=1_790_000_000_000 + index, page_url=page_url))
+        wal = buffer.wal
+        before = wal.checkpoint_lsn
+
+        # 재시도해도 소용없는 오류: 묶음을 한 건씩 다시 저장하고 실패한 이벤트만 데드레터로
+        assert buffer.flush() == 2
+        assert backend.attempts == [3, 1, 1, 1]
+        dead_letters = (tmp_path / 'wal' / DEAD_LETTER_FILE).read_bytes().splitlines()
+        assert [json.loads(line)['page_url'] for line in dead_letters] == ['/bad']
+        assert wal.checkpoint_lsn > before
+        assert list(wal.replay()) == []
+        # 뒤에 들어온 이벤트는 막히지 않음
+        buffer.offer(make_event(timestamp=1_790_000_000_010, page_url='/c'))
+        assert buffer.flush() == 1
+    finally:
+        buffer.close(timeout=0)
+    assert sqlite_backend.count_events() == 3
+    sessions, _ = sqlite_backend.query_user_sessions('user-1')
+    assert sessions[0]['total_events'] == 3
+
+
+def test_only_transient_errors_are_retried():
+    assert _retryable(client_error('ProvisionedThroughputExceededException'))
+    assert _retryable(client_error('InternalServerError', status=500))
+    assert _retryable(EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com'))
+    assert not _retryable(client_error('ValidationException'))
+    assert not _retryable(TypeError('Float types are not supported. Use Decimal types instead.'))
+
+
+def test_session_deltas_from_two_buffers_merge(backend):
+    first = IngestBuffer(backend, batch_size=100, flush_interval=60)
+    second = IngestBuffer(backend, batch_size=100, flush_interval=60)
+    base = 1_790_000_000_000
+    try:
+        first.offer(make_event(timestamp=base + 1000, page_url='/a1000'))
+        first.offer(make_event(timestamp=base + 2000, page_url='/a2000'))
+        second.offer(make_event(timestamp=base + 500, page_url='/b500'))
+        second.offer(make_event(timestamp=base + 4000, page_url='/b4000'))
+        first.offer(make_event(timestamp=base + 3000, page_url='/a3000'))
+        # 두 워커가 같은 세션 변경분을 번갈아 반영해도 서로 덮어쓰지 않아야 함
+        assert first.flush() == 3
+        assert second.flush() == 2
+    finally:
+        first.close(timeout=0)
+        second.close(timeout=0)
+
+    sessions, _ = backend.query_user_sessions('user-1')
+    assert len(sessions) == 1
+    session = sessions[0]
+    assert session['total_events'] == 5
+    assert session['start_time'] == base + 500
+    assert session['entry_page'] == '/b500'
+    assert session['last_activity'] == base + 4000
+    assert session['exit_page'] == '/b4000'
+    assert session['session_duration'] == 3500
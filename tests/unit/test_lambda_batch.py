@@ -0,0 +1,68 @@
+"""
+Lambda 배치 봉투: gzip 본문 해석, 봉투 펼치기, 상한 초과 배치는 잘라내지 않고 413
+"""
+
+import base64
+import gzip
+import json
+import time
+
+from offline_env import FakeContext, api_gateway_event
+
+
+def envelope(count, sent_at=None):
+    return {
+        'v': 1, 'user_id': 'user-1', 'session_id': 'sess_client', 'user_agent': 'ua', 'id_prefix': 'page1',
+        'sent_at': sent_at or int(time.time() * 1000),
+        'events': [
+            {'event_type': 'page_view', 'seq': 0, 'dt': -2000, 'page_url': '/home'},
+            {'event_type': 'click', 'seq': 1, 'dt': -1000},
+            {'event_type': 'click', 'seq': 2, 'dt': 0, 'page_url': '/cart'},
+        ][:count] + [{'event_type': 'click', 'seq': seq, 'dt': 0} for seq in range(3, count)],
+    }
+
+
+def gzip_event(body):
+    event = api_gateway_event(raw_body=base64.b64encode(gzip.compress(json.dumps(body).encode())).decode())
+    event['isBase64Encoded'] = True
+    return event
+
+
+def test_gzip_batch_is_decoded_and_expanded(load_container):
+    container = load_container()
+    sent_at = int(time.time() * 1000)
+    bodies, batched = container.decode_request(gzip_event(envelope(3, sent_at)))
+    assert batched
+    assert [(body['event_id'], body['timestamp'], body['page_url']) for body in bodies] == [
+        ('page1.0', sent_at - 2000, '/home'),
+        ('page1.1', sent_at - 1000, '/home'),  # 생략한 page_url 은 직전 이벤트와 같음
+        ('page1.2', sent_at, '/cart'),
+    ]
+    assert all(body['user_agent'] == 'ua' and body['session_id'] == 'sess_client' for body in bodies)
+
+
+def test_gzip_batch_is_stored(load_container, tables):
+    container = load_container()
+    response = container.lambda_handler(gzip_event(envelope(3)), FakeContext())
+    assert response['statusCode'] == 200
+    body = json.loads(response['body'])
+    assert (body['events'], body['accepted']) == (3, 3)
+    assert tables.Table('LiveInsight-Events').item_count() == 3
+
+
+def test_oversized_batch_is_rejected_whole(load_container, tables):
+    container = load_container()
+    response = container.lambda_handler(
+        api_gateway_event(envelope(container.MAX_BATCH_EVENTS + 1)), FakeContext()
+    )
+    assert response['statusCode'] == 413
+    assert json.loads(response['body'])['max_events'] == container.MAX_BATCH_EVENTS
+    assert tables.Table('LiveInsight-Events').item_count() == 0
+    assert 'PayloadTooLarge' in [metric['MetricName'] for metric in container.cloudwatch.metrics]
+
+
+def test_gzip_bomb_is_rejected(load_container):
+    container = load_container()
+    padded = dict(envelope(1), padding='x' * (container.MAX_BATCH_BYTES + 1))
+    response = container.lambda_handler(gzip_event(padded), FakeContext())
+    assert response['statusCode'] == 413
@@ -0,0 +1,57 @@
+"""
+Lambda 큐 소비자: 읽지 못했거나 쓰지 못한 메시지만 batchItemFailures 로, 재전달은 같은 아이템
+"""
+
+import json
+import time
+
+from offline_env import FakeContext
+
+from conftest import client_error
+
+
+def record(message_id, session_id, count=2):
+    return {'messageId': message_id, 'body': json.dumps({
+        'received_at': int(time.time() * 1000),
+        'ip': '127.0.0.1',
+        'events': [
+            {'user_id': 'user-1', 'session_id': session_id, 'event_type': 'click', 'page_url': f'/{index}'}
+            for index in range(count)
+        ],
+    })}
+
+
+def test_only_failed_messages_are_reported(load_container, tables, monkeypatch):
+    container = load_container()
+    # 미처리 아이템 재요청 사이 대기를 짧게
+    monkeypatch.setattr(container, 'RETRY_CAP_MS', 1)
+    events = tables.Table('LiveInsight-Events')
+    put_item = events.put_item
+
+    def throttled_for_sess_c(Item, **kwargs):
+        if Item['session_id'] == 'sess-c':
+            raise client_error('ProvisionedThroughputExceededException')
+        return put_item(Item=Item, **kwargs)
+
+    monkeypatch.setattr(events, 'put_item', throttled_for_sess_c)
+    result = container.consume_handler({'Records': [
+        record('m-a', 'sess-a'),
+        {'messageId': 'm-b', 'body': '{"events": ['},
+        record('m-c', 'sess-c'),
+    ]}, FakeContext())
+
+    assert result == {'batchItemFailures': [{'itemIdentifier': 'm-b'}, {'itemIdentifier': 'm-c'}]}
+    assert {item['session_id'] for item in events.items.values()} == {'sess-a'}
+    assert events.item_count() == 2
+
+
+def test_redelivered_message_overwrites_the_same_items(load_container, tables):
+    container = load_container()
+    message = record('m-a', 'sess-a', count=3)
+    assert container.consume_handler({'Records': [message]}, FakeContext()) == {'batchItemFailures': []}
+    first = set(tables.Table('LiveInsight-Events').items)
+
+    # 다른 컨테이너로 재전달돼도 메시지 ID 로 정해진 같은 키
+    assert load_container().consume_handler({'Records': [message]}, FakeContext()) == {'batchItemFailures': []}
+    assert set(tables.Table('LiveInsight-Events').items) == first
+    assert len(first) == 3
@@ -0,0 +1,69 @@
+"""
+Lambda 중복 제거: 컨테이너별 최근 ID (RecentIds), 다른 컨테이너의 재전송은 조건부 쓰기로 거절
+"""
+
+import json
+import time
+
+from offline_env import FakeContext, api_gateway_event
+
+
+def post(container, body):
+    response = container.lambda_handler(api_gateway_event(body), FakeContext())
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def metric_names(container):
+    return [metric['MetricName'] for metric in container.cloudwatch.metrics]
+
+
+def start_session(container):
+    return post(container, {'user_id': 'user-1', 'event_type': 'page_view', 'page_url': '/home'})['session_id']
+
+
+def click(session_id):
+    return {
+        'user_id': 'user-1', 'session_id': session_id, 'event_type': 'click', 'page_url': '/home',
+        'event_id': 'page1.7', 'timestamp': int(time.time() * 1000),
+    }
+
+
+def test_resend_to_same_container_is_skipped_in_memory(load_container, tables):
+    container = load_container()
+    body = click(start_session(container))
+    first = post(container, body)
+    second = post(container, body)
+    assert first['event_id'] == second['event_id'] == 'evt_c_page1.7'
+    assert 'duplicate' not in first and second['duplicate'] is True
+    assert 'DuplicatesSkipped' in metric_names(container)
+    assert tables.Table('LiveInsight-Events').item_count() == 2
+    # 세션 이벤트 수도 한 번만
+    assert container.session_aggregator.sessions[body['session_id']]['events'] == 1
+
+
+def test_resend_to_other_container_is_rejected_by_conditional_write(load_container, tables):
+    first, second = load_container(), load_container()
+    body = click(start_session(first))
+    post(first, body)
+    resent = post(second, body)
+    assert resent['duplicate'] is True
+    assert 'DuplicatesRejected' in metric_names(second)
+    assert tables.Table('LiveInsight-Events').item_count() == 2
+    assert second.session_aggregator.sessions[body['session_id']]['events'] == 0
+    # 이후 재전송은 메모리에서 걸러짐
+    post(second, body)
+    assert 'DuplicatesSkipped' in metric_names(second)
+
+
+def test_recent_ids_are_bounded_by_size_and_window(load_container, monkeypatch):
+    container = load_container()
+    recent = container.RecentIds(max_size=2, window_ms=1000)
+    now = [1000.0]
+    monkeypatch.setattr(container.time, 'time', lambda: now[0])
+    for event_id in ('a', 'b', 'c'):
+        recent.add(event_id)
+    assert ('a' in recent, 'b' in recent, 'c' in recent) == (False, True, True)
+    now[0] += 1.001
+    assert 'c' not in recent
+    assert recent.stats == {'checked': 4, 'hits': 2}
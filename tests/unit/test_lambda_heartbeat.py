@@ -0,0 +1,50 @@
+"""
+Lambda 하트비트: 활성 세션 갱신 간격 (HEARTBEAT_MIN_INTERVAL_MS), 모르는 세션은 행을 만들지 않음
+"""
+
+import json
+import time
+
+from offline_env import FakeContext, api_gateway_event
+
+
+def post(container, body):
+    response = container.lambda_handler(api_gateway_event(body), FakeContext())
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def heartbeat(session_id, timestamp):
+    # 클라이언트 ID 가 있으면 클라이언트 시각을 그대로 사용
+    return {
+        'user_id': 'user-1', 'session_id': session_id, 'event_type': 'heartbeat', 'page_url': '/home',
+        'event_id': f'hb-{timestamp}', 'timestamp': timestamp,
+    }
+
+
+def test_heartbeats_are_coalesced_per_interval(load_container, tables):
+    container = load_container()
+    active = tables.Table('LiveInsight-ActiveSessions')
+    session_id = post(container, {'user_id': 'user-1', 'event_type': 'page_view', 'page_url': '/home'})['session_id']
+    started = int(active.get_item(Key={'session_id': session_id})['Item']['last_activity'])
+    writes = active.stats['writes']
+
+    interval = container.HEARTBEAT_MIN_INTERVAL_MS
+    results = [
+        post(container, heartbeat(session_id, started + offset))['refreshed']
+        for offset in (1000, interval - 1, interval, interval + 1000)
+    ]
+    assert results == [False, False, True, False]
+    assert active.stats['writes'] - writes == 1
+    assert active.get_item(Key={'session_id': session_id})['Item']['last_activity'] == started + interval
+    # 이벤트로 저장하지 않음
+    assert tables.Table('LiveInsight-Events').item_count() == 1
+
+
+def test_heartbeat_for_unknown_session_creates_no_active_row(load_container, tables):
+    container = load_container()
+    body = post(container, heartbeat('sess_client_made', int(time.time() * 1000)))
+    assert body['refreshed'] is False
+    assert 'Item' not in tables.Table('LiveInsight-ActiveSessions').get_item(Key={'session_id': 'sess_client_made'})
+    assert 'sess_client_made' not in container.session_aggregator
+    assert tables.Table('LiveInsight-Sessions').item_count() == 0
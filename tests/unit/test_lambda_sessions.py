@@ -0,0 +1,100 @@
+"""
+Lambda SessionAggregator: 컨테이너 간 변경분 병합, 종료 시 반영, 종료 알림 확장 등록
+"""
+
+import json
+import os
+import runpy
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from offline_env import ROOT, FakeContext, api_gateway_event
+
+EXTENSION_PATH = os.path.join(ROOT, 'infrastructure', 'lambda-extension', 'liveinsight-shutdown', 'extension.py')
+
+
+def post(container, body):
+    response = container.lambda_handler(api_gateway_event(body), FakeContext())
+    assert response['statusCode'] == 200
+    return json.loads(response['body'])
+
+
+def click(session_id, page_url, offset_ms):
+    # 클라이언트 ID 가 있으면 클라이언트 시각을 그대로 사용
+    return {
+        'user_id': 'user-1', 'session_id': session_id, 'event_type': 'click', 'page_url': page_url,
+        'event_id': f'click-{page_url[1:]}-{offset_ms}', 'timestamp': int(time.time() * 1000) + offset_ms,
+    }
+
+
+def test_deltas_from_two_containers_are_merged(load_container, tables):
+    first, second = load_container(), load_container()
+    session_id = post(first, {'user_id': 'user-1', 'event_type': 'page_view', 'page_url': '/home'})['session_id']
+    sessions = tables.Table('LiveInsight-Sessions')
+
+    for offset_ms in range(1, 4):
+        post(first, click(session_id, '/home', offset_ms))
+    for offset_ms in range(10, 12):
+        post(second, click(session_id, '/cart', offset_ms))
+    # 간격 전이라 아직 반영 전
+    assert sessions.get_item(Key={'session_id': session_id})['Item']['total_events'] == 1
+
+    second.flush_sessions(second.session_aggregator.pending())
+    first.flush_sessions(first.session_aggregator.pending())
+    item = sessions.get_item(Key={'session_id': session_id})['Item']
+    # 먼저 반영한 컨테이너의 더 최근 활동이 뒤로 가지 않고 이벤트 수만 더해짐
+    assert item['total_events'] == 6
+    assert item['exit_page'] == '/cart'
+    assert first.session_aggregator.pending() == second.session_aggregator.pending() == []
+
+
+def test_shutdown_flushes_pending_deltas(load_container, tables):
+    container = load_container()
+    session_id = post(container, {'user_id': 'user-1', 'event_type': 'page_view', 'page_url': '/home'})['session_id']
+    post(container, click(session_id, '/home', 1))
+    assert container.session_aggregator.pending() == [session_id]
+
+    container.shutdown()
+    item = tables.Table('LiveInsight-Sessions').get_item(Key={'session_id': session_id})['Item']
+    assert item['total_events'] == 2
+    assert container.session_aggregator.pending() == []
+
+
+def test_shutdown_extension_registers_for_shutdown_only(monkeypatch):
+    requests = []
+
+    class RuntimeApi(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, body, headers=()):
+            self.send_response(200)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(json.dumps(body).encode())
+
+        def do_POST(self):
+            length = int(self.headers['Content-Length'])
+            requests.append((self.path, self.headers['Lambda-Extension-Name'], json.loads(self.rfile.read(length))))
+            self._reply({}, [('Lambda-Extension-Identifier', 'ext-1')])
+
+        def do_GET(self):
+            requests.append((self.path, self.headers['Lambda-Extension-Identifier'], None))
+            self._reply({'eventType': 'SHUTDOWN', 'shutdownReason': 'spindown'})
+
+    server = HTTPServer(('127.0.0.1', 0), RuntimeApi)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.setenv('AWS_LAMBDA_RUNTIME_API', f'127.0.0.1:{server.server_port}')
+        runpy.run_path(EXTENSION_PATH, run_name='__main__')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert requests == [
+        ('/2020-01-01/extension/register', 'liveinsight-shutdown', {'events': ['SHUTDOWN']}),
+        ('/2020-01-01/extension/event/next', 'ext-1', None),
+    ]
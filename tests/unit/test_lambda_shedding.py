@@ -0,0 +1,58 @@
+"""
+Lambda 부하 덜어내기: 스로틀 토큰 버킷 잔량에 따라 우선순위 낮은 이벤트부터 폐기
+"""
+
+import json
+
+import pytest
+from offline_env import FakeContext, api_gateway_event
+
+
+@pytest.fixture
+def container(load_container):
+    container = load_container()
+    # 시간이 지나도 회복하지 않도록
+    container.throttle_bucket.refill_per_second = 0
+    return container
+
+
+def set_level(container, level):
+    container.throttle_bucket.tokens = container.throttle_bucket.capacity * level
+
+
+@pytest.mark.parametrize('level, shed', [
+    (1.0, set()),
+    (0.5, set()),
+    (0.49, {'heartbeat'}),
+    (0.2, {'heartbeat'}),
+    (0.19, {'heartbeat', 'click'}),
+    (0.0, {'heartbeat', 'click'}),
+])
+def test_shed_thresholds(container, level, shed):
+    set_level(container, level)
+    decisions = {
+        event_type: container.shed_decision({'event_type': event_type})
+        for event_type in ('purchase', 'page_view', 'click', 'heartbeat')
+    }
+    # page_view 와 전환 이벤트는 잔량과 관계없이 처리
+    assert {event_type for event_type, decision in decisions.items() if decision} == shed
+    assert set(decisions.values()) <= {None, 'dropped'}
+
+
+def test_throttles_drain_the_bucket(container):
+    bucket = container.throttle_bucket
+    retries = [bucket.on_throttle() for _ in range(int(bucket.capacity // bucket.throttle_cost) + 1)]
+    # 토큰이 남아 있는 동안만 재시도
+    assert retries[-1] is False and all(retries[:-1])
+    assert bucket.level() == 0
+
+
+def test_shed_event_is_acknowledged_without_writes(container, tables):
+    set_level(container, 0.1)
+    response = container.lambda_handler(api_gateway_event({
+        'user_id': 'user-1', 'session_id': 'sess-1', 'event_type': 'click', 'page_url': '/home',
+    }), FakeContext())
+    assert response['statusCode'] == 202
+    assert json.loads(response['body'])['shed'] == 'dropped'
+    assert tables.Table('LiveInsight-Events').item_count() == 0
+    assert tables.Table('LiveInsight-Sessions').item_count() == 0
@@ -0,0 +1,64 @@
+"""
+프레즌스 증분 동기화: 최초 백필 이후에는 ActivityMinuteIndex Query 만으로 따라잡음
+"""
+
+import json
+import time
+
+from offline_env import FakeContext, api_gateway_event
+
+from analytics.presence import PresenceIndex
+
+
+def active_session(session_id, last_activity):
+    return {
+        'session_id': session_id, 'user_id': 'user-1', 'last_activity': last_activity,
+        'current_page': '/home', 'expires_at': int(time.time()) + 1800,
+    }
+
+
+def test_incremental_sync_queries_only_recent_minutes(dynamodb_backend, tables, load_container, monkeypatch):
+    now_ms = int(time.time() * 1000)
+    dynamodb_backend.put_active_sessions([active_session(f'old-{index}', now_ms - 20 * 60000) for index in range(50)])
+    presence = PresenceIndex(ttl_ms=1800 * 1000, loader=lambda since: dynamodb_backend.get_active_sessions(since))
+    presence.sync()
+    assert presence.active_count() == 50
+
+    # 이후에는 Scan 없이 (Django 수집 경로와 Lambda 가 쓴 세션 모두) 따라잡음
+    table = tables.Table('LiveInsight-ActiveSessions')
+    monkeypatch.setattr(table, 'scan', lambda **kwargs: (_ for _ in ()).throw(AssertionError('scan')))
+    dynamodb_backend.put_active_sessions([active_session('django-1', int(time.time() * 1000))])
+    response = load_container().lambda_handler(
+        api_gateway_event({'user_id': 'user-2', 'event_type': 'page_view', 'page_url': '/cart'}), FakeContext()
+    )
+    lambda_session = json.loads(response['body'])['session_id']
+
+    reads = table.stats['reads']
+    presence.sync(force=True)
+    assert presence.active_count() == 52
+    assert {record['session_id'] for record in presence.sessions()} >= {'django-1', lambda_session}
+    # 지난 동기화 이후의 분 (1~2개) 만 Query
+    assert table.stats['reads'] - reads <= 2
+
+
+def test_writers_set_activity_minute(dynamodb_backend, tables, load_container):
+    now_ms = int(time.time() * 1000)
+    dynamodb_backend.put_active_sessions([active_session('django-1', now_ms)])
+    container = load_container()
+    response = container.lambda_handler(
+        api_gateway_event({'user_id': 'user-2', 'event_type': 'page_view', 'page_url': '/cart'}), FakeContext()
+    )
+    lambda_session = json.loads(response['body'])['session_id']
+    table = tables.Table('LiveInsight-ActiveSessions')
+    for session_id in ('django-1', lambda_session):
+        item = table.get_item(Key={'session_id': session_id})['Item']
+        assert item['activity_minute'] == item['last_activity'] // 60000
+
+
+def test_active_within_counts_minute_buckets():
+    presence = PresenceIndex(ttl_ms=30 * 60000)
+    now_ms = 1_790_000_000_000 // 60000 * 60000 + 30000
+    for index, minutes_ago in enumerate([0, 0, 1, 4, 9]):
+        presence.touch(f'sess-{index}', last_activity=now_ms - minutes_ago * 60000)
+    # 범위로 세는 경우와 (N > 버킷 수) 버킷을 훑는 경우가 같은 답
+    assert [presence.active_within(minutes, now_ms) for minutes in (1, 2, 5, 10, 1000)] == [2, 3, 4, 5, 5]
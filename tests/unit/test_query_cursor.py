@@ -0,0 +1,54 @@
+"""
+시간 버킷 조회 커서: 버킷 목록이 바뀌어도 (end 생략, 새 시간 진입) 같은 위치에서 이어 읽기
+"""
+
+from analytics.pagination import decode_cursor, encode_cursor
+from analytics.query_planner import QueryPlan, time_bucket, time_buckets
+
+HOUR_MS = 3600 * 1000
+BASE = 1_790_000_000_000 // HOUR_MS * HOUR_MS
+
+
+def bucket_plan(end_ms):
+    return QueryPlan(
+        'time_bucket', index='TimeBucketIndex', partition_key='time_bucket', buckets=time_buckets(BASE, end_ms)
+    )
+
+
+def put_events(tables, hours, per_hour):
+    table = tables.Table('LiveInsight-Events')
+    for hour in range(hours):
+        for index in range(per_hour):
+            timestamp = BASE + hour * HOUR_MS + index * 1000
+            table.put_item(Item={
+                'event_id': f'evt-{hour}-{index}', 'timestamp': timestamp, 'time_bucket': time_bucket(timestamp),
+                'user_id': 'user-1', 'session_id': 'sess-1', 'event_type': 'click',
+            })
+
+
+def read_all(backend, plans, newest_first):
+    """첫 페이지는 plans[0], 이후 페이지는 plans[1] 로 (요청 사이에 버킷 목록이 바뀜)"""
+    items, next_key, _ = backend.query_events(plans[0], limit=2, newest_first=newest_first)
+    seen = [item['event_id'] for item in items]
+    while next_key:
+        # API 와 같이 서명한 커서로 주고받음
+        cursor = encode_cursor(next_key, 'events')
+        items, next_key, _ = backend.query_events(
+            plans[1], limit=2, newest_first=newest_first, exclusive_start_key=decode_cursor(cursor, 'events')
+        )
+        seen.extend(item['event_id'] for item in items)
+    return seen
+
+
+def test_desc_cursor_survives_new_hour_bucket(tables, dynamodb_backend):
+    put_events(tables, hours=3, per_hour=4)
+    # 첫 요청 뒤 새 시간이 시작돼 (end 생략) 가장 앞에 버킷이 하나 추가됨
+    seen = read_all(dynamodb_backend, [bucket_plan(BASE + 2 * HOUR_MS), bucket_plan(BASE + 3 * HOUR_MS)], True)
+    expected = [f'evt-{hour}-{index}' for hour in reversed(range(3)) for index in reversed(range(4))]
+    assert seen == expected
+
+
+def test_asc_cursor_survives_new_hour_bucket(tables, dynamodb_backend):
+    put_events(tables, hours=3, per_hour=3)
+    seen = read_all(dynamodb_backend, [bucket_plan(BASE + 2 * HOUR_MS), bucket_plan(BASE + 3 * HOUR_MS)], False)
+    assert seen == [f'evt-{hour}-{index}' for hour in range(3) for index in range(3)]
@@ -0,0 +1,112 @@
+"""
+WriteAheadLog: 재생, 체크포인트, 세그먼트 재활용, 슬롯 점유와 남겨진 슬롯 가져오기
+"""
+
+import json
+import os
+
+from analytics.ingest import IngestBuffer, build_event
+from analytics.wal import WriteAheadLog, open_slot, orphan_slots
+
+
+def payload(index):
+    return json.dumps({'index': index}).encode()
+
+
+def indexes(wal):
+    return [json.loads(body)['index'] for _, body in wal.replay()]
+
+
+def test_replay_returns_records_after_checkpoint(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    lsns = [wal.append(payload(index)) for index in range(5)]
+    assert wal.commit(lsns[-1])
+    assert not wal.commit(lsns[2])  # 이미 내구화된 위치는 fdatasync 없이 반환
+    wal.checkpoint(lsns[1])
+    wal.close()
+
+    # 다시 열면 체크포인트 이후 레코드만
+    reopened = WriteAheadLog(str(tmp_path))
+    assert indexes(reopened) == [2, 3, 4]
+    reopened.close()
+
+
+def test_torn_tail_is_truncated_and_appends_continue(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    wal.commit(wal.append(payload(0)))
+    wal.close()
+    segment = next(name for name in os.listdir(tmp_path) if name.endswith('.wal'))
+    with open(tmp_path / segment, 'ab') as f:
+        f.write(b'\x10\x00\x00\x00garbage')
+
+    reopened = WriteAheadLog(str(tmp_path))
+    reopened.commit(reopened.append(payload(1)))
+    assert indexes(reopened) == [0, 1]
+    reopened.close()
+
+
+def test_checkpointed_segments_are_recycled_without_replaying_old_records(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), segment_bytes=256, free_segments=2)
+    lsn = None
+    for index in range(40):
+        lsn = wal.append(payload(index))
+    wal.commit(lsn)
+    wal.checkpoint(lsn)
+    assert wal.stats['recycled'] == 2
+    assert len([name for name in os.listdir(tmp_path) if name.startswith('recycled-')]) == 2
+
+    # 재활용한 파일에 새 레코드를 써도 이전 내용은 재생되지 않음
+    for index in range(100, 120):
+        lsn = wal.append(payload(index))
+    wal.commit(lsn)
+    wal.close()
+    reopened = WriteAheadLog(str(tmp_path), segment_bytes=256)
+    assert indexes(reopened) == list(range(100, 120))
+    reopened.close()
+
+
+def test_slots_are_locked_per_worker(tmp_path):
+    first = open_slot(str(tmp_path))
+    second = open_slot(str(tmp_path))
+    assert os.path.basename(first.path) == 'slot-0'
+    assert os.path.basename(second.path) == 'slot-1'
+    # 모두 점유 중이면 가져올 슬롯이 없음
+    assert list(orphan_slots(str(tmp_path))) == []
+    second.close()
+    orphans = list(orphan_slots(str(tmp_path)))
+    assert [os.path.basename(orphan.path) for orphan in orphans] == ['slot-1']
+    for wal in orphans + [first]:
+        wal.close()
+
+
+def test_worker_adopts_orphaned_slot_at_start(tmp_path, sqlite_backend):
+    # 워커 수가 줄어 아무도 점유하지 않게 된 slot-1 에 저장 전 이벤트가 남아 있음
+    orphan = WriteAheadLog(str(tmp_path / 'slot-1'))
+    lsn = None
+    for index in range(3):
+        event = build_event({
+            'user_id': 'user-1', 'session_id': 'sess-1', 'event_type': 'click',
+            'timestamp': 1_790_000_000_000 + index,
+        })
+        lsn = orphan.append(json.dumps(event).encode())
+    orphan.commit(lsn)
+    orphan.close()
+
+    buffer = IngestBuffer(
+        sqlite_backend, batch_size=100, flush_interval=60,
+        wal_factory=lambda: open_slot(str(tmp_path)),
+        orphans_factory=lambda: orphan_slots(str(tmp_path))
+    )
+    buffer.start()
+    try:
+        assert os.path.basename(buffer.wal.path) == 'slot-0'
+        # 자기 WAL 로 옮긴 뒤 원래 슬롯은 비움
+        drained = WriteAheadLog(str(tmp_path / 'slot-1'))
+        assert list(drained.replay()) == []
+        drained.close()
+        assert len(list(buffer.wal.replay())) == 3
+        assert buffer.flush() == 3
+        assert list(buffer.wal.replay()) == []
+    finally:
+        buffer.close(timeout=0)
+    assert sqlite_backend.count_events() == 3